@@ -16,6 +16,20 @@ def open_link(url):
     except webbrowser.Error as e:
         print(f"Error al abrir el navegador: {e}")
 
+# Tamaño del logo en la ventana "Acerca de"
+LOGO_SIZE = (200, 200)
+
+_logo = None  # Logo ya redimensionado (se prepara una sola vez por proceso)
+
+
+def get_logo():
+    """Devuelve el logo redimensionado, abriéndolo con PIL solo la primera vez."""
+    global _logo
+    if _logo is None:
+        with Image.open("img/logo.png") as img:
+            _logo = ImageTk.PhotoImage(img.resize(LOGO_SIZE))
+    return _logo
+
 def show_about(root, current_theme):
     """Abre una ventana de 'About' con información sobre la aplicación."""
     about_window = tk.Toplevel(root)
@@ -25,9 +39,7 @@ def show_about(root, current_theme):
     # Aplica el tema a la ventana emergente
     apply_theme(about_window, current_theme)
 
-    img = Image.open("img/logo.png")
-    img = img.resize((200, 200))
-    img = ImageTk.PhotoImage(img)
+    img = get_logo()
     label_img = tk.Label(about_window, image=img)
     label_img.image = img  # Necesario para mantener la referencia de la imagen
     label_img.pack(pady=10)
@@ -0,0 +1,276 @@
+import os
+import tkinter as tk
+from itertools import islice
+import jedi
+from app.db_worker import DatabaseWorker, TaskCancelled
+
+# Pausa (ms) desde la última tecla antes de pedir sugerencias
+COMPLETION_DELAY_MS = 30
+
+# Sugerencias mostradas como máximo
+MAX_COMPLETIONS = 100
+
+# Filas visibles de la ventana de sugerencias
+POPUP_ROWS = 8
+
+# Código con el que se precalienta Jedi al abrir el editor
+WARMUP_CODE = "import os\nos.path.jo"
+
+# Teclas que no piden sugerencias (ni las cierran) al soltarse
+_IGNORED_KEYS = {
+    "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R", "Caps_Lock",
+    "Up", "Down", "Prior", "Next", "Tab", "Return", "Escape",
+}
+
+_engines = {}  # ventana raíz -> CompletionEngine compartido
+
+
+def completion_engine(root):
+    """
+    Devuelve el motor de autocompletado de la aplicación (uno por ventana raíz).
+
+    Es compartido por todos los editores, así que el entorno de Python y las
+    cachés de Jedi se conservan al cerrar un editor y abrir otro.
+    """
+    engine = _engines.get(root)
+    if engine is None:
+        engine = _engines[root] = CompletionEngine(root)
+    return engine
+
+
+class CompletionEngine:
+    """
+    Jedi en un hilo de trabajo propio.
+
+    Todas las llamadas a Jedi se hacen en ese hilo (Jedi no es seguro entre
+    hilos), así que la interfaz nunca espera a la inferencia. El entorno de
+    Python y el proyecto se crean una sola vez. Las sugerencias se calculan
+    para el principio de la palabra que se está escribiendo y se guardan:
+    mientras se sigue escribiendo esa palabra, cada tecla solo filtra la
+    lista guardada, sin volver a llamar a Jedi.
+    """
+
+    def __init__(self, root):
+        """
+        :param root: Ventana de Tk a la que se entregan los resultados.
+        """
+        self.worker = DatabaseWorker(None, root, name="completion-worker")
+        self.path = os.path.join(os.getcwd(), "__editor__.py")  # No existe: solo identifica el buffer
+        self._project = None
+        self._environment = None
+        self._cached_key = None  # (código sin la palabra, línea, columna de la palabra)
+        self._cached_names = []
+        self._preload = None
+
+    def preload(self):
+        """Prepara en segundo plano el entorno de Python y las cachés de Jedi."""
+        if self._preload is None:
+            self._preload = self.worker.submit(self._complete, WARMUP_CODE, 2, len(WARMUP_CODE.split("\n")[1]))
+        return self._preload
+
+    def complete(self, code, line, column):
+        """
+        Pide las sugerencias para una posición del código.
+
+        :param code: Texto completo del editor.
+        :param line: Línea del cursor (desde 1).
+        :param column: Columna del cursor (desde 0).
+        :return: DatabaseTask cuyo resultado es una lista de tuplas
+            (nombre, texto a insertar).
+        """
+        return self.worker.submit(self._complete, code, line, column)
+
+    def _complete(self, code, line, column):
+        """Calcula las sugerencias (hilo de trabajo)."""
+        lines = code.split("\n")
+        current = lines[line - 1]
+        start = column
+        while start > 0 and (current[start - 1].isalnum() or current[start - 1] == "_"):
+            start -= 1
+        prefix = current[start:column]
+        # Sin la palabra a medias, el código es el mismo con cada letra que se añade
+        lines[line - 1] = current[:start] + current[column:]
+        key = ("\n".join(lines), line, start)
+        if key != self._cached_key:
+            if self._environment is None:
+                self._environment = jedi.get_default_environment()
+                self._project = jedi.Project(os.getcwd())
+            script = jedi.Script(key[0], path=self.path, project=self._project, environment=self._environment)
+            self._cached_names = [completion.name for completion in script.complete(line, start)]
+            self._cached_key = key
+        matches = (name for name in self._cached_names if name.startswith(prefix) and name != prefix)
+        return [(name, name[len(prefix):]) for name in islice(matches, MAX_COMPLETIONS)]
+
+
+class CompletionPopup:
+    """
+    Lista de sugerencias de Jedi bajo el cursor de un widget Text.
+
+    Las sugerencias se piden al soltar una tecla, tras COMPLETION_DELAY_MS
+    sin escribir; cada tecla nueva deja sin efecto la petición anterior (se
+    cancela si aún no ha empezado y su resultado se descarta si ya estaba en
+    marcha). Con la lista abierta, las flechas la recorren, Tab o Intro
+    insertan la sugerencia y Escape la cierra.
+    """
+
+    def __init__(self, text_widget, engine, bg=None, fg=None, should_complete=None):
+        """
+        :param text_widget: Widget Text del código.
+        :param engine: CompletionEngine que calcula las sugerencias.
+        :param bg: Color de fondo de la lista.
+        :param fg: Color del texto de la lista.
+        :param should_complete: Función sin argumentos; si devuelve False no se
+            piden sugerencias (por ejemplo, durante la carga de un archivo).
+        """
+        self.text = text_widget
+        self.engine = engine
+        self.should_complete = should_complete
+        self._after_id = None
+        self._task = None
+        self._generation = 0  # Cambia con cada tecla: descarta respuestas antiguas
+        self._items = []
+
+        self.window = tk.Toplevel(text_widget)
+        self.window.withdraw()
+        self.window.overrideredirect(True)
+        self.listbox = tk.Listbox(self.window, height=POPUP_ROWS, width=30, takefocus=0, activestyle="none",
+                                  exportselection=False, font=text_widget.cget("font"), bg=bg, fg=fg)
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        # Se atiende el clic en lugar del Listbox, que se llevaría el foco del editor
+        self.listbox.bind("<ButtonPress-1>", self._on_click)
+
+        # Etiqueta propia delante de las del widget: las teclas de la lista
+        # se atienden antes que las del editor (Intro con sangría, etc.)
+        tag = f"completion{id(self)}"
+        self.text.bindtags((tag,) + self.text.bindtags())
+        for sequence, handler in (
+            ("<Up>", lambda event: self._move(-1)),
+            ("<Down>", lambda event: self._move(1)),
+            ("<Prior>", lambda event: self._move(-POPUP_ROWS)),
+            ("<Next>", lambda event: self._move(POPUP_ROWS)),
+            ("<Tab>", self._accept),
+            ("<Return>", self._accept),
+            ("<Escape>", lambda event: self._close_if_visible()),
+            ("<KeyRelease>", self._on_key_release),
+            ("<ButtonPress>", lambda event: self.close()),
+            ("<FocusOut>", lambda event: self.close()),
+            ("<Destroy>", lambda event: self.close()),
+        ):
+            self.text.bind_class(tag, sequence, handler)
+
+    @property
+    def visible(self):
+        return self.window.winfo_exists() and self.window.winfo_ismapped()
+
+    def _on_key_release(self, event):
+        """Programa una petición si la tecla escribe un identificador o un punto."""
+        if event.keysym in _IGNORED_KEYS:
+            return
+        if event.keysym == "BackSpace":
+            if self.visible:
+                self.schedule()
+        elif event.char == "." or event.char == "_" or event.char.isalnum():
+            self.schedule()
+        else:
+            self.close()
+
+    def schedule(self):
+        """Pide sugerencias cuando pasen COMPLETION_DELAY_MS sin otra tecla."""
+        self._generation += 1
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+        self._after_id = self.text.after(COMPLETION_DELAY_MS, self._request)
+
+    def _request(self):
+        """Envía la petición de sugerencias de la posición actual del cursor."""
+        self._after_id = None
+        if self.should_complete is not None and not self.should_complete():
+            return
+        line, column = map(int, self.text.index("insert").split("."))
+        before = self.text.get("insert linestart", "insert")
+        if not before.strip() or before.lstrip().startswith("#"):
+            self.close()
+            return
+        if self._task is not None:
+            self._task.cancel()
+        generation = self._generation
+        task = self._task = self.engine.complete(self.text.get("1.0", "end-1c"), line, column)
+        task.then(lambda items: self._show(task, generation, items), lambda error: self._failed(task, error))
+
+    def _failed(self, task, error):
+        if self._task is task:
+            self._task = None
+        if not isinstance(error, TaskCancelled):
+            self.close()  # Código que Jedi no entiende: simplemente no hay sugerencias
+
+    def _show(self, task, generation, items):
+        """Muestra las sugerencias recibidas si siguen siendo las de la última tecla."""
+        if self._task is task:
+            self._task = None
+        if generation != self._generation or not self.text.winfo_exists():
+            return
+        if not items:
+            self.close()
+            return
+        self._items = items
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *(name for name, _ in items))
+        self.listbox.configure(height=min(POPUP_ROWS, len(items)), font=self.text.cget("font"))
+        self._select(0)
+        bbox = self.text.bbox("insert")
+        if bbox is None:
+            self.close()
+            return
+        x = self.text.winfo_rootx() + bbox[0]
+        y = self.text.winfo_rooty() + bbox[1] + bbox[3]
+        self.window.geometry(f"+{x}+{y}")
+        self.window.deiconify()
+        self.window.lift()
+
+    def _select(self, index):
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(index)
+        self.listbox.activate(index)
+        self.listbox.see(index)
+
+    def _move(self, step):
+        if not self.visible:
+            return None
+        current = self.listbox.curselection()
+        index = (current[0] if current else 0) + step
+        self._select(max(0, min(len(self._items) - 1, index)))
+        return "break"
+
+    def _accept(self, event=None):
+        """Inserta la sugerencia seleccionada."""
+        if not self.visible:
+            return None
+        current = self.listbox.curselection()
+        if current:
+            self.text.insert("insert", self._items[current[0]][1])
+            self.text.event_generate("<<Completed>>")
+        self.close()
+        return "break"
+
+    def _on_click(self, event):
+        self._select(self.listbox.nearest(event.y))
+        self._accept()
+        return "break"
+
+    def _close_if_visible(self):
+        if not self.visible:
+            return None
+        self.close()
+        return "break"
+
+    def close(self):
+        """Cierra la lista y descarta la petición pendiente."""
+        self._generation += 1
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+            self._after_id = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.window.winfo_exists():
+            self.window.withdraw()
@@ -18,6 +18,7 @@ def create_buttons(self, button_frame, theme_name):
         ("Eliminar Concepto", self.delete_category),
         ("Ejecutar Código", self.run_category_code),
         ("Buscar Concepto", self.search_category_dialog),
+        ("Detener Ejecución", self.stop_running_code),
     ]
 
     # Crear los botones en el frame
@@ -0,0 +1,208 @@
+"""
+Interfaz de línea de comandos de DiccioPynthon.
+
+Permite trabajar con la base de datos de conceptos sin entorno gráfico:
+
+    python -m app.cli --db conceptos.db add "Listas" --file listas.py
+    python -m app.cli get "Listas"
+    python -m app.cli search "comprension listas"
+    python -m app.cli search --fuzzy "dicionary comprehesion"
+    python -m app.cli export conceptos.jsonl
+    python -m app.cli import conceptos.jsonl
+    python -m app.cli merge otra.db --policy newest
+    python -m app.cli stats
+    python -m app.cli lint
+
+Solo depende de la biblioteca estándar y de los módulos de base de datos
+(no importa Tkinter, Pillow ni reportlab), por lo que arranca muy rápido.
+Los archivos de importación y exportación usan JSON Lines: una categoría
+{"name": ..., "code": ...} por línea (comprimidos con gzip si terminan en
+.gz); "-" indica la entrada o salida estándar.
+"""
+import argparse
+import json
+import os
+import sys
+from .db_actions import DatabaseActions, MERGE_POLICIES, MERGE_KEEP_LOCAL, describe_merge
+from .db_jsonl import export_jsonl, import_jsonl, IMPORT_BATCH_SIZE
+from .linter import lint_database
+
+
+def _open_input(path):
+    """Abre un archivo de entrada de texto ('-' es la entrada estándar)."""
+    if path == "-":
+        return sys.stdin
+    return open(path, "r", encoding="utf-8")
+
+
+def cmd_add(db_actions, args):
+    """Añade una categoría; el código se lee de --code, --file o la entrada estándar."""
+    if args.code is not None:
+        code = args.code
+    elif args.file:
+        with _open_input(args.file) as file:
+            code = file.read()
+    else:
+        code = sys.stdin.read()
+    db_actions.add_category(args.name, code)
+    return 0
+
+
+def cmd_get(db_actions, args):
+    """Escribe el código de una categoría en la salida estándar."""
+    code = db_actions.get_code(args.name)
+    if code is None:
+        print(f"No existe la categoría '{args.name}'.", file=sys.stderr)
+        return 1
+    sys.stdout.write(code)
+    if code and not code.endswith("\n"):
+        sys.stdout.write("\n")
+    return 0
+
+
+def cmd_search(db_actions, args):
+    """Muestra las categorías que coinciden, una por línea (nombre y fragmento o parecido)."""
+    if args.fuzzy:
+        results = [(name, f"{score:.2f}") for _, name, score in db_actions.fuzzy_search(args.term)]
+    else:
+        results = db_actions.search_category(args.term)
+    for name, snippet in results[:args.limit] if args.limit else results:
+        if args.names_only:
+            print(name)
+        else:
+            print(f"{name}\t{' '.join((snippet or '').split())}")
+    return 0 if results else 1
+
+
+def cmd_import(db_actions, args):
+    """Importa (añade o reemplaza) categorías desde un archivo JSON Lines."""
+    source = sys.stdin if args.path == "-" else args.path
+    result = import_jsonl(db_actions, source, replace=not args.keep_existing, batch_size=args.batch_size)
+    print(f"{result['imported']} categorías importadas, {result['skipped']} omitidas.", file=sys.stderr)
+    return 0
+
+
+def cmd_export(db_actions, args):
+    """Exporta todas las categorías a un archivo JSON Lines, fila a fila."""
+    count = export_jsonl(db_actions, sys.stdout if args.path == "-" else args.path)
+    print(f"{count} categorías exportadas.", file=sys.stderr)
+    return 0
+
+
+def cmd_merge(db_actions, args):
+    """Fusiona otra base de datos de DiccioPynthon en la actual."""
+    if not os.path.exists(args.path):
+        print(f"No existe el archivo '{args.path}'.", file=sys.stderr)
+        return 1
+    print(describe_merge(db_actions.merge_database(args.path, args.policy)))
+    return 0
+
+
+def cmd_stats(db_actions, args):
+    """Muestra un resumen de la base de datos."""
+    db = db_actions.db
+    count = db.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    page_count = db.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = db.execute("PRAGMA freelist_count").fetchone()[0]
+    changes = db.execute("SELECT COALESCE(MAX(seq), 0) FROM category_changes").fetchone()[0]
+    stats = {
+        "archivo": db.db_name,
+        "categorias": count,
+        "esquema": "dividido" if db_actions.is_split_schema() else "en línea",
+        "busqueda_fts5": db_actions.fts_enabled,
+        "tamano_bytes": page_size * page_count,
+        "paginas_libres": free_pages,
+        "ultimo_cambio": changes,
+        "id": db_actions.database_id(),
+    }
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False))
+    else:
+        for key, value in stats.items():
+            print(f"{key}: {value}")
+    return 0
+
+
+def cmd_lint(db_actions, args):
+    """Revisa el código de todas las categorías: una línea por problema (categoría:línea:columna)."""
+    found = False
+    for name, diagnostics in lint_database(db_actions):
+        for line, column, _, message, severity in diagnostics:
+            if severity == "error" or not args.errors_only:
+                print(f"{name}:{line}:{column + 1}: {severity}: {message}")
+                found = True
+    return 1 if found else 0
+
+
+def build_parser():
+    """Construye el analizador de argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="DiccioPynthon sin interfaz gráfica.")
+    parser.add_argument("--db", default="conceptos.db", help="Archivo de la base de datos (por defecto conceptos.db).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Añadir una categoría.")
+    add.add_argument("name", help="Nombre de la categoría.")
+    source = add.add_mutually_exclusive_group()
+    source.add_argument("--code", help="Código de la categoría.")
+    source.add_argument("--file", help="Archivo con el código ('-' para la entrada estándar).")
+    add.set_defaults(func=cmd_add)
+
+    get = commands.add_parser("get", help="Mostrar el código de una categoría.")
+    get.add_argument("name", help="Nombre de la categoría.")
+    get.set_defaults(func=cmd_get)
+
+    search = commands.add_parser("search", help="Buscar categorías por nombre y código.")
+    search.add_argument("term", help="Texto a buscar.")
+    search.add_argument("--limit", type=int, default=0, help="Número máximo de resultados.")
+    search.add_argument("--names-only", action="store_true", help="Mostrar solo los nombres.")
+    search.add_argument("--fuzzy", action="store_true",
+                        help="Buscar por parecido, tolerando faltas de ortografía.")
+    search.set_defaults(func=cmd_search)
+
+    import_ = commands.add_parser("import", help="Importar categorías desde JSON Lines.")
+    import_.add_argument("path", help="Archivo a importar ('-' para la entrada estándar).")
+    import_.add_argument("--keep-existing", action="store_true",
+                         help="No reemplazar las categorías que ya existen.")
+    import_.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Categorías por transacción.")
+    import_.set_defaults(func=cmd_import)
+
+    export = commands.add_parser("export", help="Exportar categorías a JSON Lines.")
+    export.add_argument("path", nargs="?", default="-", help="Archivo de destino ('-' para la salida estándar).")
+    export.set_defaults(func=cmd_export)
+
+    merge = commands.add_parser("merge", help="Fusionar otra base de datos.")
+    merge.add_argument("path", help="Base de datos a fusionar.")
+    merge.add_argument("--policy", choices=MERGE_POLICIES, default=MERGE_KEEP_LOCAL,
+                       help="Qué hacer con los conceptos repetidos.")
+    merge.set_defaults(func=cmd_merge)
+
+    stats = commands.add_parser("stats", help="Mostrar estadísticas de la base de datos.")
+    stats.add_argument("--json", action="store_true", help="Salida en formato JSON.")
+    stats.set_defaults(func=cmd_stats)
+
+    lint = commands.add_parser("lint", help="Buscar errores de sintaxis y nombres no definidos en el código.")
+    lint.add_argument("--errors-only", action="store_true", help="Mostrar solo los errores de sintaxis.")
+    lint.set_defaults(func=cmd_lint)
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos; devuelve el código de salida."""
+    args = build_parser().parse_args(argv)
+    db_actions = DatabaseActions(args.db)
+    try:
+        return args.func(db_actions, args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # La salida se cortó (por ejemplo, con 'head'); no es un error
+        sys.stderr.close()
+        return 0
+    finally:
+        db_actions.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
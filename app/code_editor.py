@@ -1,204 +1,445 @@
+import os
 import tkinter as tk
-from app.config import load_config  # Importa la función para cargar la configuración
-from app.themes import apply_theme, THEMES  
-from pygments import lex
-from pygments.lexers import PythonLexer
-from pygments.styles import get_style_by_name
-from tkinter import filedialog
+import tkinter.font as tkfont
+from app.config import load_config, get_setting  # Importa la función para cargar la configuración
+from app.themes import THEMES
+from tkinter import filedialog, messagebox
 from app.sangria import on_enter
-
-def open_code_editor(root, category_name="", initial_code="", run_callback=None):
-    """Abre una ventana dividida para editar tanto el título como el código con formato."""
-    editor_window = tk.Toplevel(root)  # Usar el parámetro root
-    editor_window.title(f"Añadir/Editar Categoría - {category_name}")
-    editor_window.geometry("600x400")
-
-    # Cargar el tema desde el archivo de configuración
-    theme_name = load_config()  # Llamamos a load_config para obtener el tema guardado
-    apply_theme(editor_window, theme_name)  # Aplicamos el tema a la ventana del editor
-
-    # Obtener los colores del tema actual
-    theme = THEMES.get(theme_name, THEMES["light"])
-    bg_color = theme["bg"]
-    fg_color = theme["fg"]
-    entry_bg_color = theme["entry_bg"]
-    entry_fg_color = theme["entry_fg"]
-    frame_bg_color = theme["button_bg"]  # Usamos el color del botón para el fondo del frame en tema oscuro
-    highlight_color = "#404040" if theme_name == "dark" else "#D3D3D3"  # Color de resaltado para la línea actual
-
-    def save_code():
-        """Guarda el título y el código con formato."""
-        saved_title_code["title"] = title_entry.get("1.0", "end-1c")
-        saved_title_code["code"] = code_entry.get("1.0", "end-1c")
-        nonlocal is_saved
-        is_saved = True  # Indicamos que se ha guardado
-        editor_window.destroy()
-        
-    def load_file():
-        """Carga el contenido de un archivo en el área de código."""
+from app.highlighter import SyntaxHighlighter, PLAIN_TEXT_LIMIT
+from app.file_loader import read_source, ChunkedInsert, LARGE_FILE_CHARS
+from app.progress_dialog import ProgressDialog
+from app.line_gutter import LineNumberGutter
+from app.autocomplete import completion_engine, CompletionPopup
+from app.db_worker import DatabaseWorker
+from app.linter import check_code_cached, cached_diagnostics, ERROR
+from app.output_pane import OutputPane, InputLine
+
+# Tamaño de la fuente del código y límites del zoom
+CODE_FONT_SIZE = 12
+MIN_FONT_SIZE = 6
+MAX_FONT_SIZE = 40
+
+# Pausa (ms) desde la última edición antes de revisar el código
+LINT_DELAY_MS = 400
+
+# Editores cerrados que se conservan ocultos para volver a abrirlos al instante
+MAX_IDLE_EDITORS = 1
+
+_lint_workers = {}  # ventana raíz -> hilo que revisa el código de los editores
+_idle_editors = {}  # ventana raíz -> editores ocultos listos para reutilizar
+_icons = {}  # ruta -> PhotoImage ya reducida
+
+
+def lint_worker(root):
+    """Hilo de trabajo (compartido por los editores) donde se revisa el código."""
+    worker = _lint_workers.get(root)
+    if worker is None:
+        worker = _lint_workers[root] = DatabaseWorker(None, root, name="lint-worker")
+    return worker
+
+
+def load_icon(path, factor=8):
+    """Imagen de un botón, leída y reducida una sola vez por proceso."""
+    icon = _icons.get(path)
+    if icon is None:
+        icon = _icons[path] = tk.PhotoImage(file=path).subsample(factor, factor)
+    return icon
+
+
+def prepare_editor(root):
+    """Construye un editor oculto para que la primera apertura sea instantánea."""
+    idle = _idle_editors.setdefault(root, [])
+    if not any(editor.exists() for editor in idle):
+        idle.append(CodeEditor(root))
+
+
+def open_code_editor(root, category_name="", initial_code=""):
+    """
+    Abre una ventana dividida para editar tanto el título como el código con formato.
+
+    Reutiliza un editor oculto si hay alguno libre (ver `prepare_editor`);
+    si no, por ejemplo al abrir un segundo editor, construye uno nuevo.
+
+    :return: Tupla (título, código); vacíos si se cierra sin guardar.
+    """
+    idle = _idle_editors.setdefault(root, [])
+    while idle and not idle[-1].exists():
+        idle.pop()
+    editor = idle.pop() if idle else CodeEditor(root)
+    try:
+        return editor.edit(category_name, initial_code)
+    finally:
+        if editor.exists():
+            if len(idle) < MAX_IDLE_EDITORS:
+                idle.append(editor)
+            else:
+                editor.window.destroy()
+
+
+class CodeEditor:
+    """
+    Ventana para editar el título y el código de un concepto.
+
+    La ventana se construye una vez y se reutiliza: al cerrarla solo se
+    oculta, y `edit` la vuelve a mostrar con otro concepto sin crear de
+    nuevo los widgets, las etiquetas de color ni el autocompletado.
+    """
+
+    def __init__(self, root):
+        """
+        :param root: Ventana principal de la aplicación.
+        """
+        self.root = root
+        self.category_name = ""
+        self.result = ("", "")
+        self.loader = None  # Carga por partes en curso (ChunkedInsert)
+        self.load_progress = None  # Y su ventana de progreso
+        self.lint_after_id = None
+        self.lint_task = None
+        self.lint_generation = 0
+        self.diagnostics = ()
+
+        self.window = tk.Toplevel(root)  # Usar el parámetro root
+        self.window.withdraw()
+        self.window.geometry("600x400")
+        self.closed = tk.BooleanVar(self.window, value=True)
+
+        # Tema guardado (config.json se lee una vez por proceso); todos los
+        # widgets se crean ya con sus colores
+        theme_name = load_config()
+        theme = THEMES.get(theme_name, THEMES["light"])
+        self.theme_name = theme_name
+        bg_color = theme["bg"]
+        fg_color = theme["fg"]
+        entry_bg_color = theme["entry_bg"]
+        entry_fg_color = theme["entry_fg"]
+        frame_bg_color = theme["button_bg"]  # Usamos el color del botón para el fondo del frame en tema oscuro
+        self.window.configure(bg=bg_color)
+
+        # Crear un frame para alinear los botones en la misma línea
+        button_frame = tk.Frame(self.window, bg=bg_color)
+        button_frame.pack(fill="x", padx=10, pady=5, anchor="w")  # Expandir horizontalmente y alinear a la izquierda
+
+        # Botones con imagen (ajustadas a 50x50 si la original es 200x200): cargar, guardar y ejecutar
+        for path, command in (
+            ("./img/loadfile.png", self.load_file),
+            ("./img/savefile.png", self.save_code),
+            ("./img/runcode.png", self.run_code),
+        ):
+            button = tk.Button(button_frame, image=load_icon(path), command=command,
+                               bg=theme["button_bg"], fg=theme["button_fg"])
+            button.pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Detener", command=self.stop_code,
+                  bg=theme["button_bg"], fg=theme["button_fg"]).pack(side=tk.LEFT, padx=5)
+
+        # Salida del código ejecutado desde el editor (debajo de todo)
+        self.output = OutputPane(self.window, theme_name=theme_name, height=6)
+        # La entrada para input() va debajo de la salida (se empaqueta antes)
+        InputLine(self.window, self.output, theme_name).pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+        self.output.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 5))
+
+        # Crear un PanedWindow para dividir la ventana en dos secciones
+        paned_window = tk.PanedWindow(self.window, orient=tk.HORIZONTAL, bg=bg_color)
+        paned_window.pack(fill=tk.BOTH, expand=True)
+
+        # Título con barra de desplazamiento vertical
+        title_frame = tk.Frame(paned_window, bg=frame_bg_color)
+        title_label = tk.Label(title_frame, text="CONCEPTO A GUARDAR", font=("Arial", 10, "bold"), bg=frame_bg_color, fg=fg_color)
+        title_label.pack(anchor="w", padx=5, pady=2)
+
+        title_scrollbar = tk.Scrollbar(title_frame, orient=tk.VERTICAL)
+        self.title_entry = tk.Text(title_frame, wrap="word", height=10, width=30, yscrollcommand=title_scrollbar.set, bg=entry_bg_color, fg=entry_fg_color, insertbackground=entry_fg_color)
+        title_scrollbar.config(command=self.title_entry.yview)
+        title_scrollbar.pack_forget()  # Ocultar scrollbar
+        self.title_entry.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+        paned_window.add(title_frame)
+
+        # Código con barra de desplazamiento vertical y numeración
+        code_frame = tk.Frame(paned_window, bg=frame_bg_color)
+        code_label = tk.Label(code_frame, text="CÓDIGO ASOCIADO AL CONCEPTO", font=("Arial", 10, "bold"), bg=frame_bg_color, fg=fg_color)
+        code_label.pack(anchor="w", padx=5, pady=2)
+
+        # Problemas encontrados al revisar el código
+        self.lint_label = tk.Label(code_frame, text="", anchor="w", justify="left", bg=frame_bg_color, fg=fg_color)
+        self.lint_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+
+        # Frame para el código
+        code_inner_frame = tk.Frame(code_frame, bg=frame_bg_color)
+        code_inner_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Widget de entrada para código
+        code_scrollbar = tk.Scrollbar(code_inner_frame, orient=tk.VERTICAL)
+        code_entry = self.code_entry = tk.Text(code_inner_frame, wrap="word", height=10, width=30, yscrollcommand=code_scrollbar.set, bg=entry_bg_color, fg=entry_fg_color, insertbackground=entry_fg_color, font=("Courier", CODE_FONT_SIZE))
+        code_scrollbar.config(command=code_entry.yview)
+        code_scrollbar.pack_forget()  # Ocultar scrollbar
+
+        # Números de línea: solo se dibujan los de las líneas visibles, y se
+        # redibujan solos al desplazarse, editar o cambiar el tamaño del área
+        self.line_numbers = LineNumberGutter(code_inner_frame, code_entry, bg=entry_bg_color, fg=entry_fg_color)
+        self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
+        code_entry.pack(expand=True, fill=tk.BOTH)
+
+        # Vinculamos la tecla Enter al método on_enter de sangría
+        code_entry.bind("<Return>", lambda event: on_enter(event, code_entry))
+
+        paned_window.add(code_frame)
+
+        # Color de resaltado para la línea actual
+        code_entry.tag_configure("current_line", background="#404040" if theme_name == "dark" else "#D3D3D3")
+
+        # Resaltado de sintaxis incremental: solo se vuelven a analizar las líneas
+        # cambiadas y las etiquetas de color se configuran una vez por editor
+        # Por encima de "plain_text_limit" caracteres (config.json) el código no se colorea
+        self.highlighter = SyntaxHighlighter(code_entry, "monokai" if theme_name == "dark" else "default", fg_color,
+                                             max_chars=get_setting("plain_text_limit", PLAIN_TEXT_LIMIT))
+
+        # Revisión del código (sintaxis y nombres no definidos) en segundo plano;
+        # los problemas se subrayan y el primero se muestra bajo el área de código
+        code_entry.tag_configure("lint_error", underline=True, foreground="#FF5555" if theme_name == "dark" else "#CC0000")
+        code_entry.tag_configure("lint_warning", underline=True)
+        code_entry.tag_bind("lint_error", "<Enter>", self.lint_hover)
+        code_entry.tag_bind("lint_warning", "<Enter>", self.lint_hover)
+
+        # Actualiza la numeración de líneas, resalta la línea actual y aplica resaltado de sintaxis al escribir en el código
+        code_entry.bind("<KeyRelease>", self.on_key_release)
+
+        # Zoom con Ctrl + rueda del ratón o Ctrl +/-/0 (la numeración se ajusta a la fuente)
+        code_entry.bind("<Control-MouseWheel>", lambda event: self.zoom(1 if event.delta > 0 else -1))
+        code_entry.bind("<Control-Button-4>", lambda event: self.zoom(1))
+        code_entry.bind("<Control-Button-5>", lambda event: self.zoom(-1))
+        code_entry.bind("<Control-plus>", lambda event: self.zoom(1))
+        code_entry.bind("<Control-equal>", lambda event: self.zoom(1))
+        code_entry.bind("<Control-minus>", lambda event: self.zoom(-1))
+        code_entry.bind("<Control-0>", lambda event: self.zoom(0))
+
+        code_entry.bind("<KeyRelease-Return>", self.auto_scroll)
+
+        # Autocompletado con Jedi en segundo plano; el motor es compartido entre
+        # editores y se precalienta al crear este para que la primera lista no tarde
+        completer_engine = completion_engine(root)
+        completer_engine.preload()
+        self.completion = CompletionPopup(code_entry, completer_engine, bg=entry_bg_color, fg=entry_fg_color,
+                                          should_complete=lambda: self.loader is None and not self.highlighter.plain)
+        code_entry.bind("<<Completed>>", self.on_key_release)  # Sugerencia insertada: numeración y colores
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)  # Interceptar el evento de cierre
+        # Si la aplicación se cierra con el editor abierto, `edit` no debe quedarse esperando
+        self.window.bind("<Destroy>", lambda event: self.closed.set(True) if event.widget is self.window else None)
+
+    def exists(self):
+        """Indica si la ventana sigue existiendo (no se ha destruido con la aplicación)."""
+        return bool(self.window.winfo_exists())
+
+    def edit(self, category_name="", initial_code=""):
+        """
+        Muestra el editor con un concepto y espera a que se cierre.
+
+        :param category_name: Nombre del concepto.
+        :param initial_code: Código inicial.
+        :return: Tupla (título, código); vacíos si se cierra sin guardar.
+        """
+        self.category_name = category_name
+        self.output.clear()
+        self.result = ("", "")
+        self.window.title(f"Añadir/Editar Categoría - {category_name}")
+        self.title_entry.delete("1.0", tk.END)
+        self.title_entry.insert("1.0", category_name)
+        self.code_entry.delete("1.0", tk.END)
+        self.code_entry.insert("1.0", initial_code)
+        self.code_entry.mark_set("insert", "1.0")
+        self.code_entry.see("1.0")
+        self.show_lint(())
+
+        # Inicializar la numeración de líneas, el resaltado de la línea actual, el resaltado de sintaxis y la revisión
+        self.update_line_numbers()
+        self.highlight_current_line()
+        self.syntax_highlight()
+        self.schedule_lint()
+
+        self.closed.set(False)
+        self.window.deiconify()
+        self.window.lift()
+        self.code_entry.focus_set()
+        self.window.wait_variable(self.closed)  # Esperar que se cierre la ventana
+        return self.result
+
+    def close(self):
+        """Oculta la ventana (sin destruirla) y termina `edit`."""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.load_progress.close()
+            self.loader = self.load_progress = None
+        if self.lint_after_id is not None:
+            self.window.after_cancel(self.lint_after_id)
+            self.lint_after_id = None
+        self.completion.close()
+        self.output.stop_all()  # El código lanzado desde este concepto no sigue oculto
+        self.window.withdraw()
+        self.closed.set(True)
+
+    def save_code(self):
+        """Guarda el título y el código con formato (avisa si el código tiene errores de sintaxis)."""
+        code = self.code_entry.get("1.0", "end-1c")
+        errors = [diagnostic for diagnostic in check_code_cached(code) if diagnostic[4] == ERROR]
+        if errors and not messagebox.askyesno(
+            "Error de sintaxis",
+            f"El código tiene un error en la línea {errors[0][0]}: {errors[0][3]}\n\n¿Guardar de todos modos?",
+            parent=self.window,
+        ):
+            return
+        self.result = (self.title_entry.get("1.0", "end-1c"), code)
+        self.close()
+
+    def run_code(self):
+        """Ejecuta el código escrito en el área de texto y muestra su salida bajo el editor."""
+        title = self.title_entry.get("1.0", "end-1c").strip().split("\n")[0] or self.category_name
+        try:
+            self.output.run(self.code_entry.get("1.0", "end-1c"), title)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al ejecutar el código: {e}", parent=self.window)
+
+    def stop_code(self):
+        """Detiene el código lanzado desde el editor."""
+        self.output.stop_all()
+
+    def load_file(self):
+        """
+        Carga el contenido de un archivo en el área de código.
+
+        Los archivos grandes se insertan por partes con una ventana de
+        progreso, y la numeración y el resaltado se calculan al terminar.
+        """
         file_path = filedialog.askopenfilename(filetypes=[("Python Files", "*.py"), ("Text Files", "*.txt"), ("All Files", "*.*")])
-        if file_path:
-            with open(file_path, "r", encoding="utf-8") as file:
-                code_entry.delete("1.0", tk.END)
-                code_entry.insert("1.0", file.read())
-
-    # Cargar imágenes para los botones con tamaño máximo
-    # Ajustar el tamaño de las imágenes a 50x50 píxeles
-    load_icon = tk.PhotoImage(file="./img/loadfile.png").subsample(8, 8)  # Ajustar a 50x50 si la imagen original es 200x200
-    save_icon = tk.PhotoImage(file="./img/savefile.png").subsample(8, 8)
-    run_icon = tk.PhotoImage(file="./img/runcode.png").subsample(8, 8)
-
-    # Crear un frame para alinear los botones en la misma línea
-    button_frame = tk.Frame(editor_window, bg=bg_color)
-    button_frame.pack(fill="x", padx=10, pady=5, anchor="w")  # Expandir horizontalmente y alinear a la izquierda
-
-    # Botón para cargar archivo con imagen
-    load_button = tk.Button(button_frame, image=load_icon, command=load_file, bg=theme["button_bg"], fg=theme["button_fg"])
-    load_button.image = load_icon  # Evitar que la imagen sea eliminada por el recolector de basura
-    load_button.pack(side=tk.LEFT, padx=5)
-
-    # Botón para guardar archivo con imagen
-    save_button = tk.Button(button_frame, image=save_icon, command=save_code, bg=theme["button_bg"], fg=theme["button_fg"])
-    save_button.image = save_icon
-    save_button.pack(side=tk.LEFT, padx=5)
-    
-    # Botón para ejecutar el código escrito en el área de texto
-    run_button = tk.Button(button_frame, image=run_icon, 
-                        command=lambda: run_callback(code_entry.get("1.0", tk.END)), 
-                        bg=theme["button_bg"], fg=theme["button_fg"])
-    run_button.image = run_icon
-    run_button.pack(side=tk.LEFT, padx=5)
-
-    
-    # Crear un PanedWindow para dividir la ventana en dos secciones
-    paned_window = tk.PanedWindow(editor_window, orient=tk.HORIZONTAL, bg=bg_color)
-    paned_window.pack(fill=tk.BOTH, expand=True)
-
-    # Título con barra de desplazamiento vertical
-    title_frame = tk.Frame(paned_window, bg=frame_bg_color)
-    title_label = tk.Label(title_frame, text="CONCEPTO A GUARDAR", font=("Arial", 10, "bold"), bg=frame_bg_color, fg=fg_color)
-    title_label.pack(anchor="w", padx=5, pady=2)
-
-    title_scrollbar = tk.Scrollbar(title_frame, orient=tk.VERTICAL)
-    title_entry = tk.Text(title_frame, wrap="word", height=10, width=30, yscrollcommand=title_scrollbar.set, bg=entry_bg_color, fg=entry_fg_color, insertbackground=entry_fg_color)
-    title_scrollbar.config(command=title_entry.yview)
-    title_scrollbar.pack_forget()  # Ocultar scrollbar
-    title_entry.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
-    title_entry.insert("1.0", category_name)
-    paned_window.add(title_frame)
-
-    # Código con barra de desplazamiento vertical y numeración
-    code_frame = tk.Frame(paned_window, bg=frame_bg_color)
-    code_label = tk.Label(code_frame, text="CÓDIGO ASOCIADO AL CONCEPTO", font=("Arial", 10, "bold"), bg=frame_bg_color, fg=fg_color)
-    code_label.pack(anchor="w", padx=5, pady=2)
-
-    # Frame para el código
-    code_inner_frame = tk.Frame(code_frame, bg=frame_bg_color)
-    code_inner_frame.pack(fill=tk.BOTH, expand=True)
-
-    # Widget para los números de línea
-    line_numbers = tk.Text(code_inner_frame, width=5, height=10, bg=entry_bg_color, fg=entry_fg_color, padx=5, pady=2, wrap="none", state="disabled", font=("Courier", 12))
-    line_numbers.pack(side=tk.LEFT, fill=tk.Y)
-
-    # Widget de entrada para código
-    code_scrollbar = tk.Scrollbar(code_inner_frame, orient=tk.VERTICAL)
-    code_entry = tk.Text(code_inner_frame, wrap="word", height=10, width=30, yscrollcommand=code_scrollbar.set, bg=entry_bg_color, fg=entry_fg_color, insertbackground=entry_fg_color, font=("Courier", 12))
-    code_scrollbar.config(command=code_entry.yview)
-    code_scrollbar.pack_forget()  # Ocultar scrollbar
-    code_entry.pack(expand=True, fill=tk.BOTH)
-    code_entry.insert("1.0", initial_code)
-    
-    # Vinculamos la tecla Enter al método on_enter de sangría
-    code_entry.bind("<Return>", lambda event: on_enter(event, code_entry))
-
-       
-    paned_window.add(code_frame)
-
-    def update_line_numbers(event=None):
-        """Actualiza la numeración de líneas en el widget de los números de línea"""
-        code_text = code_entry.get("1.0", "end-1c")
-        lines = code_text.split("\n")
-
-        # Crear la numeración de líneas con un formato consistente
-        numbered_lines = [f"{i + 1:4}" for i in range(len(lines))]
-
-        line_numbers.config(state="normal")
-        line_numbers.delete("1.0", "end")
-        line_numbers.insert("1.0", "\n".join(numbered_lines))
-        line_numbers.config(state="disabled")
-        line_numbers.yview_moveto(code_entry.yview()[0])
-
-    def highlight_current_line(event=None):
+        if not file_path or self.loader is not None:
+            return
+        try:
+            content, _ = read_source(file_path)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo leer el archivo: {e}", parent=self.window)
+            return
+        self.code_entry.delete("1.0", tk.END)
+        if len(content) < LARGE_FILE_CHARS:
+            self.code_entry.insert("1.0", content)
+            self.file_loaded()
+            return
+
+        def cancel():
+            self.loader.cancel()
+            self.code_entry.delete("1.0", tk.END)
+            self.file_loaded()
+
+        self.load_progress = ProgressDialog(self.window, "Cargando archivo", f"Cargando {os.path.basename(file_path)}",
+                                            on_cancel=cancel, theme_name=self.theme_name)
+        self.loader = ChunkedInsert(self.code_entry, content, on_progress=self.load_progress.update,
+                                    on_done=self.file_loaded)
+        self.loader.start()
+
+    def file_loaded(self):
+        """Termina la carga de un archivo: numeración, resaltado y aviso si queda sin colores."""
+        if self.load_progress is not None:
+            self.load_progress.close()
+        self.loader = self.load_progress = None
+        self.code_entry.mark_set("insert", "1.0")
+        self.code_entry.see("1.0")
+        self.update_line_numbers()
+        self.highlighter.update()
+        self.schedule_lint()
+        suffix = " (archivo grande: sin resaltado de sintaxis)" if self.highlighter.plain else ""
+        self.window.title(f"Añadir/Editar Categoría - {self.category_name}{suffix}")
+
+    def update_line_numbers(self, event=None):
+        """Redibuja la numeración de las líneas visibles cuando Tk esté ocioso"""
+        self.line_numbers.schedule_redraw()
+
+    def zoom(self, step):
+        """Cambia el tamaño de la fuente del código (step 0: tamaño inicial)"""
+        size = tkfont.Font(font=self.code_entry.cget("font")).actual("size")
+        size = CODE_FONT_SIZE if step == 0 else min(MAX_FONT_SIZE, max(MIN_FONT_SIZE, size + step))
+        self.code_entry.config(font=("Courier", size))
+        self.update_line_numbers()
+        return "break"
+
+    def highlight_current_line(self, event=None):
         """Resalta la línea actual en el área de código"""
-        code_entry.tag_remove("current_line", 1.0, "end")
-        code_entry.tag_add("current_line", "insert linestart", "insert lineend+1c")
-        code_entry.tag_configure("current_line", background=highlight_color)
-
-    def syntax_highlight(event=None):
-        """Aplica resaltado de sintaxis al texto en el área de código"""
-        code_entry.mark_set("range_start", "1.0")
-        data = code_entry.get("1.0", "end-1c")
-        
-        for token, content in lex(data, PythonLexer()):
-            code_entry.mark_set("range_end", "range_start + %dc" % len(content))
-            code_entry.tag_add(str(token), "range_start", "range_end")
-            code_entry.mark_set("range_start", "range_end")
-
-        apply_syntax_theme()
-
-    def apply_syntax_theme():
-        """Aplica el tema de sintaxis según el tema seleccionado"""
-        style = get_style_by_name("monokai" if theme_name == "dark" else "default")
-        for token, options in style:
-            fg = options["color"]
-            if fg:
-                code_entry.tag_configure(str(token), foreground="#" + fg)
-            else:
-                code_entry.tag_configure(str(token), foreground=fg_color)
-
-    def sync_scroll(*args):
-        """Sincroniza el desplazamiento entre el código y los números de línea"""
-        code_entry.yview_moveto(args[0])
-        line_numbers.yview_moveto(args[0])
-
-    # Sincronizar desplazamiento entre la numeración y el área de código
-    code_entry.config(yscrollcommand=sync_scroll)
-    line_numbers.config(yscrollcommand=sync_scroll)
-
-    # Actualiza la numeración de líneas, resalta la línea actual y aplica resaltado de sintaxis al escribir en el código
-    code_entry.bind("<KeyRelease>", lambda event: (update_line_numbers(), highlight_current_line(), syntax_highlight()))
-    code_entry.bind("<MouseWheel>", update_line_numbers)  # Sincroniza al usar la rueda del ratón
-
-    # Mantener la sincronización del desplazamiento sin necesidad de eventos extra
-    code_entry.bind("<Configure>", update_line_numbers)  # Actualiza los números al cambiar el tamaño
-
-    def auto_scroll(event):
+        self.code_entry.tag_remove("current_line", 1.0, "end")
+        self.code_entry.tag_add("current_line", "insert linestart", "insert lineend+1c")
+
+    def syntax_highlight(self, event=None):
+        """Aplica resaltado de sintaxis a lo que haya cambiado en el área de código"""
+        self.highlighter.update()
+
+    def schedule_lint(self):
+        """Revisa el código cuando pasen LINT_DELAY_MS sin editar"""
+        self.lint_generation += 1
+        if self.lint_after_id is not None:
+            self.window.after_cancel(self.lint_after_id)
+        self.lint_after_id = self.window.after(LINT_DELAY_MS, self.run_lint)
+
+    def run_lint(self):
+        """Aplica el resultado guardado del código actual o lo pide al hilo de revisión"""
+        self.lint_after_id = None
+        if self.loader is not None or not self.exists():
+            return
+        code = self.code_entry.get("1.0", "end-1c")
+        diagnostics = cached_diagnostics(code)
+        if diagnostics is not None:
+            self.show_lint(diagnostics)
+            return
+        if self.lint_task is not None:
+            self.lint_task.cancel()
+        generation = self.lint_generation
+        task = self.lint_task = lint_worker(self.root).submit(check_code_cached, code)
+
+        def checked(diagnostics):
+            if self.lint_task is task:
+                self.lint_task = None
+            # Si se ha editado mientras tanto, ya hay otra revisión en camino
+            if generation == self.lint_generation and self.exists():
+                self.show_lint(diagnostics)
+
+        task.then(checked, lambda error: None)
+
+    def show_lint(self, diagnostics):
+        """Subraya los problemas encontrados y muestra el primero"""
+        self.diagnostics = diagnostics
+        self.code_entry.tag_remove("lint_error", "1.0", "end")
+        self.code_entry.tag_remove("lint_warning", "1.0", "end")
+        for line, column, end_column, message, severity in diagnostics:
+            end = f"{line}.{end_column}" if end_column is not None else f"{line}.0 lineend"
+            if self.code_entry.compare(f"{line}.{column}", ">=", end):
+                column, end = 0, f"{line}.0 lineend"  # Error al final de la línea: se subraya entera
+            self.code_entry.tag_add(f"lint_{severity}", f"{line}.{column}", end)
+        self.show_lint_message(diagnostics[0] if diagnostics else None)
+
+    def show_lint_message(self, diagnostic):
+        if diagnostic is None:
+            self.lint_label.config(text="")
+            return
+        line, _, _, message, severity = diagnostic
+        more = len(self.diagnostics) - 1
+        kind = "Error" if severity == ERROR else "Aviso"
+        self.lint_label.config(text=f"{kind} en la línea {line}: {message}" + (f" (y {more} más)" if more > 0 else ""))
+
+    def lint_hover(self, event):
+        """Muestra el problema de la línea sobre la que está el ratón"""
+        line = int(self.code_entry.index(f"@{event.x},{event.y}").split(".")[0])
+        for diagnostic in self.diagnostics:
+            if diagnostic[0] == line:
+                self.show_lint_message(diagnostic)
+                return
+
+    def on_key_release(self, event=None):
+        """Actualiza numeración, línea actual y colores tras una tecla (no durante una carga)."""
+        if self.loader is not None:
+            return
+        self.update_line_numbers()
+        self.highlight_current_line()
+        self.syntax_highlight()
+        self.schedule_lint()
+
+    def auto_scroll(self, event):
         """Permitir el desplazamiento automático del cursor"""
-        code_entry.see(tk.END)
-        update_line_numbers()
-        highlight_current_line()
-        syntax_highlight()
-
-    code_entry.bind("<KeyRelease-Return>", auto_scroll)
-
-    # Inicializar la numeración de líneas, el resaltado de la línea actual y el resaltado de sintaxis
-    update_line_numbers()
-    highlight_current_line()
-    syntax_highlight()
-
-    saved_title_code = {"title": "", "code": ""}
-    is_saved = False  # Variable para controlar si se ha guardado
-    
-    # Función que controla el cierre de la ventana
-    def on_close():
-        nonlocal is_saved
-        if not is_saved:  # Si no se ha guardado
-            editor_window.destroy()  # Cerrar la ventana
-        else:
-            editor_window.destroy()  # Si ya se guardó, se cierra normalmente
-
-    editor_window.protocol("WM_DELETE_WINDOW", on_close)  # Interceptar el evento de cierre
-
-    editor_window.wait_window()  # Esperar que se cierre la ventana
-    return saved_title_code["title"], saved_title_code["code"]
-
+        self.code_entry.see(tk.END)
+        self.update_line_numbers()
+        self.highlight_current_line()
+        self.syntax_highlight()
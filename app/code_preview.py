@@ -0,0 +1,186 @@
+import tkinter as tk
+from collections import OrderedDict
+from app.db_worker import TaskCancelled
+
+# Cuerpos de código que se conservan en memoria
+PREVIEW_CACHE_SIZE = 64
+
+# Límite de caracteres en caché (unos pocos fragmentos enormes no la llenan entera)
+PREVIEW_CACHE_CHARS = 2_000_000
+
+# Filas vecinas de la seleccionada cuyo código se precarga
+PREFETCH_RADIUS = 3
+
+# Texto mientras llega el código de la fila seleccionada
+LOADING_TEXT = "Cargando…"
+
+
+class CodeCache:
+    """
+    Caché LRU de cuerpos de código por id de categoría.
+
+    Está limitada tanto en número de entradas como en caracteres totales;
+    al superar cualquiera de los dos límites se descartan las entradas
+    usadas hace más tiempo.
+    """
+
+    def __init__(self, max_items=PREVIEW_CACHE_SIZE, max_chars=PREVIEW_CACHE_CHARS):
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self._items = OrderedDict()
+        self._chars = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """Devuelve el código de `key` (y lo marca como usado) o `default`."""
+        if key not in self._items:
+            return default
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key, code):
+        """Guarda el código de `key`; el código puede ser None (categoría sin código)."""
+        self.discard(key)
+        self._items[key] = code
+        self._chars += len(code or "")
+        while len(self._items) > 1 and (len(self._items) > self.max_items or self._chars > self.max_chars):
+            _, old = self._items.popitem(last=False)
+            self._chars -= len(old or "")
+
+    def discard(self, key):
+        """Quita `key` de la caché si está."""
+        if key in self._items:
+            self._chars -= len(self._items.pop(key) or "")
+
+    def clear(self):
+        """Vacía la caché."""
+        self._items.clear()
+        self._chars = 0
+
+
+class CodePreview(tk.Text):
+    """
+    Vista previa de solo lectura del código de la categoría seleccionada.
+
+    El código se pide a `load_codes` solo cuando hace falta, junto con el
+    de las filas vecinas, y se guarda en una CodeCache: al recorrer el
+    listado con las flechas, la siguiente fila ya suele estar en memoria y
+    se muestra al instante sin consultar la base de datos.
+    """
+
+    def __init__(self, master, load_codes, cache=None, **options):
+        """
+        :param master: Widget padre.
+        :param load_codes: Función `load_codes(ids)` que devuelve una tarea
+            (DatabaseTask) cuyo resultado es un diccionario id -> código.
+        :param cache: CodeCache a usar (por defecto, una nueva).
+        :param options: Opciones de `tk.Text` (tamaño, fuente...).
+        """
+        options.setdefault("wrap", tk.NONE)
+        options.setdefault("font", ("Courier", 10))
+        options.setdefault("height", 15)
+        options.setdefault("width", 50)
+        super().__init__(master, **options)
+        self.configure(state=tk.DISABLED)
+        self.load_codes = load_codes
+        self.cache = cache if cache is not None else CodeCache()
+        self._current = None
+        self._loading = {}  # id -> tarea que la está cargando
+        self._request = None  # (tarea, ids) de la última petición
+        self._generation = 0  # Cambia al invalidar: descarta respuestas antiguas
+        self._text = None  # Texto mostrado, para no redibujar si no cambia
+
+    def show(self, key, neighbours=()):
+        """
+        Muestra el código de `key` y precarga el de `neighbours`.
+
+        :param key: Id de la categoría (None para vaciar la vista).
+        :param neighbours: Ids de las filas cercanas, de la más a la menos próxima.
+        """
+        self._current = key
+        if key is None:
+            self._display("")
+            return
+        if key in self.cache:
+            self._display(self.cache.get(key) or "")
+        elif key not in self._loading:
+            self._display(LOADING_TEXT)
+        # La fila pedida va primero; las vecinas solo si no están ya en camino
+        wanted = dict.fromkeys((key, *neighbours))
+        missing = [
+            candidate for candidate in wanted
+            if candidate not in self.cache and candidate not in self._loading
+        ]
+        if missing:
+            self._fetch(missing, wanted)
+
+    def invalidate(self):
+        """Descarta el código en caché (los datos han cambiado) y recarga el visible."""
+        self.cache.clear()
+        self._generation += 1
+        if self._request is not None:
+            self._request[0].cancel()
+        self._loading.clear()
+        self._request = None
+        if self._current is not None:
+            self.show(self._current)
+
+    def _fetch(self, ids, wanted):
+        """
+        Pide el código de `ids`.
+
+        La petición anterior se cancela (si aún no ha empezado) cuando ya no
+        incluye ninguna fila de `wanted`, por ejemplo al saltar de página.
+        """
+        if self._request is not None and not any(key in wanted for key in self._request[1]):
+            self._request[0].cancel()
+        task = self.load_codes(ids)
+        for key in ids:
+            self._loading[key] = task
+        self._request = (task, ids)
+        generation = self._generation
+        task.then(
+            lambda codes: self._loaded(generation, task, ids, codes),
+            lambda error: self._failed(task, ids, error),
+        )
+
+    def _loaded(self, generation, task, ids, codes):
+        """Guarda el código recibido y lo muestra si es el de la fila actual."""
+        self._release(task, ids)
+        if generation != self._generation:
+            return  # Código leído antes de que cambiaran los datos
+        for key in ids:
+            self.cache.put(key, codes.get(key))
+        if self._current in ids:
+            self._display(self.cache.get(self._current) or "")
+
+    def _failed(self, task, ids, error):
+        """Libera las ids de una petición cancelada o fallida."""
+        self._release(task, ids)
+        if isinstance(error, TaskCancelled):
+            return
+        if self._current in ids and self._current not in self._loading:
+            self._display(f"Error al cargar el código: {error}")
+
+    def _release(self, task, ids):
+        """Marca las ids de una petición como ya no pendientes."""
+        if self._request is not None and self._request[0] is task:
+            self._request = None
+        for key in ids:
+            if self._loading.get(key) is task:
+                del self._loading[key]
+
+    def _display(self, text):
+        """Sustituye el texto de la vista (solo lectura para el usuario)."""
+        if text == self._text:
+            return
+        self._text = text
+        self.configure(state=tk.NORMAL)
+        self.delete("1.0", tk.END)
+        self.insert("1.0", text)
+        self.configure(state=tk.DISABLED)
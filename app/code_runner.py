@@ -0,0 +1,328 @@
+"""
+Ejecución de fragmentos de código en procesos de Python ya arrancados.
+
+Cada ejecución usa un proceso propio (`app.run_worker`) que recibe el
+código por su entrada estándar, precedido de su tamaño; la entrada sigue
+abierta después para lo que lea el código con `input()` (`send_input`).
+Su salida y sus errores se leen por tuberías mientras se producen, sin
+archivos temporales. El pool mantiene siempre algunos procesos arrancados
+y en espera, así que el coste de iniciar el intérprete no se paga al
+pulsar "Ejecutar" sino antes. Cada proceso ejecuta un solo fragmento: un
+concepto no puede dejar módulos, variables o el directorio de trabajo
+cambiados para el siguiente.
+
+No depende de Tkinter: los eventos de cada ejecución se dejan en una cola
+que la interfaz vacía desde su bucle (ver `app.output_pane`).
+"""
+import codecs
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from app.config import get_setting
+
+# Procesos arrancados y en espera (se puede cambiar con "runner_workers" en config.json)
+RUNNER_WORKERS = 2
+
+# Bytes leídos de cada tubería en cada paso
+READ_SIZE = 65536
+
+# Segundos que se espera a que termine un proceso en espera al cerrarlo
+RETIRE_TIMEOUT = 2
+
+# Raíz del proyecto: los procesos importan `app.run_worker` desde aquí
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_pool = None
+
+
+def runner_pool():
+    """Pool compartido por toda la aplicación (se crea y se llena la primera vez)."""
+    global _pool
+    if _pool is None:
+        _pool = RunnerPool(get_setting("runner_workers", RUNNER_WORKERS))
+        _pool.fill()
+    return _pool
+
+
+def shutdown_runner_pool():
+    """Cierra el pool compartido, si se llegó a crear."""
+    if _pool is not None:
+        _pool.shutdown()
+
+
+def _partial_marker(data, marker):
+    """Bytes del final de `data` que coinciden con el principio de `marker`."""
+    start = data.rfind(marker[:1], max(0, len(data) - len(marker) + 1))
+    if start >= 0 and marker.startswith(data[start:]):
+        return len(data) - start
+    return 0
+
+
+class RunnerPool:
+    """
+    Procesos de Python listos para ejecutar código.
+
+    `run` toma un proceso en espera (o arranca uno si no queda ninguno) y
+    repone el que se ha usado en segundo plano. Se pueden lanzar varias
+    ejecuciones a la vez: cada una tiene su proceso.
+    """
+
+    def __init__(self, size=RUNNER_WORKERS):
+        """
+        :param size: Procesos que se mantienen en espera.
+        """
+        self.size = max(0, size)
+        self._idle = []  # (proceso, testigo de su marca de tiempos)
+        self._active = []  # Ejecuciones lanzadas (se purgan al terminar)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self):
+        """Arranca un proceso de trabajo, que queda esperando el código."""
+        token = secrets.token_hex(16)
+        # Con el proyecto en PYTHONPATH funciona aunque la aplicación se lance desde
+        # otro directorio, que sigue siendo el de trabajo del código
+        path = os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get("PYTHONPATH")]))
+        env = dict(os.environ, PYTHONIOENCODING="utf-8", PYTHONUNBUFFERED="1", PYTHONPATH=path)
+        process = subprocess.Popen(
+            [sys.executable, "-u", "-m", "app.run_worker", token],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),  # Sin consola en Windows
+        )
+        return process, token
+
+    def fill(self):
+        """Arranca procesos hasta tener `size` en espera."""
+        while True:
+            with self._lock:
+                self._idle = [worker for worker in self._idle if worker[0].poll() is None]
+                if self._closed or len(self._idle) >= self.size:
+                    return
+            worker = self._spawn()
+            with self._lock:
+                if not self._closed and len(self._idle) < self.size:
+                    self._idle.append(worker)
+                    continue
+            self._retire(worker[0])  # Sobra
+            return
+
+    @staticmethod
+    def _retire(process):
+        """Cierra un proceso en espera: sin cabecera termina sin ejecutar nada."""
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(RETIRE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+    def run(self, code):
+        """
+        Ejecuta un fragmento de código.
+
+        :param code: Código Python.
+        :return: CodeRun con la salida y el resultado de la ejecución.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El pool de ejecución está cerrado.")
+            worker = None
+            while self._idle and worker is None:
+                candidate = self._idle.pop()
+                if candidate[0].poll() is None:
+                    worker = candidate
+            self._active = [run for run in self._active if not run.done]
+        if worker is None:
+            worker = self._spawn()  # Todos ocupados: se paga el arranque esta vez
+        code_run = CodeRun(*worker, code)
+        with self._lock:
+            self._active.append(code_run)
+        # Reponer el proceso usado sin hacer esperar a quien ejecuta
+        threading.Thread(target=self.fill, name="runner-fill", daemon=True).start()
+        return code_run
+
+    def shutdown(self):
+        """Termina los procesos en espera y detiene las ejecuciones en curso."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            active, self._active = self._active, []
+        for process, _ in idle:
+            self._retire(process)
+        for code_run in active:
+            code_run.stop()
+
+
+class CodeRun:
+    """
+    Una ejecución de código en un proceso de trabajo.
+
+    Dos hilos leen la salida estándar y la de errores mientras el código se
+    ejecuta y dejan en `events` tuplas ("stdout", texto) y ("stderr", texto);
+    al terminar el proceso llega ("done", ejecución). Entonces `returncode`,
+    `wall_time` (segundos) y `cpu_time` (segundos de CPU del código, o None
+    si el proceso no llegó a informar) tienen su valor.
+    """
+
+    def __init__(self, process, token, code):
+        """
+        :param process: Proceso de trabajo en espera (subprocess.Popen).
+        :param token: Testigo de la marca de tiempos de ese proceso.
+        :param code: Código a ejecutar.
+        """
+        self.process = process
+        self.events = queue.Queue()
+        self.returncode = None
+        self.wall_time = None
+        self.cpu_time = None
+        self.stopped = False
+        self._marker = b"\x1e" + token.encode("ascii") + b" "
+        self._times = None
+        self._started = time.perf_counter()
+        self._finished = threading.Event()
+        self._stdin_lock = threading.Lock()  # El código va antes que cualquier entrada
+        errors = threading.Thread(target=self._read, args=(process.stderr, "stderr"), name="runner-stderr", daemon=True)
+        errors.start()
+        threading.Thread(target=self._feed_and_read, args=(code, errors), name="runner-stdout", daemon=True).start()
+
+    @property
+    def done(self):
+        """Indica si el proceso ha terminado y se ha leído toda su salida."""
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        """Espera a que termine (no usar desde el hilo de Tk); devuelve si ha terminado."""
+        return self._finished.wait(timeout)
+
+    def stop(self):
+        """Detiene la ejecución matando su proceso."""
+        if self.process.poll() is None:
+            self.stopped = True
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+
+    def send_input(self, text):
+        """
+        Envía texto a la entrada estándar del proceso (lo que leerá `input()`).
+
+        :param text: Texto a enviar (normalmente una línea con su salto de línea).
+        :return: True si se ha enviado; False si el proceso ya no lee su entrada.
+        """
+        with self._stdin_lock:
+            try:
+                self.process.stdin.write(text.encode("utf-8"))
+                self.process.stdin.flush()
+            except (OSError, ValueError):
+                return False
+        return True
+
+    def close_input(self):
+        """Cierra la entrada estándar del proceso: `input()` recibirá EOFError."""
+        with self._stdin_lock:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+
+    def poll_events(self):
+        """Devuelve (sin esperar) los eventos llegados desde la última llamada."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _feed_and_read(self, code, errors):
+        """Envía el código, lee la salida estándar y cierra la ejecución (hilo propio)."""
+        data = code.encode("utf-8")
+        with self._stdin_lock:
+            try:
+                # El tamaño delante: la entrada no se cierra y queda para input()
+                self.process.stdin.write(b"%d\n" % len(data) + data)
+                self.process.stdin.flush()
+            except OSError:
+                pass  # El proceso ya no existe: se informa con su código de salida
+        self._read(self.process.stdout, "stdout")
+        errors.join()
+        self.returncode = self.process.wait()
+        self.close_input()
+        self.wall_time = time.perf_counter() - self._started
+        if self._times is not None:
+            try:
+                self.wall_time, self.cpu_time = map(float, self._times.split())
+            except ValueError:
+                pass
+        self.events.put(("done", self))
+        self._finished.set()
+
+    def _read(self, stream, name):
+        """
+        Pasa a `events` lo que llega por una tubería hasta que se cierra.
+
+        En la salida estándar se separa la marca final con los tiempos; lo
+        que podría ser el principio de la marca espera al trozo siguiente.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        marker = self._marker if name == "stdout" else None
+        pending = b""
+        while True:
+            try:
+                chunk = os.read(stream.fileno(), READ_SIZE)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                break
+            pending += chunk
+            if marker is not None:
+                index = pending.find(marker)
+                if index < 0:
+                    keep = _partial_marker(pending, marker)
+                    self._emit(name, decoder, pending[:len(pending) - keep])
+                    pending = pending[len(pending) - keep:]
+                    continue
+                self._emit(name, decoder, pending[:index])
+                end = pending.find(b"\n", index)
+                if end < 0:
+                    pending = pending[index:]
+                    continue
+                self._times = pending[index + len(marker):end].decode("ascii", "replace")
+                pending = pending[end + 1:]
+                marker = None
+            self._emit(name, decoder, pending)
+            pending = b""
+        self._emit(name, decoder, pending, final=True)
+        stream.close()
+
+    def _emit(self, name, decoder, data, final=False):
+        text = decoder.decode(data, final)
+        if text:
+            self.events.put((name, text))
+
+
+def describe_run(code_run):
+    """
+    Resumen de una ejecución terminada.
+
+    :param code_run: CodeRun terminada.
+    :return: Texto con el resultado y los tiempos.
+    """
+    if code_run.stopped:
+        status = "Detenido"
+    elif code_run.returncode == 0:
+        status = "Terminado"
+    else:
+        status = f"Terminado con código {code_run.returncode}"
+    cpu = f", CPU {code_run.cpu_time:.3f} s" if code_run.cpu_time is not None else ""
+    return f"{status} en {code_run.wall_time:.3f} s{cpu}"
@@ -3,25 +3,41 @@ import os
 
 CONFIG_FILE = "config.json"
 
+# Contenido de config.json: se lee del disco una sola vez por proceso
+_config = None
+
+def _read_config():
+    """Lee config.json como diccionario (vacío si no existe o no es válido)."""
+    global _config
+    if _config is None:
+        try:
+            with open(CONFIG_FILE, "r") as config_file:
+                config = json.load(config_file)
+        except OSError:
+            config = {}
+        except json.JSONDecodeError:
+            print("Error en el archivo de configuración. Usando tema predeterminado.")
+            config = {}
+        _config = config if isinstance(config, dict) else {}
+    return _config
+
 def save_config(theme_name):
-    """Guarda la configuración del tema en un archivo JSON."""
+    """Guarda la configuración del tema en un archivo JSON (conserva los demás ajustes)."""
+    global _config
+    config = dict(_read_config())
+    config["theme"] = theme_name
     with open(CONFIG_FILE, "w") as config_file:
-        json.dump({"theme": theme_name}, config_file)
+        json.dump(config, config_file)
+    _config = config
+
+def get_setting(name, default=None):
+    """Devuelve un ajuste opcional de config.json o `default` si no está definido."""
+    return _read_config().get(name, default)
 
 def load_config():
     """Carga la configuración del tema desde un archivo JSON o crea uno nuevo."""
-    if not os.path.exists(CONFIG_FILE):
+    if _config is None and not os.path.exists(CONFIG_FILE):
         save_config("light")  # Crea el archivo con el tema por defecto
         print("Config no encontrado. La opción por defecto es 'light'.")
         return "light"
-
-    try:
-        with open(CONFIG_FILE, "r") as config_file:
-            config = json.load(config_file)
-            theme = config.get("theme", "light")
-            return theme
-    except json.JSONDecodeError:
-        print("Error en el archivo de configuración. Usando tema predeterminado.")
-        # Si el archivo es corrupto, devolvemos el tema predeterminado
-        return "light"
-
+    return _read_config().get("theme", "light")
@@ -1,30 +1,257 @@
+import re
 import sqlite3  # Importación de sqlite3
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
 from .db_connection import DatabaseConnection
+from .fuzzy_index import FuzzySearch, FUZZY_LIMIT
+from .db_schema import (
+    CATEGORIES_TABLE, CODE_TABLE, CODE_COLUMNS, CODE_SOURCE, CHANGE_LOG_TABLE, CHANGE_LOG_SCHEMA,
+    FTS_TABLE, FTS_CONTENT_VIEW, FTS_TABLE_SQL, SPLIT_FTS_TABLE_SQL, FTS_TRIGGERS,
+    INLINE_FTS_SCHEMA, SPLIT_FTS_SCHEMA, SCHEMA_SPLIT,
+    code_text, decode_code, encode_code,
+)
+
+# Pesos bm25 por columna: una coincidencia en el nombre pesa más que en el código
+FTS_WEIGHTS = (10.0, 1.0)
+
+# Número de búsquedas recientes que se guardan en caché
+SEARCH_CACHE_SIZE = 128
+
+# Políticas para resolver conflictos de nombre al fusionar bases de datos
+MERGE_KEEP_LOCAL = "local"  # Se conserva la categoría local
+MERGE_TAKE_IMPORTED = "imported"  # Se sustituye por la importada
+MERGE_KEEP_NEWEST = "newest"  # Gana la modificada más recientemente
+MERGE_RENAME = "rename"  # La importada se añade con el sufijo RENAME_SUFFIX
+MERGE_POLICIES = (MERGE_KEEP_LOCAL, MERGE_TAKE_IMPORTED, MERGE_KEEP_NEWEST, MERGE_RENAME)
+RENAME_SUFFIX = " (importado)"
+
+# Tablas propias del esquema que nunca se copian tal cual al fusionar
+INTERNAL_TABLES = ("categories", "category_code", "sqlite_%", "categories_fts%", CHANGE_LOG_TABLE, "sync_%")
+
+# Filas por página al recorrer las categorías
+PAGE_SIZE = 500
+
+# Columnas que pueden pedirse a iter_categories y su expresión SQL
+CATEGORY_COLUMNS = {
+    "id": "c.id",
+    "name": "c.name",
+    "updated_at": "c.updated_at",
+    "code": CODE_COLUMNS,  # Se decodifica en Python (esquema dividido y compresión)
+}
+
+# Código vigente de la fila 'c' de la base de datos principal (ambos esquemas)
+LOCAL_CODE = (
+    "COALESCE((SELECT code_text(b.code, b.compressed) FROM main.category_code b "
+    "WHERE b.id = c.id), c.code)"
+)
 
 class DatabaseActions:
     """Clase para manejar acciones específicas en la base de datos."""
     
-    def __init__(self, db_name="conceptos.db"):
+    def __init__(self, db_name="conceptos.db", split_code=False, compress_code=True, **connection_options):
         """
         Inicializa las acciones de base de datos con una conexión establecida.
 
         :param db_name: Nombre del archivo de la base de datos.
+        :param split_code: Si es True, guarda el código en una tabla aparte de
+            los nombres (y migra la base de datos si aún no lo está).
+        :param compress_code: Comprime con zlib el código en el esquema dividido.
+        :param connection_options: Ajustes de `DatabaseConnection` (mmap_size,
+            cache_size, busy_timeout, cached_statements).
         """
-        self.db = DatabaseConnection(db_name)
+        self.db = DatabaseConnection(db_name, **connection_options)
+        self.db.register_function("code_text", 2, code_text)
+        self.db.register_function("code_pack", 1, lambda code: encode_code(code, self.compress_code)[0])
         self.db.connect()
+        self.compress_code = compress_code
+        # Cachés de lectura; se invalidan al cambiar la marca de versión. Son
+        # de cada hilo, como la conexión de la que depende esa marca
+        self._local_version = 0
+        self._version_lock = threading.Lock()
+        self._caches = threading.local()
+        # Índice de trigramas para la búsqueda aproximada (se crea al usarlo)
+        self.fuzzy_index = FuzzySearch(self)
         self.setup_database()
+        if split_code and not self.is_split_schema():
+            self.migrate_to_split(compress=compress_code)
 
     def setup_database(self):
         """Crea las tablas necesarias si no existen."""
-        query = """
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            code TEXT
-        )
-        """
-        self.db.execute(query)
+        self.db.execute(CATEGORIES_TABLE)
+        self.db.execute(CODE_TABLE)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(categories)")]
+        if "updated_at" not in columns:
+            # Bases de datos anteriores: la fecha de modificación queda vacía
+            self.db.execute("ALTER TABLE categories ADD COLUMN updated_at REAL")
         self.db.commit()
+        self.setup_change_log()
+        self.setup_fts()
+
+    def setup_change_log(self):
+        """
+        Crea el registro de cambios usado por la sincronización incremental.
+
+        Al crearlo en una base de datos que ya tiene categorías, se registra
+        cada una de ellas como cambio inicial, para que la primera
+        exportación incluya todo el contenido.
+        """
+        exists = self.db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHANGE_LOG_TABLE,)
+        ).fetchone()
+        with self.transaction():
+            for statement in CHANGE_LOG_SCHEMA:
+                self.db.execute(statement)
+            if not exists:
+                self.db.execute(f"""
+                INSERT INTO {CHANGE_LOG_TABLE} (name, op, changed_at)
+                SELECT name, 'upsert', COALESCE(updated_at, ?) FROM categories ORDER BY id
+                """, (time.time(),))
+            self.db.execute(
+                "INSERT OR IGNORE INTO sync_state (key, value) VALUES ('db_id', ?)", (uuid.uuid4().hex,)
+            )
+
+    def database_id(self):
+        """Identificador único y estable de esta base de datos (para la sincronización)."""
+        return self.db.execute("SELECT value FROM sync_state WHERE key = 'db_id'").fetchone()[0]
+
+    def is_split_schema(self):
+        """Indica si la base de datos usa el esquema con el código en tabla aparte."""
+        return self.db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_SPLIT
+
+    def setup_fts(self):
+        """
+        Crea el índice de texto completo (FTS5) y sus disparadores si no existen.
+
+        Si la tabla virtual no existe o no corresponde al esquema (por
+        ejemplo, la de una versión anterior), se crea de nuevo y se rellena a
+        partir de las categorías. Si la versión de SQLite no incluye FTS5, la
+        búsqueda vuelve a LIKE.
+        """
+        row = self.db.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).fetchone()
+        split = self.is_split_schema()
+        try:
+            with self.transaction():
+                # En línea el índice lee de la vista; en el esquema dividido guarda su texto
+                if row and (("content=" in row[0]) if split else (FTS_CONTENT_VIEW not in row[0])):
+                    row = None
+                if not row:
+                    self._create_fts(split)
+                else:
+                    for statement in SPLIT_FTS_SCHEMA if split else INLINE_FTS_SCHEMA:
+                        self.db.execute(statement)
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            self.fts_enabled = False
+
+    def _create_fts(self, split):
+        """Crea de nuevo el índice FTS5 del esquema indicado y lo rellena."""
+        self.db.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        self.db.execute(f"DROP VIEW IF EXISTS {FTS_CONTENT_VIEW}")
+        for trigger in FTS_TRIGGERS:
+            self.db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        if not split:
+            self.db.execute(FTS_TABLE_SQL)
+            for statement in INLINE_FTS_SCHEMA:
+                self.db.execute(statement)
+            self.db.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            return
+        self.db.execute(SPLIT_FTS_TABLE_SQL)
+        for statement in SPLIT_FTS_SCHEMA:
+            self.db.execute(statement)
+        self.db.execute(f"INSERT INTO {FTS_TABLE}(rowid, name, code) SELECT c.id, c.name, {LOCAL_CODE} FROM categories c")
+
+    def migrate_to_split(self, compress=True, batch_size=500, progress=None):
+        """
+        Migra la base de datos al esquema dividido sin dejar de atenderla.
+
+        Primero cambia el índice y sus disparadores (el código en línea
+        sigue siendo válido mientras tanto) y después mueve el código
+        a 'category_code' en lotes pequeños, cada uno en su propia
+        transacción, para no bloquear otras escrituras. Si se interrumpe,
+        basta con volver a llamarla. Para recuperar el espacio liberado en
+        disco, llama después a `vacuum()`.
+
+        :param compress: Comprime con zlib los cuerpos de código grandes.
+        :param batch_size: Filas movidas por transacción.
+        :param progress: Función opcional que recibe el número de filas movidas.
+        :return: Número de filas movidas en esta llamada.
+        """
+        if not self.is_split_schema():
+            with self.transaction():
+                if self.fts_enabled:
+                    self._create_fts(split=True)
+                self.db.execute(f"PRAGMA user_version = {SCHEMA_SPLIT}")
+
+        moved = 0
+        last_id = 0
+        select = "SELECT id, code FROM categories WHERE id > ? AND code IS NOT NULL ORDER BY id LIMIT ?"
+        while True:
+            with self.transaction():
+                rows = self.db.execute(select, (last_id, batch_size)).fetchall()
+                if not rows:
+                    break
+                self.db.executemany(
+                    "INSERT INTO category_code (id, code, compressed) VALUES (?, ?, ?) ON CONFLICT(id) DO NOTHING",
+                    ((category_id, *encode_code(code, compress)) for category_id, code in rows),
+                )
+                self.db.executemany(
+                    "UPDATE categories SET code = NULL WHERE id = ?",
+                    ((category_id,) for category_id, _ in rows),
+                )
+            last_id = rows[-1][0]
+            moved += len(rows)
+            if progress:
+                progress(moved)
+
+        if self.fts_enabled and moved:
+            self.db.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        self.invalidate_cache()
+        return moved
+
+    def vacuum(self):
+        """Compacta el archivo de la base de datos y recupera el espacio libre."""
+        self.db.execute("VACUUM")
+        # En modo WAL el archivo principal no se reduce hasta el checkpoint
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @staticmethod
+    def build_fts_query(search_term):
+        """
+        Convierte el texto del usuario en una consulta FTS5 segura.
+
+        Cada palabra se entrecomilla (para que operadores y signos no se
+        interpreten como sintaxis FTS) y se busca como prefijo.
+
+        :param search_term: Texto introducido por el usuario.
+        :return: Consulta MATCH o cadena vacía si no hay palabras.
+        """
+        words = re.findall(r"\w+", search_term)
+        return " ".join(f'"{word}"*' for word in words)
+
+    def search_fts(self, search_term, limit=100):
+        """
+        Busca en nombre y código usando el índice FTS5, ordenando por relevancia.
+
+        :param search_term: Término de búsqueda.
+        :param limit: Número máximo de resultados (None para no limitar).
+        :return: Lista de tuplas (id, nombre, fragmento) ordenadas por bm25.
+        """
+        match = self.build_fts_query(search_term)
+        if not match:
+            return []
+        query = f"""
+        SELECT rowid, name, snippet({FTS_TABLE}, -1, '[', ']', '…', 12)
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH ?
+        ORDER BY bm25({FTS_TABLE}, ?, ?)
+        LIMIT ?
+        """
+        return self.db.execute(query, (match, *FTS_WEIGHTS, -1 if limit is None else limit)).fetchall()
 
     def add_category(self, name, code=""):
         """
@@ -33,13 +260,47 @@ class DatabaseActions:
         :param name: Nombre de la categoría.
         :param code: Código asociado a la categoría (opcional).
         """
-        query = "INSERT INTO categories (name, code) VALUES (?, ?)"
         try:
-            self.db.execute(query, (name, code))
-            self.db.commit()
+            with self.transaction():
+                self._insert_category(name, code, self.is_split_schema())
+            self.invalidate_cache()
         except sqlite3.IntegrityError:
             raise ValueError(f"La categoría '{name}' ya existe.")
 
+    def _insert_category(self, name, code, split, updated_at=None):
+        """Inserta una fila respetando el esquema (en línea o dividido)."""
+        updated_at = time.time() if updated_at is None else updated_at
+        if not split:
+            query = "INSERT INTO categories (name, code, updated_at) VALUES (?, ?, ?)"
+            self.db.execute(query, (name, code, updated_at))
+            return
+        query = "INSERT INTO categories (name, code, updated_at) VALUES (?, NULL, ?)"
+        cursor = self.db.execute(query, (name, updated_at))
+        self._store_code(cursor.lastrowid, code)
+
+    def _set_code(self, category_id, code, split, updated_at=None):
+        """Reemplaza el código de una categoría existente respetando el esquema."""
+        updated_at = time.time() if updated_at is None else updated_at
+        if not split:
+            query = "UPDATE categories SET code = ?, updated_at = ? WHERE id = ?"
+            self.db.execute(query, (code, updated_at, category_id))
+            return
+        query = "UPDATE categories SET code = NULL, updated_at = ? WHERE id = ?"
+        self.db.execute(query, (updated_at, category_id))
+        self._store_code(category_id, code)
+
+    def _store_code(self, category_id, code):
+        """Guarda (o reemplaza) el cuerpo de código de una categoría en el esquema dividido."""
+        query = """
+        INSERT INTO category_code (id, code, compressed) VALUES (?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET code = excluded.code, compressed = excluded.compressed
+        """
+        stored, compressed = encode_code(code, self.compress_code)
+        self.db.execute(query, (category_id, stored, compressed))
+        if compressed and self.fts_enabled:
+            # Los disparadores no pueden leer el código comprimido
+            self.db.execute(f"UPDATE {FTS_TABLE} SET code = ? WHERE rowid = ?", (code, category_id))
+
     def edit_category(self, old_name, new_name, new_code):
         """
         Edita una categoría existente.
@@ -48,9 +309,20 @@ class DatabaseActions:
         :param new_name: Nuevo nombre de la categoría.
         :param new_code: Nuevo código asociado a la categoría.
         """
-        query = "UPDATE categories SET name = ?, code = ? WHERE name = ?"
-        self.db.execute(query, (new_name, new_code, old_name))
-        self.db.commit()
+        try:
+            with self.transaction():
+                if not self.is_split_schema():
+                    query = "UPDATE categories SET name = ?, code = ?, updated_at = ? WHERE name = ?"
+                    self.db.execute(query, (new_name, new_code, time.time(), old_name))
+                else:
+                    row = self.db.execute("SELECT id FROM categories WHERE name = ?", (old_name,)).fetchone()
+                    if row:
+                        query = "UPDATE categories SET name = ?, code = NULL, updated_at = ? WHERE id = ?"
+                        self.db.execute(query, (new_name, time.time(), row[0]))
+                        self._store_code(row[0], new_code)
+            self.invalidate_cache()
+        except sqlite3.IntegrityError:
+            raise ValueError(f"La categoría '{new_name}' ya existe.")
 
     def delete_category(self, name):
         """
@@ -61,6 +333,121 @@ class DatabaseActions:
         query = "DELETE FROM categories WHERE name = ?"
         self.db.execute(query, (name,))
         self.db.commit()
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Marca como obsoletas las cachés de lectura tras una escritura local."""
+        with self._version_lock:
+            self._local_version += 1
+
+    def _thread_caches(self):
+        """Cachés de lectura del hilo actual (se crean la primera vez)."""
+        caches = self._caches
+        if not hasattr(caches, "search"):
+            caches.list = None
+            caches.ids = None
+            caches.search = OrderedDict()
+            caches.search_stamp = None
+        return caches
+
+    def change_stamp(self):
+        """
+        Devuelve una marca barata que cambia cuando cambian los datos.
+
+        Combina un contador de escrituras locales con `PRAGMA data_version`,
+        que avanza cuando otra conexión (otro hilo u otro proceso) confirma
+        cambios en el archivo. Dos marcas iguales garantizan que no hubo
+        cambios, por lo que la interfaz puede evitar redibujar.
+
+        :return: Tupla comparable con la marca de versión actual.
+        """
+        data_version = self.db.execute("PRAGMA data_version").fetchone()[0]
+        return (self._local_version, id(self.db.connection), data_version)
+
+    def transaction(self, mode="IMMEDIATE"):
+        """
+        Agrupa varias llamadas de escritura en un único COMMIT.
+
+        Uso: `with db_actions.transaction(): ...`. Si ocurre una excepción
+        dentro del bloque, no se guarda ninguno de los cambios. Con
+        mode="DEFERRED" sirve también para leer una instantánea coherente.
+        """
+        return self.db.transaction(mode)
+
+    def add_many(self, categories):
+        """
+        Añade muchas categorías en una sola transacción.
+
+        :param categories: Iterable de tuplas (nombre, código); puede ser un generador.
+        :return: Número de categorías añadidas.
+        """
+        query = "INSERT INTO categories (name, code, updated_at) VALUES (?, ?, ?)"
+        now = time.time()
+        try:
+            with self.transaction():
+                if not self.is_split_schema():
+                    rows = ((name, code, now) for name, code in categories)
+                    return self.db.executemany(query, rows).rowcount
+                count = 0
+                for name, code in categories:
+                    self._insert_category(name, code, True)
+                    count += 1
+                return count
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"No se pudieron añadir las categorías: {e}")
+        finally:
+            self.invalidate_cache()
+
+    def upsert_many(self, categories):
+        """
+        Añade o actualiza muchas categorías en una sola transacción.
+
+        Si ya existe una categoría con el mismo nombre, se reemplaza su código.
+
+        :param categories: Iterable de tuplas (nombre, código); puede ser un generador.
+        :return: Número de filas insertadas o actualizadas.
+        """
+        query = """
+        INSERT INTO categories (name, code, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET code = excluded.code, updated_at = excluded.updated_at
+        """
+        now = time.time()
+        try:
+            with self.transaction():
+                if not self.is_split_schema():
+                    rows = ((name, code, now) for name, code in categories)
+                    return self.db.executemany(query, rows).rowcount
+                count = 0
+                for name, code in categories:
+                    self._upsert_split(name, code)
+                    count += 1
+                return count
+        finally:
+            self.invalidate_cache()
+
+    def _upsert_split(self, name, code):
+        """Añade o actualiza una categoría en el esquema dividido."""
+        self.db.execute(
+            "INSERT INTO categories (name, code, updated_at) VALUES (?, NULL, ?) "
+            "ON CONFLICT(name) DO UPDATE SET code = NULL, updated_at = excluded.updated_at",
+            (name, time.time()),
+        )
+        category_id = self.db.execute("SELECT id FROM categories WHERE name = ?", (name,)).fetchone()[0]
+        self._store_code(category_id, code)
+
+    def delete_many(self, names):
+        """
+        Elimina muchas categorías en una sola transacción.
+
+        :param names: Iterable con los nombres de las categorías a eliminar.
+        :return: Número de categorías eliminadas.
+        """
+        query = "DELETE FROM categories WHERE name = ?"
+        try:
+            with self.transaction():
+                return self.db.executemany(query, ((name,) for name in names)).rowcount
+        finally:
+            self.invalidate_cache()
 
     def fetch_categories_from_db(self):
         """
@@ -68,75 +455,433 @@ class DatabaseActions:
 
         :return: Lista de tuplas con (nombre, código).
         """
-        query = "SELECT name, code FROM categories"
-        return self.db.execute(query).fetchall()
+        return list(self.iter_categories(columns=("name", "code")))
+
+    def fetch_page(self, after_id=None, limit=PAGE_SIZE, columns=("id", "name", "code")):
+        """
+        Recupera una página de categorías ordenadas por id, sin OFFSET.
+
+        La página empieza justo después de `after_id` (paginación por clave),
+        por lo que cuesta lo mismo al principio que al final de la tabla y no
+        salta ni repite filas aunque se añadan o borren otras entre páginas.
+
+        :param after_id: Id de la última fila de la página anterior (None para empezar).
+        :param limit: Número máximo de filas.
+        :param columns: Columnas de cada fila, entre las de CATEGORY_COLUMNS.
+        :return: Tupla (filas, id de la última fila o None si la página está vacía).
+        """
+        page = self._fetch_page(after_id, limit, columns)
+        if not page:
+            return [], None
+        return [row for _, row in page], page[-1][0]
+
+    def _fetch_page(self, after_id, limit, columns):
+        """Como `fetch_page`, pero devuelve pares (id, fila) para seguir la posición fila a fila."""
+        unknown = [column for column in columns if column not in CATEGORY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas: {', '.join(unknown)}")
+        source = CODE_SOURCE if "code" in columns else "categories c"
+        select = ", ".join(["c.id"] + [CATEGORY_COLUMNS[column] for column in columns])
+        query = f"SELECT {select} FROM {source} WHERE c.id > ? ORDER BY c.id LIMIT ?"
+        raw = self.db.execute(query, (after_id or 0, limit)).fetchall()
+        if "code" not in columns:
+            return [(row[0], row[1:]) for row in raw]
+        # La columna 'code' ocupa tres posiciones (en línea, guardado, comprimido)
+        position = 1 + columns.index("code")
+        return [
+            (row[0], row[1:position] + (decode_code(*row[position:position + 3]),) + row[position + 3:])
+            for row in raw
+        ]
+
+    def iter_categories(self, batch_size=PAGE_SIZE, after_id=None, columns=("id", "name", "code")):
+        """
+        Recorre las categorías por orden de id, página a página.
+
+        Solo hay una página en memoria a la vez y cada página es una consulta
+        independiente, así que no se mantiene ninguna transacción abierta
+        entre páginas.
+
+        :param batch_size: Filas leídas por consulta.
+        :param after_id: Empieza después de esta id (para reanudar un recorrido).
+        :param columns: Columnas de cada fila, entre las de CATEGORY_COLUMNS.
+        :return: Generador de tuplas con las columnas pedidas.
+        """
+        while True:
+            rows, after_id = self.fetch_page(after_id, batch_size, columns)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+
+    def cursor(self, batch_size=PAGE_SIZE, after_id=None, columns=("id", "name", "code")):
+        """
+        Crea un cursor reanudable sobre las categorías.
+
+        :return: CategoryCursor que empieza después de `after_id`.
+        """
+        return CategoryCursor(self, batch_size, after_id, columns)
+
+    def list_categories(self):
+        """
+        Recupera solo los identificadores y nombres de las categorías.
+
+        No lee el código, por lo que es la consulta adecuada para los listados.
+
+        El resultado se guarda en caché hasta que cambia `change_stamp()`;
+        no debe modificarse.
+
+        :return: Tupla de tuplas (id, nombre) ordenadas por id.
+        """
+        stamp = self.change_stamp()
+        caches = self._thread_caches()
+        if caches.list is not None and caches.list[0] == stamp:
+            return caches.list[1]
+        query = "SELECT id, name FROM categories ORDER BY id"
+        rows = tuple(self.db.execute(query).fetchall())
+        caches.list = (stamp, rows)
+        return rows
+
+    def list_ids(self):
+        """
+        Recupera solo los identificadores de las categorías, ordenados.
+
+        Es lo único que necesita un listado virtual para saber cuántas filas
+        hay y en qué orden; los nombres se piden por tramos con `fetch_names`.
+        Se guardan en un array de enteros (8 bytes por fila) y en caché hasta
+        que cambia `change_stamp()`; no debe modificarse.
+
+        :return: array('q') con las ids en orden ascendente.
+        """
+        stamp = self.change_stamp()
+        caches = self._thread_caches()
+        if caches.ids is not None and caches.ids[0] == stamp:
+            return caches.ids[1]
+        ids = array("q", (row[0] for row in self.db.execute("SELECT id FROM categories ORDER BY id")))
+        caches.ids = (stamp, ids)
+        return ids
+
+    def fetch_names(self, first_id, last_id):
+        """
+        Recupera los nombres de las categorías con id en un intervalo.
+
+        :param first_id: Primera id del tramo (incluida).
+        :param last_id: Última id del tramo (incluida).
+        :return: Lista de tuplas (id, nombre) ordenadas por id.
+        """
+        query = "SELECT id, name FROM categories WHERE id BETWEEN ? AND ? ORDER BY id"
+        return self.db.execute(query, (first_id, last_id)).fetchall()
+
+    def get_code(self, name):
+        """
+        Recupera el código de una única categoría usando el índice del nombre.
+
+        :param name: Nombre de la categoría.
+        :return: Código asociado o None si la categoría no existe.
+        """
+        query = f"SELECT {CODE_COLUMNS} FROM {CODE_SOURCE} WHERE c.name = ?"
+        row = self.db.execute(query, (name,)).fetchone()
+        return decode_code(*row) if row else None
+
+    def get_codes(self, ids):
+        """
+        Recupera el código de varias categorías en una sola consulta.
+
+        :param ids: Identificadores de las categorías.
+        :return: Diccionario id -> código (las ids que no existen no aparecen).
+        """
+        codes = {}
+        ids = list(ids)
+        # Por debajo del límite de parámetros de SQLite
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT c.id, {CODE_COLUMNS} FROM {CODE_SOURCE} WHERE c.id IN ({placeholders})"
+            for row in self.db.execute(query, chunk):
+                codes[row[0]] = decode_code(*row[1:])
+        return codes
+
+    def get_by_id(self, category_id):
+        """
+        Recupera una categoría por su clave primaria.
+
+        :param category_id: Identificador de la categoría.
+        :return: Tupla (id, nombre, código) o None si no existe.
+        """
+        query = f"SELECT c.id, c.name, {CODE_COLUMNS} FROM {CODE_SOURCE} WHERE c.id = ?"
+        row = self.db.execute(query, (category_id,)).fetchone()
+        return (row[0], row[1], decode_code(*row[2:])) if row else None
 
     def search_category(self, search_term):
         """
-        Busca categorías por nombre.
+        Busca categorías por nombre y código, ordenadas por relevancia.
 
         :param search_term: Término de búsqueda.
-        :return: Lista de tuplas con los nombres de las categorías que coinciden.
+        :return: Lista de tuplas (nombre, fragmento) de las categorías que coinciden.
         """
-        query = "SELECT name FROM categories WHERE LOWER(name) LIKE ?"
-        return self.db.execute(query, (f"%{search_term.lower()}%",)).fetchall()
+        return [(name, excerpt) for _, name, excerpt in self.search_with_ids(search_term)]
+
+    def search_with_ids(self, search_term):
+        """
+        Igual que `search_category`, pero incluye la id de cada categoría.
+
+        El resultado se guarda en caché hasta que cambia `change_stamp()`;
+        no debe modificarse.
+
+        :param search_term: Término de búsqueda.
+        :return: Lista de tuplas (id, nombre, fragmento) ordenadas por relevancia.
+        """
+        stamp = self.change_stamp()
+        caches = self._thread_caches()
+        if stamp != caches.search_stamp:
+            caches.search.clear()
+            caches.search_stamp = stamp
+        cached = caches.search.get(search_term)
+        if cached is not None:
+            caches.search.move_to_end(search_term)
+            return cached
+
+        if self.fts_enabled and self.build_fts_query(search_term):
+            results = self.search_fts(search_term, limit=None)
+        else:
+            query = "SELECT id, name, NULL FROM categories WHERE LOWER(name) LIKE ?"
+            results = self.db.execute(query, (f"%{search_term.lower()}%",)).fetchall()
+
+        caches.search[search_term] = results
+        if len(caches.search) > SEARCH_CACHE_SIZE:
+            caches.search.popitem(last=False)
+        return results
     
-    def update_category_list(self):
-        """Actualiza la lista de categorías en la interfaz, recuperando los nombres desde la base de datos."""
-        query = "SELECT name FROM categories"
-        return self.db.execute(query).fetchall()
+    def fuzzy_search(self, search_term, limit=FUZZY_LIMIT):
+        """
+        Busca categorías por parecido, tolerando faltas de ortografía.
+
+        Compara los trigramas del término con los del nombre de cada
+        categoría y con los identificadores de su código, de modo que
+        "dicionary comprehesion" encuentra "Dictionary comprehension".
+
+        :param search_term: Término de búsqueda.
+        :param limit: Número máximo de resultados.
+        :return: Lista de tuplas (id, nombre, puntuación) de mayor a menor parecido.
+        """
+        return self.fuzzy_index.search(search_term, limit)
 
     def close(self):
         """Cierra la conexión a la base de datos."""
         self.db.close()
 
-    def fusionar_base_datos(self, db_path, imported_db_path):
+    def _move_inline_code(self, condition, params=()):
+        """
+        Pasa a 'category_code' el código en línea de las filas que cumplen la condición.
+
+        Se usa en el esquema dividido tras escrituras masivas hechas con
+        INSERT/UPDATE ... SELECT, que dejan el código en la columna en línea.
+        """
+        self.db.execute(f"""
+        INSERT INTO category_code (id, code, compressed)
+        SELECT id, packed, typeof(packed) = 'blob'
+        FROM (SELECT id, code_pack(code) AS packed FROM categories WHERE {condition})
+        WHERE true
+        ON CONFLICT(id) DO UPDATE SET code = excluded.code, compressed = excluded.compressed
+        """, params)
+        self.db.execute(f"UPDATE categories SET code = NULL WHERE code IS NOT NULL AND {condition}", params)
+
+    def merge_database(self, imported_db_path, policy=MERGE_KEEP_LOCAL):
+        """
+        Fusiona otra base de datos de conceptos con la actual.
+
+        La base de datos importada se adjunta con ATTACH a la conexión actual
+        y se copia con sentencias INSERT/UPDATE ... SELECT dentro de una única
+        transacción, sin cargar sus filas en Python.
+
+        :param imported_db_path: Ruta de la base de datos importada.
+        :param policy: Qué hacer cuando un nombre existe en ambas con distinto
+            código: MERGE_KEEP_LOCAL, MERGE_TAKE_IMPORTED, MERGE_KEEP_NEWEST o MERGE_RENAME.
+        :return: Diccionario {tabla: {"inserted", "updated", "renamed", "skipped"}}.
+        """
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"Política de fusión desconocida: {policy}")
+
+        self.db.execute("ATTACH DATABASE ? AS imported", (imported_db_path,))
+        try:
+            with self.transaction():
+                counts = {}
+                imported_tables = {
+                    row[0] for row in self.db.execute(
+                        "SELECT name FROM imported.sqlite_master WHERE type = 'table'"
+                    )
+                }
+                if "categories" in imported_tables:
+                    counts["categories"] = self._merge_categories(imported_tables, policy)
+                for table in self._mergeable_tables(imported_tables):
+                    counts[table] = self._merge_plain_table(table)
+        finally:
+            self.db.execute("DROP VIEW IF EXISTS temp.merge_source")
+            self.db.execute("DROP TABLE IF EXISTS temp.merge_update")
+            self.db.execute("DETACH DATABASE imported")
+            self.invalidate_cache()
+        return counts
+
+    def _merge_categories(self, imported_tables, policy):
+        """Fusiona la tabla de categorías según la política de conflictos."""
+        imported_columns = {row[1] for row in self.db.execute("PRAGMA imported.table_info(categories)")}
+        if "category_code" in imported_tables:
+            code_expr = "COALESCE(code_text(ib.code, ib.compressed), ic.code)"
+            join = "LEFT JOIN imported.category_code ib ON ib.id = ic.id"
+        else:
+            code_expr, join = "ic.code", ""
+        updated_expr = "ic.updated_at" if "updated_at" in imported_columns else "NULL"
+        self.db.execute(f"""
+        CREATE TEMP VIEW merge_source AS
+        SELECT ic.name AS name, {code_expr} AS code, {updated_expr} AS updated_at
+        FROM imported.categories ic {join}
+        """)
+        split = self.is_split_schema()
+        total = self.db.execute("SELECT COUNT(*) FROM temp.merge_source").fetchone()[0]
+        last_id = self.db.execute("SELECT COALESCE(MAX(id), 0) FROM main.categories").fetchone()[0]
+        result = {"inserted": 0, "updated": 0, "renamed": 0, "skipped": 0}
+        conflict = f"c.name = s.name AND {LOCAL_CODE} IS NOT s.code"
+
+        if policy in (MERGE_TAKE_IMPORTED, MERGE_KEEP_NEWEST):
+            newer = " AND COALESCE(s.updated_at, 0) > COALESCE(c.updated_at, 0)" if policy == MERGE_KEEP_NEWEST else ""
+            self.db.execute("CREATE TEMP TABLE merge_update (id INTEGER PRIMARY KEY)")
+            self.db.execute(f"""
+            INSERT INTO temp.merge_update (id)
+            SELECT c.id FROM main.categories c JOIN temp.merge_source s ON {conflict}{newer}
+            """)
+            result["updated"] = self.db.execute("""
+            UPDATE main.categories SET code = s.code, updated_at = s.updated_at
+            FROM temp.merge_source s
+            WHERE categories.id IN (SELECT id FROM temp.merge_update) AND s.name = categories.name
+            """).rowcount
+            if split:
+                self._move_inline_code("id IN (SELECT id FROM temp.merge_update)")
+
+        result["inserted"] = self.db.execute("""
+        INSERT INTO main.categories (name, code, updated_at)
+        SELECT s.name, s.code, s.updated_at FROM temp.merge_source s
+        WHERE NOT EXISTS (SELECT 1 FROM main.categories c WHERE c.name = s.name)
+        ON CONFLICT(name) DO NOTHING
+        """).rowcount
+
+        if policy == MERGE_RENAME:
+            result["renamed"] = self.db.execute(f"""
+            INSERT INTO main.categories (name, code, updated_at)
+            SELECT s.name || ?, s.code, s.updated_at
+            FROM temp.merge_source s JOIN main.categories c ON {conflict} AND c.id <= ?
+            WHERE true
+            ON CONFLICT(name) DO NOTHING
+            """, (RENAME_SUFFIX, last_id)).rowcount
+
+        if split:
+            self._move_inline_code("id > ?", (last_id,))
+        result["skipped"] = total - result["inserted"] - result["updated"] - result["renamed"]
+        return result
+
+    def _mergeable_tables(self, imported_tables):
+        """Tablas de usuario presentes en ambas bases de datos, sin las internas del esquema."""
+        local_tables = {
+            row[0] for row in self.db.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")
+        }
+        internal = [f"name LIKE '{pattern}'" if "%" in pattern else f"name = '{pattern}'" for pattern in INTERNAL_TABLES]
+        excluded = {
+            row[0] for row in self.db.execute(
+                f"SELECT name FROM main.sqlite_master WHERE type = 'table' AND ({' OR '.join(internal)})"
+            )
+        }
+        return sorted((imported_tables & local_tables) - excluded)
+
+    def _merge_plain_table(self, table):
+        """Copia las filas de una tabla auxiliar con INSERT OR IGNORE sobre las columnas comunes."""
+        local_columns = [row[1] for row in self.db.execute(f'PRAGMA main.table_info("{table}")')]
+        imported_columns = {row[1] for row in self.db.execute(f'PRAGMA imported.table_info("{table}")')}
+        columns = ", ".join(f'"{column}"' for column in local_columns if column in imported_columns)
+        total = self.db.execute(f'SELECT COUNT(*) FROM imported."{table}"').fetchone()[0]
+        inserted = self.db.execute(
+            f'INSERT OR IGNORE INTO main."{table}" ({columns}) SELECT {columns} FROM imported."{table}"'
+        ).rowcount
+        return {"inserted": inserted, "updated": 0, "renamed": 0, "skipped": total - inserted}
+
+    def fusionar_base_datos(self, db_path, imported_db_path, policy=MERGE_KEEP_LOCAL):
         """
         Fusiona los datos de una base de datos SQLite importada con la base de datos actual.
 
         Parámetros:
-            db_path (str): Ruta de la base de datos actual.
+            db_path (str): Ruta de la base de datos actual (se usa la conexión ya abierta).
             imported_db_path (str): Ruta de la base de datos importada.
+            policy (str): Política de conflictos, ver `merge_database`.
 
         Retorno:
             str: Mensaje de éxito o error para informar el resultado de la operación.
         """
         try:
-            # Conectar a la base de datos actual
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
-            # Conectar a la base de datos importada
-            imported_conn = sqlite3.connect(imported_db_path)
-            imported_cursor = imported_conn.cursor()
-
-            # Obtener todas las tablas de la base de datos importada
-            imported_cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = [table[0] for table in imported_cursor.fetchall()]
-
-            for table_name in tables:
-                # Leer datos de la tabla importada
-                imported_cursor.execute(f"SELECT * FROM {table_name}")
-                rows = imported_cursor.fetchall()
-
-                # Obtener columnas de la tabla
-                imported_cursor.execute(f"PRAGMA table_info({table_name})")
-                columns = [col[1] for col in imported_cursor.fetchall()]
-                column_list = ", ".join(columns)
-                placeholders = ", ".join(["?"] * len(columns))
-
-                # Insertar datos en la base de datos actual, evitando duplicados
-                for row in rows:
-                    cursor.execute(
-                        f"INSERT OR IGNORE INTO {table_name} ({column_list}) VALUES ({placeholders})", 
-                        row
-                    )
-
-            # Guardar los cambios y cerrar conexiones
-            conn.commit()
-            imported_conn.close()
-            conn.close()
-
-            return "Los datos de la base de datos importada se fusionaron correctamente."
+            counts = self.merge_database(imported_db_path, policy)
         except Exception as e:
             return f"Ocurrió un error al fusionar la base de datos: {e}"
+        return describe_merge(counts)
+
+
+class CategoryCursor:
+    """
+    Recorrido de las categorías que puede guardarse y reanudarse.
+
+    Su posición es solo la id de la última fila entregada (`after_id`), sin
+    desplazamientos: basta con guardarla y crear otro cursor con ella para
+    continuar donde se dejó, aunque la tabla haya cambiado entre medias.
+    """
+
+    def __init__(self, db_actions, batch_size=PAGE_SIZE, after_id=None, columns=("id", "name", "code")):
+        """
+        :param db_actions: Instancia de DatabaseActions.
+        :param batch_size: Filas por página.
+        :param after_id: Posición inicial (None para empezar desde el principio).
+        :param columns: Columnas de cada fila, entre las de CATEGORY_COLUMNS.
+        """
+        self.db_actions = db_actions
+        self.batch_size = batch_size
+        self.after_id = after_id
+        self.columns = tuple(columns)
+        self.exhausted = False
+
+    def _next(self):
+        """Lee la siguiente página como pares (id, fila) sin avanzar la posición."""
+        if self.exhausted:
+            return []
+        page = self.db_actions._fetch_page(self.after_id, self.batch_size, self.columns)
+        if len(page) < self.batch_size:
+            self.exhausted = True
+        return page
+
+    def next_page(self):
+        """
+        Devuelve la siguiente página y avanza la posición hasta su última fila.
+
+        :return: Lista de filas (vacía cuando ya no quedan más).
+        """
+        page = self._next()
+        if page:
+            self.after_id = page[-1][0]
+        return [row for _, row in page]
+
+    def __iter__(self):
+        """Recorre las filas restantes; la posición avanza con cada fila entregada."""
+        while True:
+            for category_id, row in self._next():
+                self.after_id = category_id
+                yield row
+            if self.exhausted:
+                return
+
+
+def describe_merge(counts):
+    """
+    Redacta el resumen de una fusión para mostrarlo al usuario.
+
+    :param counts: Diccionario devuelto por `DatabaseActions.merge_database`.
+    :return: Texto con una línea por tabla.
+    """
+    lines = ["Los datos de la base de datos importada se fusionaron correctamente."]
+    for table, result in counts.items():
+        lines.append(
+            f"{table}: {result['inserted']} añadidos, {result['updated']} actualizados, "
+            f"{result['renamed']} renombrados, {result['skipped']} omitidos"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,178 @@
+import os
+import sqlite3
+import time
+
+# Páginas copiadas en cada paso de la copia; entre pasos los demás hilos
+# pueden seguir usando la base de datos
+BACKUP_PAGES_PER_STEP = 256
+
+# Número de copias que se conservan al rotar
+BACKUP_KEEP = 7
+
+BACKUP_SUFFIX = ".db"
+_PARTIAL_SUFFIX = ".part"
+
+
+def default_backup_dir(db_name):
+    """Carpeta 'backups' junto al archivo de la base de datos."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_name)), "backups")
+
+
+def _backup_prefix(db_name):
+    """Prefijo de los archivos de copia: el nombre de la base de datos sin extensión."""
+    return os.path.splitext(os.path.basename(db_name))[0] + "-"
+
+
+def list_backups(db_name, backup_dir=None):
+    """
+    Lista las copias de seguridad de una base de datos, de la más reciente a la más antigua.
+
+    :param db_name: Archivo de la base de datos original.
+    :param backup_dir: Carpeta de copias (por defecto, `default_backup_dir`).
+    :return: Lista de rutas.
+    """
+    backup_dir = backup_dir or default_backup_dir(db_name)
+    if not os.path.isdir(backup_dir):
+        return []
+    prefix = _backup_prefix(db_name)
+    names = [
+        name for name in os.listdir(backup_dir)
+        if name.startswith(prefix) and name.endswith(BACKUP_SUFFIX)
+    ]
+
+    def order(name):
+        # Fecha y hora en formato ordenable y, si hubo varias copias en el
+        # mismo segundo, un contador detrás
+        parts = name[len(prefix):-len(BACKUP_SUFFIX)].split("-")
+        counter = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
+        return parts[:2], counter
+
+    return [os.path.join(backup_dir, name) for name in sorted(names, key=order, reverse=True)]
+
+
+def rotate_backups(db_name, keep=BACKUP_KEEP, backup_dir=None):
+    """
+    Borra las copias más antiguas y conserva solo las `keep` más recientes.
+
+    :return: Lista de rutas eliminadas.
+    """
+    removed = []
+    for path in list_backups(db_name, backup_dir)[max(keep, 1):]:
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            pass
+    return removed
+
+
+def backup_database(db_actions, destination=None, pages=BACKUP_PAGES_PER_STEP,
+                    keep=BACKUP_KEEP, task=None, sleep=0.0):
+    """
+    Crea una copia de seguridad en caliente con la API de copia de SQLite.
+
+    La copia usa una conexión propia que mantiene abierta una transacción de
+    lectura: en modo WAL el resultado es una instantánea coherente y las
+    escrituras de la aplicación no se bloquean ni obligan a reiniciar la
+    copia. Se escribe en un archivo temporal que se renombra al terminar.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param destination: Ruta de la copia. Por defecto se crea una con fecha en
+        la carpeta de copias y después se rotan las antiguas.
+    :param pages: Páginas por paso (-1 copia todo de una vez).
+    :param keep: Copias que se conservan al rotar (solo sin `destination`).
+    :param task: DatabaseTask opcional para informar del progreso y cancelar.
+    :param sleep: Segundos de pausa entre pasos.
+    :return: Ruta de la copia creada.
+    """
+    db_name = db_actions.db.db_name
+    if db_name == ":memory:":
+        raise ValueError("No se puede hacer una copia de una base de datos en memoria.")
+
+    rotate = destination is None
+    if rotate:
+        backup_dir = default_backup_dir(db_name)
+        os.makedirs(backup_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        destination = os.path.join(backup_dir, f"{_backup_prefix(db_name)}{stamp}{BACKUP_SUFFIX}")
+        counter = 1
+        while os.path.exists(destination):
+            destination = os.path.join(
+                backup_dir, f"{_backup_prefix(db_name)}{stamp}-{counter}{BACKUP_SUFFIX}"
+            )
+            counter += 1
+
+    partial = destination + _PARTIAL_SUFFIX
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    def progress(status, remaining, total):
+        if task is not None:
+            task.raise_if_cancelled()
+            task.report_progress(total - remaining, total)
+        if sleep and remaining:
+            time.sleep(sleep)
+
+    source = sqlite3.connect(db_name, isolation_level=None,
+                             timeout=db_actions.db.busy_timeout / 1000)
+    target = sqlite3.connect(partial, isolation_level=None)
+    try:
+        # La transacción de lectura fija la instantánea durante toda la copia
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages, progress=progress)
+        source.execute("COMMIT")
+        # La copia debe poder abrirse como un único archivo
+        target.execute("PRAGMA journal_mode = DELETE")
+    except BaseException:
+        target.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        source.close()
+    target.close()
+    os.replace(partial, destination)
+
+    if rotate:
+        rotate_backups(db_name, keep)
+    return destination
+
+
+def restore_database(db_actions, backup_path, pages=BACKUP_PAGES_PER_STEP, task=None):
+    """
+    Sustituye el contenido de la base de datos por el de una copia de seguridad.
+
+    Antes de copiar nada se comprueba que la copia esté íntegra. La
+    restauración se hace sobre la conexión del hilo actual, por lo que debe
+    ejecutarse en el hilo de base de datos para no competir con otras
+    escrituras.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param backup_path: Archivo de copia a restaurar.
+    :param pages: Páginas por paso.
+    :param task: DatabaseTask opcional para informar del progreso.
+    """
+    if not os.path.exists(backup_path):
+        raise ValueError(f"No existe la copia de seguridad '{backup_path}'.")
+
+    source = sqlite3.connect(f"file:{backup_path}?mode=ro", uri=True, isolation_level=None)
+    try:
+        try:
+            check = source.execute("PRAGMA quick_check").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"El archivo no es una base de datos válida: {e}")
+        if check != "ok":
+            raise ValueError(f"La copia de seguridad está dañada: {check}")
+
+        def progress(status, remaining, total):
+            if task is not None:
+                task.report_progress(total - remaining, total)
+
+        source.backup(db_actions.db.connection, pages=pages, progress=progress)
+    finally:
+        source.close()
+        db_actions.invalidate_cache()
+        db_actions.fuzzy_index.reset()
+    # La copia puede venir de otra versión del esquema
+    db_actions.setup_database()
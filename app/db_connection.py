@@ -1,33 +1,188 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Valores por defecto de los PRAGMA de rendimiento
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024  # 256 MiB mapeados en memoria
+DEFAULT_CACHE_SIZE = -64000  # Negativo = KiB, unos 64 MiB de caché de páginas
+DEFAULT_BUSY_TIMEOUT = 5000  # Milisegundos esperando un bloqueo antes de fallar
+DEFAULT_CACHED_STATEMENTS = 512  # Sentencias preparadas que se reutilizan por conexión
 
 
 class DatabaseConnection:
-    """Clase para manejar la conexión a la base de datos SQLite."""
-    
-    def __init__(self, db_name="conceptos.db"):
+    """
+    Clase para manejar la conexión a la base de datos SQLite.
+
+    Cada hilo recibe su propia conexión (creada bajo demanda) con el diario
+    en modo WAL, de modo que las tareas en segundo plano pueden leer mientras
+    el hilo de la interfaz escribe. Las conexiones trabajan en modo autocommit
+    y las escrituras agrupadas se hacen con `transaction()`.
+    """
+
+    def __init__(self, db_name="conceptos.db", mmap_size=DEFAULT_MMAP_SIZE,
+                 cache_size=DEFAULT_CACHE_SIZE, busy_timeout=DEFAULT_BUSY_TIMEOUT,
+                 cached_statements=DEFAULT_CACHED_STATEMENTS):
         """
-        Inicializa la conexión con la base de datos.
+        Inicializa la configuración de la conexión con la base de datos.
 
         :param db_name: Nombre del archivo de la base de datos.
+        :param mmap_size: Bytes de la base de datos que se leen mediante mmap (0 lo desactiva).
+        :param cache_size: Tamaño de la caché de páginas (PRAGMA cache_size).
+        :param busy_timeout: Milisegundos de espera cuando otra conexión tiene el bloqueo.
+        :param cached_statements: Tamaño de la caché de sentencias preparadas.
         """
         self.db_name = db_name
-        self.connection = None
-        self.cursor = None
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self.connected = False
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        # Una base de datos en memoria solo existe dentro de su conexión: se comparte entre hilos
+        self._shared = db_name == ":memory:"
+        self._shared_connection = None
+        self._functions = {}
+
+    def _open(self):
+        """Abre una conexión nueva y le aplica los PRAGMA de rendimiento."""
+        connection = sqlite3.connect(
+            self.db_name,
+            timeout=self.busy_timeout / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        connection.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        with self._lock:
+            for (name, num_params), func in self._functions.items():
+                connection.create_function(name, num_params, func, deterministic=True)
+            self._connections.append(connection)
+        return connection
+
+    def register_function(self, name, num_params, func):
+        """
+        Registra una función SQL determinista en todas las conexiones.
+
+        Se aplica a las conexiones ya abiertas y a las que se abran después
+        en otros hilos.
+
+        :param name: Nombre de la función en SQL.
+        :param num_params: Número de argumentos.
+        :param func: Función de Python que la implementa.
+        """
+        with self._lock:
+            self._functions[(name, num_params)] = func
+            connections = list(self._connections)
+        for connection in connections:
+            connection.create_function(name, num_params, func, deterministic=True)
 
     def connect(self):
-        """Establece la conexión con la base de datos."""
-        self.connection = sqlite3.connect(self.db_name)
-        self.cursor = self.connection.cursor()
+        """Establece la conexión con la base de datos para el hilo actual."""
+        self.connected = True
+        return self.connection
+
+    @property
+    def connection(self):
+        """Conexión del hilo actual; se abre la primera vez que se necesita."""
+        if not self.connected:
+            return None
+        if self._shared:
+            if self._shared_connection is None:
+                self._shared_connection = self._open()
+            return self._shared_connection
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._open()
+            self._local.connection = connection
+            self._local.depth = 0
+        return connection
+
+    @property
+    def cursor(self):
+        """Cursor nuevo sobre la conexión del hilo actual."""
+        connection = self.connection
+        return connection.cursor() if connection else None
+
+    def close_thread_connection(self):
+        """Cierra la conexión del hilo actual (útil al terminar un hilo de trabajo)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._shared:
+            return
+        self._local.connection = None
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        connection.close()
 
     def close(self):
-        """Cierra la conexión con la base de datos."""
-        if self.connection:
-            self.connection.close()
+        """Cierra todas las conexiones abiertas con la base de datos."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            connection.close()
+        self._local = threading.local()
+        self._shared_connection = None
+        self.connected = False
 
     def commit(self):
-        """Guarda los cambios en la base de datos."""
-        if self.connection:
-            self.connection.commit()
+        """
+        Guarda los cambios en la base de datos.
+
+        Dentro de un bloque `transaction()` no hace nada: el COMMIT se
+        realiza una sola vez al salir del bloque más externo.
+        """
+        connection = self.connection
+        if connection and self._depth() == 0 and connection.in_transaction:
+            connection.commit()
+
+    def rollback(self):
+        """Descarta los cambios pendientes de la transacción actual."""
+        connection = self.connection
+        if connection and connection.in_transaction:
+            connection.rollback()
+
+    def _depth(self):
+        """Nivel de anidamiento de `transaction()` en el hilo actual."""
+        return getattr(self._local, "depth", 0)
+
+    @contextmanager
+    def transaction(self, mode="IMMEDIATE"):
+        """
+        Agrupa varias escrituras en una única transacción.
+
+        Los bloques anidados se unen al más externo, que es el único que
+        confirma o deshace los cambios.
+
+        :param mode: Tipo de BEGIN (DEFERRED, IMMEDIATE o EXCLUSIVE).
+        """
+        connection = self.connection
+        if not connection:
+            raise Exception("No hay conexión activa con la base de datos.")
+        depth = self._depth()
+        if depth == 0:
+            connection.execute(f"BEGIN {mode}")
+        self._local.depth = depth + 1
+        try:
+            yield connection
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                connection.rollback()
+            raise
+        self._local.depth = depth
+        if depth == 0:
+            connection.commit()
 
     def execute(self, query, params=None):
         """
@@ -37,8 +192,22 @@ class DatabaseConnection:
         :param params: Parámetros para la consulta.
         :return: Cursor con el resultado de la consulta.
         """
-        if not self.connection:
+        connection = self.connection
+        if not connection:
             raise Exception("No hay conexión activa con la base de datos.")
         if params:
-            return self.cursor.execute(query, params)
-        return self.cursor.execute(query)
+            return connection.execute(query, params)
+        return connection.execute(query)
+
+    def executemany(self, query, seq_of_params):
+        """
+        Ejecuta una consulta SQL para cada conjunto de parámetros.
+
+        :param query: Consulta SQL a ejecutar.
+        :param seq_of_params: Iterable de tuplas de parámetros.
+        :return: Cursor de la ejecución.
+        """
+        connection = self.connection
+        if not connection:
+            raise Exception("No hay conexión activa con la base de datos.")
+        return connection.executemany(query, seq_of_params)
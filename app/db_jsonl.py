@@ -0,0 +1,135 @@
+import json
+from contextlib import nullcontext
+from .db_schema import CODE_COLUMNS, CODE_SOURCE, decode_code
+from .file_loader import open_text
+
+# Filas leídas de SQLite en cada fetchmany al exportar
+EXPORT_BATCH_SIZE = 500
+
+# Categorías por transacción al importar
+IMPORT_BATCH_SIZE = 1000
+
+
+def _open(target, mode):
+    """Abre una ruta (.jsonl o .jsonl.gz) o reutiliza un archivo ya abierto sin cerrarlo."""
+    if hasattr(target, "write" if mode == "w" else "read"):
+        return nullcontext(target)
+    return open_text(target, mode)
+
+
+def export_jsonl(db_actions, target, batch_size=EXPORT_BATCH_SIZE, progress=None):
+    """
+    Exporta todas las categorías a JSON Lines: {"name": ..., "code": ...} por línea.
+
+    Las filas se leen con `fetchmany` y se escriben según llegan, así que la
+    memoria usada no depende del número de categorías. La lectura se hace en
+    una transacción de lectura: el archivo es una instantánea coherente
+    aunque otro hilo modifique la base de datos mientras tanto.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param target: Ruta de destino o archivo de texto abierto.
+    :param batch_size: Filas leídas en cada paso.
+    :param progress: Función opcional que recibe (exportadas, total).
+    :return: Número de categorías exportadas.
+    """
+    db = db_actions.db
+    count = 0
+    with db_actions.transaction("DEFERRED"), _open(target, "w") as file:
+        total = db.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+        cursor = db.execute(f"SELECT c.name, {CODE_COLUMNS} FROM {CODE_SOURCE} ORDER BY c.id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            file.writelines(
+                json.dumps({"name": name, "code": decode_code(*code)}, ensure_ascii=False) + "\n"
+                for name, *code in rows
+            )
+            count += len(rows)
+            if progress:
+                progress(count, total)
+    return count
+
+
+def read_jsonl(file):
+    """
+    Genera tuplas (nombre, código) a partir de un archivo JSON Lines.
+
+    :param file: Archivo de texto abierto.
+    :raises ValueError: Si una línea no es una categoría válida.
+    """
+    for number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            name = item["name"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Línea {number} no válida: {e}")
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"Línea {number} no válida: el nombre debe ser un texto no vacío.")
+        yield name, item.get("code")
+
+
+def import_jsonl(db_actions, source, replace=True, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Importa categorías desde JSON Lines leyendo el archivo línea a línea.
+
+    Cada lote de `batch_size` categorías se guarda en su propia transacción,
+    de modo que la memoria usada no depende del tamaño del archivo y las
+    demás operaciones pueden intercalarse entre lotes. Si una línea no es
+    válida, se detiene la importación; los lotes anteriores quedan guardados.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param source: Ruta de origen o archivo de texto abierto.
+    :param replace: Si es True, reemplaza el código de las categorías que ya
+        existen; si es False, las deja como están.
+    :param batch_size: Categorías por transacción.
+    :param progress: Función opcional que recibe (procesadas, None).
+    :return: Diccionario con los contadores "imported" y "skipped".
+    """
+    result = {"imported": 0, "skipped": 0}
+    batch = []
+    with _open(source, "r") as file:
+        for category in read_jsonl(file):
+            batch.append(category)
+            if len(batch) >= batch_size:
+                _import_batch(db_actions, batch, replace, result)
+                batch = []
+                if progress:
+                    progress(result["imported"] + result["skipped"], None)
+        if batch:
+            _import_batch(db_actions, batch, replace, result)
+            if progress:
+                progress(result["imported"] + result["skipped"], None)
+    return result
+
+
+def _import_batch(db_actions, batch, replace, result):
+    """Guarda un lote de categorías en una transacción y actualiza los contadores."""
+    # Dentro del lote gana la última aparición de cada nombre
+    categories = dict(batch)
+    with db_actions.transaction():
+        if replace:
+            db_actions.upsert_many(categories.items())
+            result["imported"] += len(categories)
+        else:
+            existing = _existing_names(db_actions, list(categories))
+            new = [(name, code) for name, code in categories.items() if name not in existing]
+            if new:
+                db_actions.add_many(new)
+            result["imported"] += len(new)
+            result["skipped"] += len(categories) - len(new)
+    result["skipped"] += len(batch) - len(categories)
+
+
+def _existing_names(db_actions, names):
+    """Devuelve el conjunto de nombres de `names` que ya existen en la base de datos."""
+    existing = set()
+    # Por debajo del límite de parámetros de SQLite
+    for start in range(0, len(names), 500):
+        chunk = names[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        query = f"SELECT name FROM categories WHERE name IN ({placeholders})"
+        existing.update(row[0] for row in db_actions.db.execute(query, chunk))
+    return existing
@@ -0,0 +1,257 @@
+import zlib
+
+# Versiones del esquema guardadas en PRAGMA user_version
+SCHEMA_INLINE = 0  # El código se guarda en la columna categories.code
+SCHEMA_SPLIT = 1  # El código vive en la tabla category_code, opcionalmente comprimido
+
+# Por debajo de este tamaño (en bytes) no merece la pena comprimir el código
+COMPRESS_MIN_SIZE = 256
+
+CATEGORIES_TABLE = """
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
+    code TEXT,
+    updated_at REAL
+)
+"""
+
+# Tabla de cuerpos de código del esquema dividido. 'code' guarda texto plano
+# o, si 'compressed' es 1, el texto UTF-8 comprimido con zlib.
+CODE_TABLE = """
+CREATE TABLE IF NOT EXISTS category_code (
+    id INTEGER PRIMARY KEY,
+    code BLOB,
+    compressed INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Tabla virtual FTS5 que indexa nombre y código de cada categoría.
+# En el esquema en línea es de contenido externo: lee el texto de la vista
+# 'categories_text'. En el dividido guarda su propia copia del texto, porque
+# el código comprimido no se puede leer desde SQL. En ambos casos el índice
+# se mantiene sincronizado mediante disparadores.
+FTS_TABLE = "categories_fts"
+FTS_CONTENT_VIEW = "categories_text"
+
+FTS_OPTIONS = """tokenize="unicode61 remove_diacritics 2", prefix='2 3'"""
+
+FTS_TABLE_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    name, code,
+    content='{FTS_CONTENT_VIEW}', content_rowid='id',
+    {FTS_OPTIONS}
+)
+"""
+
+SPLIT_FTS_TABLE_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    name, code,
+    {FTS_OPTIONS}
+)
+"""
+
+FTS_TRIGGERS = (
+    "categories_fts_ai", "categories_fts_ad", "categories_fts_au",
+    "category_code_fts_ai", "category_code_fts_ad", "category_code_fts_au",
+)
+
+# Esquema en línea: el texto sale directamente de 'categories'
+INLINE_FTS_SCHEMA = [
+    f"""
+    CREATE VIEW IF NOT EXISTS {FTS_CONTENT_VIEW} AS
+    SELECT id, name, code FROM categories
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_fts_ai AFTER INSERT ON categories BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, code) VALUES (new.id, new.name, new.code);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_fts_ad AFTER DELETE ON categories BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, code) VALUES ('delete', old.id, old.name, old.code);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_fts_au AFTER UPDATE ON categories BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, code) VALUES ('delete', old.id, old.name, old.code);
+        INSERT INTO {FTS_TABLE}(rowid, name, code) VALUES (new.id, new.name, new.code);
+    END
+    """,
+]
+
+# Esquema dividido: el código vigente de una categoría es el de category_code
+# si existe y, si no, el de la columna en línea (filas aún sin migrar). Los
+# disparadores solo usan SQL estándar, así que cualquier cliente de SQLite
+# puede escribir en la base de datos. El código comprimido no se puede leer
+# desde SQL: al guardarlo, DatabaseActions actualiza el índice por su cuenta.
+SPLIT_FTS_SCHEMA = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_fts_ai AFTER INSERT ON categories BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, code) VALUES (new.id, new.name, new.code);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_fts_ad AFTER DELETE ON categories BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        DELETE FROM category_code WHERE id = old.id;
+    END
+    """,
+    # Vaciar la columna en línea al migrar no cambia el texto indexado
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_fts_au AFTER UPDATE OF name, code ON categories
+    WHEN old.name IS NOT new.name OR new.code IS NOT NULL BEGIN
+        UPDATE {FTS_TABLE} SET name = new.name, code = COALESCE(new.code, code) WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_code_fts_ai AFTER INSERT ON category_code
+    WHEN new.compressed = 0 BEGIN
+        UPDATE {FTS_TABLE} SET code = new.code WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_code_fts_au AFTER UPDATE ON category_code
+    WHEN new.compressed = 0 BEGIN
+        UPDATE {FTS_TABLE} SET code = new.code WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_code_fts_ad AFTER DELETE ON category_code BEGIN
+        UPDATE {FTS_TABLE} SET code = (SELECT code FROM categories WHERE id = old.id) WHERE rowid = old.id;
+    END
+    """,
+]
+
+# Registro de cambios para la sincronización incremental. Guarda, por nombre
+# de categoría, solo su último cambio ('upsert' o 'delete') con un número de
+# secuencia creciente que nunca se reutiliza (AUTOINCREMENT).
+CHANGE_LOG_TABLE = "category_changes"
+
+# Instante actual en segundos Unix, comparable con time.time()
+_NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+
+
+def _log_change(name_expr, op):
+    """Sentencias SQL que registran el último cambio de una categoría."""
+    return (
+        f"DELETE FROM {CHANGE_LOG_TABLE} WHERE name = {name_expr};\n"
+        f"        INSERT INTO {CHANGE_LOG_TABLE} (name, op, changed_at) VALUES ({name_expr}, '{op}', {_NOW});"
+    )
+
+
+CHANGE_LOG_SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        op TEXT NOT NULL,
+        changed_at REAL NOT NULL
+    )
+    """,
+    # Cada nombre aparece una sola vez. El índice es único para que el
+    # planificador lo use siempre, aunque sqlite_stat1 tenga estadísticas
+    # de cuando la tabla estaba casi vacía
+    f"DROP INDEX IF EXISTS {CHANGE_LOG_TABLE}_name",
+    f"CREATE UNIQUE INDEX IF NOT EXISTS {CHANGE_LOG_TABLE}_name_key ON {CHANGE_LOG_TABLE} (name)",
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_peers (
+        peer_id TEXT PRIMARY KEY,
+        last_sent INTEGER NOT NULL DEFAULT 0,
+        last_received INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_log_ai AFTER INSERT ON categories BEGIN
+        {_log_change("new.name", "upsert")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_log_ad AFTER DELETE ON categories BEGIN
+        {_log_change("old.name", "delete")}
+    END
+    """,
+    # Pasar el código de la columna a category_code (migración) no es un cambio
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_log_rename AFTER UPDATE OF name ON categories
+    WHEN old.name IS NOT new.name BEGIN
+        {_log_change("old.name", "delete")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS categories_log_au AFTER UPDATE OF name, code ON categories
+    WHEN old.name IS NOT new.name OR (new.code IS NOT NULL AND old.code IS NOT new.code) BEGIN
+        {_log_change("new.name", "upsert")}
+    END
+    """,
+    # En el esquema dividido el código cambia en category_code; mientras la
+    # columna en línea conserve código, la fila aún se está migrando
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_code_log_ai AFTER INSERT ON category_code
+    WHEN EXISTS (SELECT 1 FROM categories WHERE id = new.id AND code IS NULL) BEGIN
+        {_log_change("(SELECT name FROM categories WHERE id = new.id)", "upsert")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_code_log_au AFTER UPDATE ON category_code
+    WHEN EXISTS (SELECT 1 FROM categories WHERE id = new.id AND code IS NULL) BEGIN
+        {_log_change("(SELECT name FROM categories WHERE id = new.id)", "upsert")}
+    END
+    """,
+]
+
+# Columnas y origen para leer el código vigente junto a cada categoría
+CODE_COLUMNS = "c.code, b.code, b.compressed"
+CODE_SOURCE = "categories c LEFT JOIN category_code b ON b.id = c.id"
+
+
+def encode_code(code, compress=True):
+    """
+    Prepara un cuerpo de código para guardarlo en category_code.
+
+    :param code: Texto del código (o None).
+    :param compress: Si es True, comprime con zlib cuando reduce el tamaño.
+    :return: Tupla (valor, comprimido) lista para insertar.
+    """
+    if code is None:
+        return None, 0
+    if compress:
+        data = code.encode("utf-8")
+        if len(data) >= COMPRESS_MIN_SIZE:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                return packed, 1
+    return code, 0
+
+
+def code_text(stored, compressed):
+    """
+    Devuelve el texto de un valor de category_code, descomprimiéndolo si hace falta.
+
+    Se registra como función SQL en las conexiones de la aplicación para sus
+    propias consultas; el esquema guardado en la base de datos no la usa.
+    """
+    if stored is None:
+        return None
+    if compressed:
+        return zlib.decompress(stored).decode("utf-8")
+    return stored
+
+
+def decode_code(inline, stored, compressed):
+    """
+    Resuelve el código vigente de una fila leída con CODE_COLUMNS.
+
+    :param inline: Valor de la columna categories.code.
+    :param stored: Valor de category_code.code (None si no hay fila).
+    :param compressed: Indicador de compresión de category_code.
+    :return: Texto del código o None.
+    """
+    text = code_text(stored, compressed)
+    return inline if text is None else text
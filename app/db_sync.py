@@ -0,0 +1,159 @@
+import json
+from .file_loader import open_text
+from .db_actions import MERGE_KEEP_NEWEST, MERGE_KEEP_LOCAL, MERGE_TAKE_IMPORTED, LOCAL_CODE
+from .db_schema import CHANGE_LOG_TABLE
+
+# Identificador del formato de los archivos de cambios
+CHANGES_FORMAT = "dicciopynthon-changes"
+CHANGES_VERSION = 1
+
+# Políticas admitidas al aplicar cambios remotos
+SYNC_POLICIES = (MERGE_KEEP_NEWEST, MERGE_KEEP_LOCAL, MERGE_TAKE_IMPORTED)
+
+
+def current_sequence(db_actions):
+    """
+    Devuelve el último número de secuencia del registro de cambios.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :return: Entero (0 si todavía no hay cambios).
+    """
+    row = db_actions.db.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {CHANGE_LOG_TABLE}").fetchone()
+    return row[0]
+
+
+def last_received(db_actions, peer_id):
+    """
+    Secuencia del otro equipo hasta la que ya se han aplicado sus cambios.
+
+    Es el valor que hay que pasar como `since` al exportar en ese equipo.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param peer_id: Identificador de la base de datos remota.
+    """
+    row = db_actions.db.execute("SELECT last_received FROM sync_peers WHERE peer_id = ?", (peer_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def export_changes(db_actions, path, since=None, peer_id=None):
+    """
+    Exporta los cambios posteriores a una secuencia a un archivo JSON Lines.
+
+    La primera línea es una cabecera con el identificador de la base de
+    datos y el rango de secuencias; cada línea siguiente es un cambio
+    ('upsert' con el código actual o 'delete'). Solo se leen las filas del
+    registro posteriores a `since`, por lo que el tamaño del archivo depende
+    del número de cambios y no del tamaño de la base de datos.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param path: Archivo de destino (.jsonl o .jsonl.gz).
+    :param since: Secuencia a partir de la cual exportar. Si es None se usa la
+        última enviada a `peer_id` (o 0 si no hay equipo).
+    :param peer_id: Identificador opcional del equipo destino; se recuerda la
+        secuencia enviada para la siguiente exportación.
+    :return: Tupla (número de cambios, secuencia final).
+    """
+    db = db_actions.db
+    if since is None:
+        row = db.execute("SELECT last_sent FROM sync_peers WHERE peer_id = ?", (peer_id,)).fetchone()
+        since = row[0] if row else 0
+
+    until = current_sequence(db_actions)
+    query = f"""
+    SELECT ch.seq, ch.name, ch.op, ch.changed_at, c.updated_at, {LOCAL_CODE}
+    FROM {CHANGE_LOG_TABLE} ch LEFT JOIN categories c ON c.name = ch.name
+    WHERE ch.seq > ? AND ch.seq <= ?
+    ORDER BY ch.seq
+    """
+    count = 0
+    with db_actions.transaction("DEFERRED"), open_text(path, "w") as file:
+        header = {
+            "format": CHANGES_FORMAT,
+            "version": CHANGES_VERSION,
+            "source": db_actions.database_id(),
+            "since": since,
+            "until": until,
+        }
+        file.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for seq, name, op, changed_at, updated_at, code in db.execute(query, (since, until)):
+            if op == "delete":
+                change = {"seq": seq, "op": "delete", "name": name, "changed_at": changed_at}
+            else:
+                change = {"seq": seq, "op": "upsert", "name": name, "code": code,
+                          "updated_at": updated_at if updated_at is not None else changed_at}
+            file.write(json.dumps(change, ensure_ascii=False) + "\n")
+            count += 1
+
+    if peer_id is not None:
+        with db_actions.transaction():
+            db.execute(
+                "INSERT INTO sync_peers (peer_id, last_sent) VALUES (?, ?) "
+                "ON CONFLICT(peer_id) DO UPDATE SET last_sent = excluded.last_sent",
+                (peer_id, until),
+            )
+    return count, until
+
+
+def import_changes(db_actions, path, policy=MERGE_KEEP_NEWEST):
+    """
+    Aplica un archivo de cambios generado por `export_changes` en otro equipo.
+
+    Todos los cambios se aplican en una única transacción. Con la política
+    MERGE_KEEP_NEWEST, un cambio remoto solo sustituye o borra una categoría
+    local si es posterior a su última modificación.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param path: Archivo de cambios (.jsonl o .jsonl.gz).
+    :param policy: MERGE_KEEP_NEWEST, MERGE_KEEP_LOCAL o MERGE_TAKE_IMPORTED.
+    :return: Diccionario con los contadores "inserted", "updated", "deleted" y "skipped".
+    """
+    if policy not in SYNC_POLICIES:
+        raise ValueError(f"Política de sincronización desconocida: {policy}")
+
+    db = db_actions.db
+    result = {"inserted": 0, "updated": 0, "deleted": 0, "skipped": 0}
+    lookup = f"SELECT c.id, c.updated_at, {LOCAL_CODE} FROM categories c WHERE c.name = ?"
+    try:
+        with open_text(path, "r") as file, db_actions.transaction():
+            header = json.loads(file.readline() or "{}")
+            if header.get("format") != CHANGES_FORMAT or header.get("version") != CHANGES_VERSION:
+                raise ValueError("El archivo no contiene cambios de DiccioPynthon.")
+            split = db_actions.is_split_schema()
+
+            for line in file:
+                if not line.strip():
+                    continue
+                change = json.loads(line)
+                local = db.execute(lookup, (change["name"],)).fetchone()
+
+                if change["op"] == "delete":
+                    if local is None:
+                        result["skipped"] += 1
+                    elif policy == MERGE_KEEP_LOCAL or (
+                        policy == MERGE_KEEP_NEWEST and (local[1] or 0) > change["changed_at"]
+                    ):
+                        result["skipped"] += 1
+                    else:
+                        db.execute("DELETE FROM categories WHERE id = ?", (local[0],))
+                        result["deleted"] += 1
+                    continue
+
+                if local is None:
+                    db_actions._insert_category(change["name"], change["code"], split, change["updated_at"])
+                    result["inserted"] += 1
+                elif local[2] == change["code"] or policy == MERGE_KEEP_LOCAL or (
+                    policy == MERGE_KEEP_NEWEST and (local[1] or 0) >= (change["updated_at"] or 0)
+                ):
+                    result["skipped"] += 1
+                else:
+                    db_actions._set_code(local[0], change["code"], split, change["updated_at"])
+                    result["updated"] += 1
+
+            db.execute(
+                "INSERT INTO sync_peers (peer_id, last_received) VALUES (?, ?) "
+                "ON CONFLICT(peer_id) DO UPDATE SET last_received = MAX(last_received, excluded.last_received)",
+                (header["source"], header["until"]),
+            )
+    finally:
+        db_actions.invalidate_cache()
+    return result
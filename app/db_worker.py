@@ -0,0 +1,284 @@
+import queue
+import sqlite3
+import threading
+import traceback
+from concurrent.futures import Future
+
+# Cada cuántas instrucciones de SQLite se comprueba si la tarea se ha cancelado
+PROGRESS_HANDLER_STEPS = 10000
+
+# Intervalos (ms) de sondeo de resultados desde el bucle de Tk
+POLL_BUSY_MS = 15
+POLL_IDLE_MS = 100
+
+
+class TaskCancelled(Exception):
+    """Se lanza cuando una tarea de base de datos se cancela antes de terminar."""
+
+
+class DatabaseTask:
+    """
+    Operación enviada al hilo de base de datos.
+
+    Envuelve un `concurrent.futures.Future`. Las funciones registradas con
+    `then()` se ejecutan en el hilo de Tk (mediante `root.after`), por lo
+    que pueden actualizar la interfaz directamente.
+    """
+
+    def __init__(self, worker, func, args, kwargs, pass_task):
+        self.future = Future()
+        self._worker = worker
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._pass_task = pass_task
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._done_callbacks = []
+        self._progress_callbacks = []
+        self._counted = False
+
+    def then(self, on_done=None, on_error=None, on_progress=None):
+        """
+        Registra funciones a llamar en el hilo de Tk.
+
+        :param on_done: Recibe el resultado de la tarea.
+        :param on_error: Recibe la excepción si la tarea falla o se cancela.
+        :param on_progress: Recibe (hechos, total) cada vez que la tarea informa.
+        :return: La propia tarea, para encadenar llamadas.
+        """
+        with self._lock:
+            if on_progress:
+                self._progress_callbacks.append(on_progress)
+            self._done_callbacks.append((on_done, on_error))
+            finished = self.future.done()
+        if finished:
+            self._worker._post(("done", self))
+        return self
+
+    def cancel(self):
+        """
+        Solicita la cancelación de la tarea.
+
+        Si aún no ha empezado, no llega a ejecutarse; si está en marcha, la
+        consulta SQLite en curso se interrumpe y la tarea termina con
+        `TaskCancelled`.
+        """
+        self._cancel_event.set()
+        if self.future.cancel():
+            self._worker._post(("done", self))
+
+    @property
+    def cancelled(self):
+        """Indica si se ha solicitado la cancelación."""
+        return self._cancel_event.is_set()
+
+    def raise_if_cancelled(self):
+        """Punto de cancelación cooperativo para tareas largas escritas en Python."""
+        if self.cancelled:
+            raise TaskCancelled()
+
+    def report_progress(self, done, total=None):
+        """Informa del avance de la tarea; se entrega a `on_progress` en el hilo de Tk."""
+        self._worker._post(("progress", self, done, total))
+
+    def checkpoint(self, done, total=None):
+        """
+        Comprueba la cancelación e informa del avance en una sola llamada.
+
+        Tiene la forma de los parámetros `progress(hechos, total)` de las
+        funciones de base de datos, así que puede pasarse directamente.
+        """
+        self.raise_if_cancelled()
+        self.report_progress(done, total)
+
+    def result(self, timeout=None):
+        """Espera y devuelve el resultado (no usar desde el hilo de Tk)."""
+        return self.future.result(timeout)
+
+    def done(self):
+        """Indica si la tarea ha terminado."""
+        return self.future.done()
+
+    def _run(self):
+        """Ejecuta la función en el hilo de base de datos."""
+        if self._pass_task:
+            return self._func(self, *self._args, **self._kwargs)
+        return self._func(*self._args, **self._kwargs)
+
+    def _deliver(self):
+        """Llama a los callbacks de finalización pendientes (hilo de Tk)."""
+        with self._lock:
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        if not callbacks:
+            return
+        error = None
+        result = None
+        if self.future.cancelled():
+            error = TaskCancelled()
+        else:
+            error = self.future.exception()
+            if error is None:
+                result = self.future.result()
+        for on_done, on_error in callbacks:
+            if error is None:
+                if on_done:
+                    on_done(result)
+            elif on_error:
+                on_error(error)
+            elif not isinstance(error, TaskCancelled):
+                traceback.print_exception(type(error), error, error.__traceback__)
+
+    def _deliver_progress(self, done, total):
+        """Entrega un informe de progreso (hilo de Tk)."""
+        with self._lock:
+            callbacks = list(self._progress_callbacks)
+        for callback in callbacks:
+            callback(done, total)
+
+
+class DatabaseWorker:
+    """
+    Hilo único que ejecuta todas las operaciones de base de datos en orden.
+
+    La interfaz envía trabajo con `submit()` y nunca espera a SQLite: los
+    resultados vuelven al bucle de Tk por una cola que se vacía con
+    `root.after`. Al haber un único hilo escritor, las escrituras nunca
+    compiten entre sí por el bloqueo de la base de datos.
+    """
+
+    def __init__(self, db_actions, root=None, name="db-worker"):
+        """
+        :param db_actions: Instancia de DatabaseActions que usarán las tareas
+            (None para un hilo de trabajo que no usa la base de datos).
+        :param root: Ventana de Tk a la que se entregan los resultados. Sin
+            ella, los callbacks se ejecutan directamente en el hilo de trabajo.
+        :param name: Nombre del hilo (para distinguirlo al depurar o perfilar).
+        """
+        self.db_actions = db_actions
+        self.root = root
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._current = None
+        self._poll_id = None
+        self._polling = False  # True mientras _poll entrega resultados
+        self._poll_stopped = False  # True si el sondeo se detuvo por inactividad
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+        if root is not None:
+            self._poll_id = root.after(POLL_IDLE_MS, self._poll)
+
+    def submit(self, func, *args, pass_task=False, **kwargs):
+        """
+        Encola una operación para el hilo de base de datos.
+
+        :param func: Función a ejecutar (por ejemplo, un método de DatabaseActions).
+        :param pass_task: Si es True, la función recibe la `DatabaseTask` como
+            primer argumento para informar de su progreso o comprobar la cancelación.
+        :return: `DatabaseTask` asociada.
+        """
+        task = DatabaseTask(self, func, args, kwargs, pass_task)
+        with self._pending_lock:
+            self._pending += 1
+            stopped = self._poll_stopped
+            self._poll_stopped = False
+        self._tasks.put(task)
+        if stopped:
+            # Sin tareas no se sondea; se vuelve a empezar con esta
+            self._poll_id = self.root.after(POLL_BUSY_MS, self._poll)
+        elif self._poll_id is not None and not self._polling and threading.current_thread() is threading.main_thread():
+            # Sin esperar al sondeo lento: el resultado se entrega en cuanto esté
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = self.root.after(POLL_BUSY_MS, self._poll)
+        return task
+
+    def shutdown(self, wait=True):
+        """Detiene el hilo cuando termine las tareas ya encoladas."""
+        self._tasks.put(None)
+        if wait:
+            self._thread.join()
+        if self.root is not None and self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+
+    def _loop(self):
+        """Bucle del hilo de base de datos."""
+        connection = None
+        if self.db_actions is not None:
+            connection = self.db_actions.db.connection
+            connection.set_progress_handler(self._check_cancel, PROGRESS_HANDLER_STEPS)
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    break
+                if not task.future.set_running_or_notify_cancel():
+                    continue  # Cancelada antes de empezar; ya se notificó
+                self._current = task
+                try:
+                    task.future.set_result(task._run())
+                except sqlite3.OperationalError as e:
+                    task.future.set_exception(TaskCancelled() if task.cancelled else e)
+                except BaseException as e:
+                    task.future.set_exception(e)
+                finally:
+                    self._current = None
+                self._post(("done", task))
+        finally:
+            if connection is not None:
+                connection.set_progress_handler(None, 0)
+                self.db_actions.db.close_thread_connection()
+
+    def _check_cancel(self):
+        """Manejador de progreso de SQLite: devolver 1 aborta la consulta en curso."""
+        task = self._current
+        return 1 if task is not None and task.cancelled else 0
+
+    def _post(self, item):
+        """Envía un evento al hilo de Tk (o lo procesa ya si no hay ventana)."""
+        if self.root is None:
+            self._handle(item)
+        else:
+            self._results.put(item)
+
+    def _handle(self, item):
+        """Procesa un evento de resultado o progreso."""
+        if item[0] == "progress":
+            _, task, done, total = item
+            task._deliver_progress(done, total)
+            return
+        task = item[1]
+        if task.future.done() and not task._counted:
+            task._counted = True
+            with self._pending_lock:
+                self._pending -= 1
+        task._deliver()
+
+    def _poll(self):
+        """
+        Vacía la cola de resultados desde el bucle de Tk y se reprograma
+        mientras queden tareas pendientes (`submit()` lo reanuda).
+        """
+        self._polling = True
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._handle(item)
+            except Exception:
+                traceback.print_exc()
+        self._polling = False
+        with self._pending_lock:
+            busy = self._pending > 0
+            if not busy and self._results.empty():
+                self._poll_id = None
+                self._poll_stopped = True
+                return
+        self._poll_id = self.root.after(POLL_BUSY_MS if busy else POLL_IDLE_MS, self._poll)
@@ -4,33 +4,34 @@ from reportlab.lib import colors
 import tkinter.filedialog as filedialog
 from tkinter import messagebox   
 from app.themes import apply_theme
+from app.db_worker import TaskCancelled
+from app.progress_dialog import ProgressDialog
 
-def export_to_pdf(db_actions):
+def write_pdf(task, db_actions, pdf_filename):
     """
-    Exporta el contenido de la base de datos a un archivo PDF.
-    
-    Recupera todas las categorías y sus códigos asociados y crea un archivo
-    PDF con el contenido formateado.
-    """
-    # Usar la instancia 'db_actions' para llamar a 'fetch_categories_from_db'
-    categories = db_actions.fetch_categories_from_db()
+    Escribe el PDF con todas las categorías y sus códigos.
 
-    # Cuadro de diálogo para seleccionar la ubicación y nombre del archivo
-    pdf_filename = filedialog.asksaveasfilename(
-        defaultextension=".pdf",
-        filetypes=[("PDF Files", "*.pdf")],
-        title="Guardar PDF como..."
-    )
+    Se ejecuta en el hilo de base de datos: informa del avance a la tarea y
+    se detiene si el usuario cancela la exportación.
 
-    if not pdf_filename:
-        return
+    :param task: DatabaseTask en la que se ejecuta (o None).
+    :param db_actions: Instancia de DatabaseActions.
+    :param pdf_filename: Ruta del archivo PDF a crear.
+    :return: Número de categorías exportadas.
+    """
+    total = db_actions.db.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+    # Se recorren por páginas: nunca hay más de una página de código en memoria
+    categories = db_actions.iter_categories(columns=("name", "code"))
 
     # Crear el archivo PDF
     c = canvas.Canvas(pdf_filename, pagesize=letter)
     width, height = letter
     y_position = height - 40
 
-    for category in categories:
+    index = 0
+    for index, category in enumerate(categories, 1):
+        if task is not None:
+            task.raise_if_cancelled()
         title = category[0]
         code = category[1] if category[1] else "No hay código asociado"
         
@@ -54,6 +55,49 @@ def export_to_pdf(db_actions):
             y_position -= 15
 
         y_position -= 20
+        if task is not None and index % 50 == 0:
+            task.report_progress(index, total)
 
     c.save()
-    messagebox.showinfo("Exportación Completa", f"El contenido se ha exportado a {pdf_filename}")
+    return index
+
+
+def export_to_pdf(db_actions, worker=None, root=None):
+    """
+    Exporta el contenido de la base de datos a un archivo PDF.
+    
+    Recupera todas las categorías y sus códigos asociados y crea un archivo
+    PDF con el contenido formateado. Con un `worker`, el PDF se genera en el
+    hilo de base de datos y se muestra una ventana de progreso cancelable.
+    """
+    # Cuadro de diálogo para seleccionar la ubicación y nombre del archivo
+    pdf_filename = filedialog.asksaveasfilename(
+        defaultextension=".pdf",
+        filetypes=[("PDF Files", "*.pdf")],
+        title="Guardar PDF como..."
+    )
+
+    if not pdf_filename:
+        return
+
+    if worker is None:
+        write_pdf(None, db_actions, pdf_filename)
+        messagebox.showinfo("Exportación Completa", f"El contenido se ha exportado a {pdf_filename}")
+        return
+
+    task = worker.submit(write_pdf, db_actions, pdf_filename, pass_task=True)
+    progress = ProgressDialog(root, "Exportar a PDF", "Exportando conceptos...", on_cancel=task.cancel,
+                              theme_name=getattr(root, "current_theme", "light"))
+
+    def exported(_):
+        progress.close()
+        messagebox.showinfo("Exportación Completa", f"El contenido se ha exportado a {pdf_filename}")
+
+    def failed(error):
+        progress.close()
+        if isinstance(error, TaskCancelled):
+            messagebox.showinfo("Exportación cancelada", "No se ha completado la exportación a PDF.")
+        else:
+            messagebox.showerror("Error", f"No se pudo exportar a PDF: {error}")
+
+    task.then(exported, failed, progress.update)
@@ -0,0 +1,114 @@
+import gzip
+import io
+import tokenize
+
+# A partir de este tamaño (caracteres) el archivo se inserta por partes
+LARGE_FILE_CHARS = 200_000
+
+# Líneas insertadas en cada paso
+INSERT_CHUNK_LINES = 2000
+
+
+def open_text(path, mode):
+    """
+    Abre un archivo de texto UTF-8, comprimido con gzip si termina en .gz.
+
+    :param path: Ruta del archivo.
+    :param mode: "r" para leer o "w" para escribir.
+    :return: Archivo de texto abierto.
+    """
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_source(path):
+    """
+    Lee un archivo de código averiguando su codificación.
+
+    Respeta la marca BOM y la declaración de codificación de PEP 263
+    (`# -*- coding: ... -*-`); sin ellas se asume UTF-8 y, si el contenido
+    no es UTF-8 válido, Latin-1 (que acepta cualquier byte). Los finales de
+    línea de Windows y del antiguo Mac se convierten a '\\n'.
+
+    :param path: Ruta del archivo.
+    :return: Tupla (texto, codificación).
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError:
+        encoding = "utf-8"  # Declaración de codificación desconocida o contradictoria
+    try:
+        text = data.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        encoding = "latin-1"
+        text = data.decode(encoding)
+    return text.replace("\r\n", "\n").replace("\r", "\n"), encoding
+
+
+class ChunkedInsert:
+    """
+    Inserta un texto grande al final de un widget Text por partes.
+
+    Cada parte se inserta en una llamada `after_idle`, así que entre una y
+    otra Tk redibuja la ventana y atiende los eventos (por ejemplo, el botón
+    de cancelar). Mientras dura la carga el widget no admite escritura.
+    """
+
+    def __init__(self, text_widget, content, on_progress=None, on_done=None,
+                 chunk_lines=INSERT_CHUNK_LINES):
+        """
+        :param text_widget: Widget Text de destino.
+        :param content: Texto a insertar.
+        :param on_progress: Función que recibe (líneas insertadas, total).
+        :param on_done: Función sin argumentos a llamar al terminar.
+        :param chunk_lines: Líneas por paso.
+        """
+        self.widget = text_widget
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.chunk_lines = chunk_lines
+        self._lines = content.splitlines(keepends=True)
+        self._done = 0
+        self._after_id = None
+        self.finished = False
+
+    def start(self):
+        """Empieza la inserción."""
+        self.widget.configure(state="disabled")
+        self._after_id = self.widget.after_idle(self._step)
+
+    def cancel(self):
+        """Detiene la inserción; lo ya insertado se queda en el widget."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._finish(notify=False)
+
+    def _step(self):
+        """Inserta la siguiente parte y programa la siguiente."""
+        self._after_id = None
+        if not self.widget.winfo_exists():
+            return  # Se ha cerrado el editor
+        chunk = "".join(self._lines[self._done:self._done + self.chunk_lines])
+        self._done = min(len(self._lines), self._done + self.chunk_lines)
+        self.widget.configure(state="normal")
+        self.widget.insert("end-1c", chunk)
+        self.widget.configure(state="disabled")
+        if self.on_progress:
+            self.on_progress(self._done, len(self._lines))
+        if self._done < len(self._lines):
+            self._after_id = self.widget.after_idle(self._step)
+        else:
+            self._finish(notify=True)
+
+    def _finish(self, notify):
+        if self.finished:
+            return
+        self.finished = True
+        self._lines = []
+        self.widget.configure(state="normal")
+        if notify and self.on_done:
+            self.on_done()
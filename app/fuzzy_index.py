@@ -0,0 +1,305 @@
+import heapq
+import keyword
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from .db_schema import CHANGE_LOG_TABLE, CODE_COLUMNS, CODE_SOURCE, decode_code
+from .name_index import fold
+
+# Fracción mínima de los trigramas de la consulta que debe tener un término
+MIN_SIMILARITY = 0.4
+
+# Peso de una coincidencia con un identificador del código (frente al nombre)
+CODE_WEIGHT = 0.6
+
+# Resultados devueltos por defecto
+FUZZY_LIMIT = 50
+
+# Con más cambios pendientes que esta fracción del índice, se reconstruye entero
+REBUILD_RATIO = 0.25
+
+# Palabras y identificadores: letras, dígitos y '_' (que separa palabras)
+_WORD = re.compile(r"[^\W_]+")
+_IDENTIFIER = re.compile(r"\b[^\W\d]\w{2,}")
+
+
+def trigrams(text):
+    """
+    Conjunto de trigramas de un texto, palabra a palabra.
+
+    Cada palabra normalizada (sin mayúsculas ni tildes) se rellena con dos
+    espacios delante y uno detrás, como hace pg_trgm, para que el principio
+    y el final de la palabra pesen más que el centro.
+    """
+    grams = set()
+    for word in _WORD.findall(fold(text)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def identifiers(code):
+    """Identificadores de un fragmento de código (sin palabras reservadas)."""
+    return {name for name in _IDENTIFIER.findall(code or "") if not keyword.iskeyword(name)}
+
+
+class TrigramIndex:
+    """
+    Índice de trigramas para buscar categorías con faltas de ortografía.
+
+    Indexa términos: el nombre de cada categoría y, opcionalmente, los
+    identificadores de su código. Cada término guarda las categorías en las
+    que aparece, de modo que un identificador repetido en muchos fragmentos
+    se indexa una sola vez. Las listas de términos por trigrama se mantienen
+    exactas al añadir y quitar categorías, sin reconstruir el índice.
+    """
+
+    def __init__(self):
+        self._terms = []  # id de término -> texto (None si está libre)
+        self._term_ids = {}  # texto -> id de término
+        self._sizes = array("i")  # id de término -> número de trigramas
+        self._owners = []  # id de término -> {id de categoría: peso}
+        self._free = []  # ids de término que se pueden reutilizar
+        self._postings = {}  # trigrama -> array de ids de término
+        self._categories = {}  # id de categoría -> (nombre, ids de término)
+        self._by_name = {}  # nombre -> id de categoría
+
+    def __len__(self):
+        return len(self._categories)
+
+    def __contains__(self, category_id):
+        return category_id in self._categories
+
+    def add(self, category_id, name, code=None):
+        """
+        Añade (o sustituye) una categoría.
+
+        :param category_id: Id de la categoría.
+        :param name: Nombre de la categoría.
+        :param code: Código cuyos identificadores se indexan (None para no indexarlo).
+        """
+        if category_id in self._categories:
+            self.remove(category_id)
+        terms = {name: 1.0}
+        for name_in_code in identifiers(code):
+            terms.setdefault(name_in_code, CODE_WEIGHT)
+        term_ids = []
+        for term, weight in terms.items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._add_term(term)
+                if term_id is None:
+                    continue  # Sin letras ni dígitos: nada que indexar
+            owners = self._owners[term_id]
+            owners[category_id] = max(weight, owners.get(category_id, 0.0))
+            term_ids.append(term_id)
+        self._categories[category_id] = (name, tuple(term_ids))
+        self._by_name[name] = category_id
+
+    def remove(self, category_id):
+        """Quita una categoría del índice (no hace nada si no está)."""
+        entry = self._categories.pop(category_id, None)
+        if entry is None:
+            return
+        name, term_ids = entry
+        if self._by_name.get(name) == category_id:
+            del self._by_name[name]
+        for term_id in term_ids:
+            owners = self._owners[term_id]
+            owners.pop(category_id, None)
+            if not owners:
+                self._drop_term(term_id)
+
+    def remove_name(self, name):
+        """Quita la categoría con ese nombre, si está en el índice."""
+        category_id = self._by_name.get(name)
+        if category_id is not None:
+            self.remove(category_id)
+
+    def _add_term(self, term):
+        """Registra un término nuevo y devuelve su id (None si no tiene trigramas)."""
+        grams = trigrams(term)
+        if not grams:
+            return None
+        if self._free:
+            term_id = self._free.pop()
+            self._terms[term_id] = term
+            self._sizes[term_id] = len(grams)
+            self._owners[term_id] = {}
+        else:
+            term_id = len(self._terms)
+            self._terms.append(term)
+            self._sizes.append(len(grams))
+            self._owners.append({})
+        self._term_ids[term] = term_id
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = array("i", (term_id,))
+            else:
+                posting.append(term_id)
+        return term_id
+
+    def _drop_term(self, term_id):
+        """Quita un término que ya no aparece en ninguna categoría."""
+        term = self._terms[term_id]
+        for gram in trigrams(term):
+            posting = self._postings[gram]
+            posting.remove(term_id)
+            if not posting:
+                del self._postings[gram]
+        del self._term_ids[term]
+        self._terms[term_id] = None
+        self._owners[term_id] = None
+        self._free.append(term_id)
+
+    def search(self, text, limit=FUZZY_LIMIT, min_similarity=MIN_SIMILARITY):
+        """
+        Busca las categorías cuyos términos se parecen al texto.
+
+        La puntuación de un término combina la fracción de trigramas de la
+        consulta que contiene y su similitud de Jaccard (que penaliza los
+        términos mucho más largos que la consulta). Cada categoría puntúa
+        con su mejor término; los del código pesan CODE_WEIGHT.
+
+        :param text: Texto a buscar, con o sin faltas.
+        :param limit: Número máximo de resultados.
+        :param min_similarity: Fracción mínima de trigramas compartidos.
+        :return: Lista de tuplas (id, nombre, puntuación entre 0 y 1), de
+            mayor a menor puntuación.
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+        needed = max(1, math.ceil(min_similarity * len(grams)))
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        # Un término con `needed` trigramas en común aparece por fuerza en alguna
+        # de las listas más cortas: solo esas generan candidatos
+        split = len(grams) - needed + 1
+        counts = Counter()
+        for posting in postings[:split]:
+            counts.update(posting)
+        rest = postings[split:]
+        if sum(map(len, rest)) <= 16 * len(counts):
+            # Contar el resto en C es más barato que recalcular los trigramas;
+            # los términos que solo están en esas listas no llegan a `needed`
+            for posting in rest:
+                counts.update(posting)
+        else:
+            counts = {term_id: len(grams & trigrams(self._terms[term_id])) for term_id in counts}
+
+        # Se recorren los términos de más a menos trigramas en común: la
+        # puntuación nunca supera common / query_size, así que en cuanto ese
+        # máximo no alcanza al último de los `limit` mejores se deja de buscar
+        buckets = {}
+        for term_id, common in counts.items():
+            if common >= needed:
+                buckets.setdefault(common, []).append(term_id)
+        best = {}
+        query_size = len(grams)
+        sizes = self._sizes
+        for common in sorted(buckets, reverse=True):
+            if len(best) >= limit and common / query_size < heapq.nlargest(limit, best.values())[-1]:
+                break
+            coverage = common / query_size
+            for term_id in buckets[common]:
+                score = (coverage + common / (query_size + sizes[term_id] - common)) / 2
+                for category_id, weight in self._owners[term_id].items():
+                    if score * weight > best.get(category_id, 0.0):
+                        best[category_id] = score * weight
+
+        top = heapq.nlargest(limit, best.items(), key=lambda item: (item[1], -item[0]))
+        return [(category_id, self._categories[category_id][0], score) for category_id, score in top]
+
+
+class FuzzySearch:
+    """
+    Búsqueda aproximada sobre una base de datos de DiccioPynthon.
+
+    Mantiene un TrigramIndex en memoria que se construye la primera vez que
+    se usa y después se actualiza de forma incremental leyendo el registro
+    de cambios (category_changes): solo se reindexan las categorías
+    añadidas, editadas o borradas desde la última consulta, venga el cambio
+    de esta aplicación, de otro proceso o de una sincronización.
+    """
+
+    def __init__(self, db_actions, include_code=True):
+        """
+        :param db_actions: Instancia de DatabaseActions.
+        :param include_code: Si es True, indexa también los identificadores del código.
+        """
+        self.db_actions = db_actions
+        self.include_code = include_code
+        self._index = None
+        self._last_seq = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Descarta el índice (por ejemplo, tras restaurar una copia de seguridad)."""
+        with self._lock:
+            self._index = None
+
+    def refresh(self):
+        """Pone el índice al día con la base de datos; lo construye si no existe."""
+        with self._lock:
+            self._refresh()
+
+    def search(self, text, limit=FUZZY_LIMIT):
+        """
+        Actualiza el índice y busca en él (ver `TrigramIndex.search`).
+
+        :return: Lista de tuplas (id, nombre, puntuación).
+        """
+        with self._lock:
+            self._refresh()
+            return self._index.search(text, limit)
+
+    def _refresh(self):
+        db = self.db_actions.db
+        # Una sola transacción de lectura: el contenido y la secuencia coinciden
+        with self.db_actions.transaction("DEFERRED"):
+            last_seq = db.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {CHANGE_LOG_TABLE}").fetchone()[0]
+            if self._index is not None and last_seq == self._last_seq:
+                return
+            changes = None
+            if self._index is not None and last_seq > self._last_seq:
+                changes = db.execute(
+                    f"SELECT name, op FROM {CHANGE_LOG_TABLE} WHERE seq > ? ORDER BY seq",
+                    (self._last_seq,),
+                ).fetchall()
+            if changes is None or len(changes) > REBUILD_RATIO * len(self._index) + 100:
+                self._rebuild()
+            else:
+                self._apply(changes)
+            self._last_seq = last_seq
+
+    def _rebuild(self):
+        """Construye el índice desde cero recorriendo todas las categorías."""
+        index = TrigramIndex()
+        if self.include_code:
+            for category_id, name, code in self.db_actions.iter_categories(columns=("id", "name", "code")):
+                index.add(category_id, name, code)
+        else:
+            for category_id, name in self.db_actions.iter_categories(columns=("id", "name")):
+                index.add(category_id, name)
+        self._index = index
+
+    def _apply(self, changes):
+        """Aplica al índice los cambios del registro (el último de cada nombre)."""
+        db = self.db_actions.db
+        for name, op in changes:
+            self._index.remove_name(name)
+            if op != "upsert":
+                continue
+            if self.include_code:
+                row = db.execute(
+                    f"SELECT c.id, {CODE_COLUMNS} FROM {CODE_SOURCE} WHERE c.name = ?", (name,)
+                ).fetchone()
+                if row:
+                    self._index.add(row[0], name, decode_code(*row[1:]))
+            else:
+                row = db.execute("SELECT id FROM categories WHERE name = ?", (name,)).fetchone()
+                if row:
+                    self._index.add(row[0], name)
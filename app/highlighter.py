@@ -0,0 +1,355 @@
+from functools import lru_cache
+from pygments.lexers import PythonLexer
+from pygments.styles import get_style_by_name
+from pygments.token import String, Whitespace
+
+# Líneas que se analizan en cada paso mientras la interfaz está ociosa
+IDLE_CHUNK_LINES = 300
+
+# Pausa (ms) entre pasos, para que Tk atienda el teclado y redibuje
+IDLE_DELAY_MS = 1
+
+# Estado del analizador al principio del texto (y de cualquier línea
+# que empiece fuera de cadenas y otros tokens de varias líneas)
+ROOT_STATE = ("root",)
+
+# Por encima de estos caracteres el código se muestra como texto plano
+PLAIN_TEXT_LIMIT = 1_000_000
+
+
+@lru_cache(maxsize=None)
+def style_table(style_name, default_fg):
+    """
+    Colores de un estilo de Pygments, calculados una vez por proceso.
+
+    :return: Tupla de (tipo de token, etiqueta, color).
+    """
+    return tuple(
+        (token, str(token), "#" + options["color"] if options["color"] else default_fg)
+        for token, options in get_style_by_name(style_name)
+    )
+
+
+class EditHook:
+    """
+    Avisa de cada inserción o borrado en un widget Text antes de que ocurra.
+
+    Renombra el comando Tcl del widget y pone en su lugar uno de Python que
+    lo reenvía (como el WidgetRedirector de IDLE), así que también ve las
+    ediciones que Tk hace por su cuenta: pegar, deshacer y rehacer.
+    `on_edit(first, last, added)` recibe líneas desde 0: las líneas
+    `first`..`last` pasarán a ser `first`..`first + added`.
+    """
+
+    def __init__(self, widget, on_edit):
+        """
+        :param widget: Widget Text a vigilar.
+        :param on_edit: Función que recibe (first, last, added).
+        """
+        self.widget = widget
+        self.on_edit = on_edit
+        self._orig = widget._w + "_orig"
+        widget.tk.call("rename", widget._w, self._orig)
+        widget.tk.createcommand(widget._w, self._dispatch)
+        widget.bind("<Destroy>", lambda event: self._remove(), add="+")
+
+    def _remove(self):
+        """Borra el comando de Python (el original lo borra Tk con la ventana)."""
+        try:
+            self.widget.tk.deletecommand(self.widget._w)
+        except Exception:
+            pass
+
+    def _line(self, index, last_line):
+        """Línea (desde 0) de un índice, sin pasar de la última."""
+        line = int(str(self.widget.tk.call(self._orig, "index", index)).split(".")[0]) - 1
+        return min(line, last_line)
+
+    def _dispatch(self, operation, *args):
+        if operation in ("insert", "delete", "replace") and args:
+            last_line = self._line("end-1c", 1 << 62)
+            if operation == "insert":
+                added = "".join(str(chars) for chars in args[1::2]).count("\n")
+                line = self._line(args[0], last_line)
+                self.on_edit(line, line, added)
+            else:
+                # Varios rangos en un mismo delete: Tk los borra de atrás hacia delante
+                pairs = [args[:2]] if operation == "replace" else [args[i:i + 2] for i in range(0, len(args), 2)]
+                ranges = []
+                for pair in pairs:
+                    first = self._line(pair[0], last_line)
+                    last = self._line(pair[1] if len(pair) > 1 else f"{pair[0]}+1c", last_line)
+                    if last >= first:
+                        ranges.append((first, last))
+                for first, last in sorted(ranges, reverse=True):
+                    self.on_edit(first, last, 0)
+                if operation == "replace" and ranges:
+                    line = ranges[0][0]
+                    self.on_edit(line, line, "".join(str(chars) for chars in args[2::2]).count("\n"))
+        return self.widget.tk.call((self._orig, operation) + args)
+
+
+class SyntaxHighlighter:
+    """
+    Resaltado de sintaxis incremental para un widget Text con código Python.
+
+    Recuerda qué líneas empiezan en el estado inicial del analizador de
+    Pygments (fuera de cadenas de varias líneas) y, gracias a EditHook, qué
+    líneas ha tocado cada edición. Tras una edición se vuelve a analizar
+    desde la última línea en estado inicial anterior al cambio, leyendo el
+    texto del widget por tramos, y el análisis se detiene en cuanto una
+    línea posterior al cambio vuelve a empezar en el estado inicial, como
+    antes (el resto del texto no cambia de color). Primero se colorea
+    hasta el final de la zona visible; lo demás se completa por tramos en
+    segundo plano.
+    """
+
+    def __init__(self, text_widget, style_name="default", default_fg=None, chunk_lines=IDLE_CHUNK_LINES,
+                 max_chars=PLAIN_TEXT_LIMIT, edit_hook=EditHook):
+        """
+        :param text_widget: Widget Text a colorear.
+        :param style_name: Estilo de Pygments ("default", "monokai"...).
+        :param default_fg: Color de los tokens sin color en el estilo.
+        :param chunk_lines: Líneas por paso del análisis en segundo plano.
+        :param max_chars: Tamaño a partir del cual no se colorea (texto plano).
+        :param edit_hook: Clase que avisa de las ediciones del widget (ver EditHook).
+        """
+        self.text = text_widget
+        self.lexer = PythonLexer()
+        self.chunk_lines = chunk_lines
+        self.max_chars = max_chars
+        self.plain = False  # True mientras el texto supera `max_chars`
+        self._tag_names = {}  # tipo de token -> etiqueta (el ancestro con estilo)
+        self._configure_tags(style_name, default_fg)
+
+        self._states = []  # Por línea: ROOT_STATE si empieza en el estado inicial, si no None
+        self._dirty = None  # Líneas [primera, última + 1) editadas desde el último `update`
+        self._job = None  # Generador del análisis en curso
+        self._frontier = 0  # Hasta esta línea, colores y estados están al día
+        self._must_reach = 0  # El análisis no puede darse por terminado antes de esta línea
+        self._pending = {}  # etiqueta -> índices (inicio, fin, ...) aún sin aplicar
+        self._pending_states = {}  # línea -> estado, se guardan junto con los colores
+        self._used_tags = set()
+        self._after_id = None
+        self._reset()
+        self._hook = edit_hook(text_widget, self._on_edit)
+        self.text.bind("<Destroy>", lambda event: self._cancel_idle(), add="+")
+
+    def _configure_tags(self, style_name, default_fg):
+        """Configura una sola vez las etiquetas de color del estilo."""
+        for token, tag, foreground in style_table(style_name, default_fg):
+            self.text.tag_configure(tag, foreground=foreground)
+            self._tag_names[token] = tag
+
+    def _tag_for(self, token):
+        """Etiqueta de un tipo de token: la suya o la del ancestro más cercano con estilo."""
+        name = self._tag_names.get(token)
+        if name is None:
+            parent = token
+            while parent not in self._tag_names and parent.parent is not None:
+                parent = parent.parent
+            name = self._tag_names.get(parent, str(parent))
+            self._tag_names[token] = name
+        return name
+
+    # --- Ediciones -----------------------------------------------------------
+
+    def _reset(self):
+        """Olvida los estados: el próximo `update` colorea todo el texto."""
+        lines = int(self.text.index("end-1c").split(".")[0])
+        self._states = [ROOT_STATE] + [None] * (lines - 1)
+        self._dirty = (0, lines)
+
+    def _on_edit(self, first, last, added):
+        """Ajusta los estados a una edición (la llama EditHook antes de hacerla)."""
+        removed = last - first
+
+        def shift(line):
+            return line + added - removed if line > last else min(line, first)
+
+        self._states[first + 1:last + 1] = [None] * added
+        dirty = (first, first + added + 1)
+        if self._job is not None:
+            # Lo que el análisis interrumpido no llegó a recorrer sigue pendiente
+            self._cancel_idle()
+            self._job = None
+            self._pending = {}
+            self._pending_states.clear()
+            dirty = (min(first, shift(self._frontier)), max(dirty[1], shift(self._must_reach), shift(self._frontier) + 1))
+        if self._dirty is not None:
+            dirty = (min(dirty[0], shift(self._dirty[0])), max(dirty[1], shift(self._dirty[1] - 1) + 1))
+        self._dirty = dirty
+
+    def update(self, event=None):
+        """
+        Vuelve a colorear lo que haya cambiado desde la última llamada.
+
+        Las líneas cambiadas las anota EditHook en cada edición (teclas,
+        pegar, deshacer, cargar un archivo), así que no se lee ni se compara
+        el texto entero.
+        """
+        count = self.text.count("1.0", "end-1c", "chars")
+        chars = (count[0] if isinstance(count, tuple) else count) or 0
+        if chars > self.max_chars:
+            if not self.plain:
+                self._clear()
+            return
+        if self.plain:
+            self.plain = False
+            self._reset()
+        if self._dirty is None:
+            return
+        first, end = self._dirty
+        self._dirty = None
+        start = min(first, len(self._states) - 1)
+        # Se retrocede hasta una línea en el estado inicial: dentro de una cadena
+        # de triple comilla, cerrarla más abajo convierte su apertura en un
+        # docstring (un único token desde la comilla de apertura)
+        while self._states[start] != ROOT_STATE:
+            start -= 1
+        self._must_reach = max(end, start + 1)
+        self._restart(start)
+        self._run(self._last_visible_line() + 1)
+
+    def _clear(self):
+        """Quita todos los colores (modo texto plano)."""
+        self._cancel_idle()
+        for tag in self._used_tags:
+            self.text.tag_remove(tag, "1.0", "end")
+        self._used_tags = set()
+        self._job = None
+        self._pending = {}
+        self._pending_states.clear()
+        self._frontier = 0
+        self._must_reach = 0
+        self.plain = True
+
+    def _restart(self, line):
+        """Empieza a analizar desde el principio de `line`."""
+        self._cancel_idle()
+        self._pending = {}
+        self._pending_states.clear()
+        self._frontier = line
+        self._job = self._scan(line)
+
+    def _last_visible_line(self):
+        """Última línea (desde 0) visible en el widget."""
+        return int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0]) - 1
+
+    # --- Análisis ------------------------------------------------------------
+
+    def _run(self, stop_line):
+        """Avanza el análisis hasta `stop_line`; si no termina, sigue en segundo plano."""
+        for line, converged in self._job:
+            if converged:
+                self._finish(line)
+                return
+            if line >= stop_line:
+                self._flush(line)
+                self._after_id = self.text.after(IDLE_DELAY_MS, self._continue)
+                return
+        self._finish(len(self._states))
+
+    def _continue(self):
+        """Siguiente tramo del análisis en segundo plano."""
+        self._after_id = None
+        if self._job is not None:
+            self._run(self._frontier + self.chunk_lines)
+
+    def _finish(self, line):
+        """Aplica los últimos colores y da el análisis por terminado."""
+        self._flush(line)
+        self._job = None
+        self._must_reach = 0
+
+    def _cancel_idle(self):
+        if self._after_id is not None:
+            self.text.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _flush(self, line):
+        """Sustituye los colores de las líneas [frontier, line) por los calculados."""
+        if line <= self._frontier:
+            return
+        start, end = f"{self._frontier + 1}.0", f"{line + 1}.0"
+        for tag in self._used_tags:
+            self.text.tag_remove(tag, start, end)
+        for tag, indices in self._pending.items():
+            self.text.tag_add(tag, *indices)
+            self._used_tags.add(tag)
+        # Un estado solo vale para detenerse si los colores que le siguen están aplicados
+        for pending_line, state in self._pending_states.items():
+            self._states[pending_line] = state
+        self._pending = {}
+        self._pending_states.clear()
+        self._frontier = line
+
+    def _scan(self, line):
+        """
+        Analiza el texto desde el principio de `line`, que está en el estado inicial.
+
+        Lee del widget tramos de `chunk_lines` líneas y los pasa a
+        `get_tokens_unprocessed` de Pygments. Fuera de las cadenas, el
+        analizador emite cada salto de línea como un token propio de
+        espacio en blanco: la línea siguiente empieza en el estado inicial.
+        Al llegar a una de esas líneas, sus tokens pasan a `_pending` y sus
+        estados a `_pending_states`, y se genera (línea, convergido);
+        convergido indica que la línea también empezaba en el estado inicial
+        en el análisis anterior y que ya no queda ningún cambio por recorrer.
+        Lo que queda después de la última de esas líneas de un tramo (una
+        cadena sin cerrar dentro del tramo) se descarta y se vuelve a
+        analizar desde ella, con un tramo el doble de largo si no avanzó.
+        """
+        states = self._states
+        window = self.chunk_lines
+        while True:
+            chunk_start = line
+            end = min(len(states), line + window)
+            text = self.text.get(f"{line + 1}.0", f"{end}.end") + "\n"
+            tokens = {}  # etiqueta -> índices desde la última línea en estado inicial
+            line_states = {}
+            current = line  # Línea en la que termina el último token
+            token_line, token_line_start = line, 0  # Línea del último token y dónde empieza
+            interpolation = 0  # Llaves de f-string abiertas: dentro, un salto de línea no es del estado inicial
+            for token_pos, token, value in self.lexer.get_tokens_unprocessed(text):
+                if not value:
+                    continue
+                if not value.isspace():
+                    newlines = text.count("\n", token_line_start, token_pos)
+                    if newlines:
+                        token_line += newlines
+                        token_line_start = text.rindex("\n", 0, token_pos) + 1
+                    indices = tokens.setdefault(self._tag_for(token), [])
+                    indices.append(f"{token_line + 1}.{token_pos - token_line_start}")
+                    indices.append(f"{token_line + 1}.{token_pos - token_line_start}+{len(value)}c")
+                    if token in String.Interpol and value in ("{", "}"):
+                        interpolation = max(0, interpolation + (1 if value == "{" else -1))
+                newlines = value.count("\n")
+                if not newlines:
+                    continue
+                # Las líneas que empiezan dentro de este token no tienen estado propio
+                for inner in range(current + 1, current + newlines):
+                    line_states[inner] = None
+                current += newlines
+                if current >= len(states):
+                    break
+                if value != "\n" or token not in Whitespace or interpolation:
+                    line_states[current] = None
+                    continue
+                for tag, indices in tokens.items():
+                    self._pending.setdefault(tag, []).extend(indices)
+                self._pending_states.update(line_states)
+                tokens, line_states = {}, {}
+                converged = current >= self._must_reach and states[current] == ROOT_STATE
+                self._pending_states[current] = ROOT_STATE
+                yield current, converged
+                line = current
+                window = self.chunk_lines
+            if end >= len(states):
+                # Último tramo: lo que queda se aplica al terminar
+                for tag, indices in tokens.items():
+                    self._pending.setdefault(tag, []).extend(indices)
+                self._pending_states.update(line_states)
+                return
+            if line == chunk_start:
+                window *= 2  # Ninguna línea del tramo empieza en el estado inicial
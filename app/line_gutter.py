@@ -0,0 +1,109 @@
+import tkinter as tk
+import tkinter.font as tkfont
+
+# Margen (px) a cada lado de los números
+GUTTER_PADDING = 6
+
+
+class LineNumberGutter(tk.Canvas):
+    """
+    Numeración de líneas de un widget Text que solo dibuja las líneas visibles.
+
+    Cada número se coloca a la altura que indica `dlineinfo` para su línea,
+    así que sigue alineado aunque las líneas largas ocupen varias filas
+    (wrap) o cambie el tamaño de la fuente. Redibujar cuesta lo mismo con
+    diez líneas que con cincuenta mil: nunca se recorre el documento entero.
+    """
+
+    def __init__(self, master, text_widget, **options):
+        """
+        :param master: Widget padre.
+        :param text_widget: Widget Text cuyas líneas se numeran.
+        :param options: Opciones de `tk.Canvas`; `fg` es el color de los números.
+        """
+        self.fg = options.pop("fg", "#808080")
+        # Sin borde: la coordenada y del Canvas coincide con la de `dlineinfo`
+        options.setdefault("highlightthickness", 0)
+        options.setdefault("borderwidth", 0)
+        options.setdefault("width", 40)
+        super().__init__(master, **options)
+        self.text = text_widget
+        self._pending = False
+        self._last = None  # (números y alturas, ancho, fuente) del último dibujo
+        # Fuente del Text y sus medidas; se recalculan solo cuando cambia la fuente
+        self._font_spec = None
+        self._font = None
+        self._font_key = None
+        self._widths = {}  # cifras -> ancho en píxeles
+
+        # Desplazamiento: se encadena con el yscrollcommand que tuviera el Text
+        self._scroll_command = self.text.cget("yscrollcommand")
+        self.text.configure(yscrollcommand=self._on_scroll)
+        # Ediciones: <<Modified>> solo se repite si se vuelve a poner a False
+        self.text.bind("<<Modified>>", self._on_modified, add="+")
+        self.text.bind("<Configure>", lambda event: self.schedule_redraw(), add="+")
+        self.bind("<Configure>", lambda event: self.schedule_redraw())
+
+    def _on_scroll(self, first, last):
+        """Reenvía la posición al yscrollcommand original y redibuja."""
+        if self._scroll_command:
+            self.tk.call(self._scroll_command, first, last)
+        self.schedule_redraw()
+
+    def _on_modified(self, event=None):
+        self.text.edit_modified(False)
+        self.schedule_redraw()
+
+    def schedule_redraw(self):
+        """Agrupa varias peticiones de redibujado en una sola (cuando Tk esté ocioso)."""
+        if not self._pending:
+            self._pending = True
+            self.after_idle(self.redraw)
+
+    def _update_font(self):
+        """Vuelve a crear la fuente y a medir si el Text ha cambiado de fuente (zoom)."""
+        font_spec = self.text.cget("font")
+        if font_spec != self._font_spec:
+            self._font_spec = font_spec
+            self._font = tkfont.Font(font=font_spec)
+            self._font_key = tuple(sorted(self._font.actual().items()))
+            self._widths = {}
+
+    def _width_for(self, digits):
+        """Ancho del margen para números de `digits` cifras (al menos tres)."""
+        digits = max(3, digits)
+        if digits not in self._widths:
+            self._widths[digits] = self._font.measure("9" * digits) + 2 * GUTTER_PADDING
+        return self._widths[digits]
+
+    def redraw(self):
+        """Dibuja los números de las líneas visibles del Text."""
+        self._pending = False
+        if not self.winfo_exists():
+            return
+        self._update_font()
+        last_line = int(self.text.index("end-1c").split(".")[0])
+        width = self._width_for(len(str(last_line)))
+
+        numbers = []
+        index = self.text.index("@0,0")
+        if not index.endswith(".0"):
+            # La primera fila visible continúa una línea partida: su número queda arriba
+            index = self.text.index(f"{index}+1line linestart")
+        while int(index.split(".")[0]) <= last_line:
+            info = self.text.dlineinfo(index)
+            if info is None:
+                break  # Primera línea fuera de la vista
+            numbers.append((index.split(".")[0], info[1]))
+            index = self.text.index(f"{index}+1line")
+
+        # Mover el cursor o escribir dentro de una línea no cambia nada que dibujar
+        state = (numbers, width, self._font_key)
+        if state == self._last:
+            return
+        self._last = state
+        if int(self.cget("width")) != width:
+            self.configure(width=width)
+        self.delete("all")
+        for number, y in numbers:
+            self.create_text(width - GUTTER_PADDING, y, anchor="ne", text=number, font=self._font_spec, fill=self.fg)
@@ -0,0 +1,278 @@
+"""
+Comprobación del código de los conceptos: errores de sintaxis y nombres no definidos.
+
+No depende de Tkinter, así que sirve tanto para el editor (en un hilo de
+trabajo) como para la línea de comandos. Los resultados se guardan por el
+SHA-1 del código: un fragmento que no ha cambiado no se vuelve a analizar.
+"""
+import ast
+import builtins
+import hashlib
+import symtable
+import threading
+from collections import OrderedDict
+
+# Resultados de análisis que se conservan en memoria
+LINT_CACHE_SIZE = 4096
+
+# Categorías leídas en cada paso al revisar toda la base de datos
+LINT_BATCH_SIZE = 200
+
+# Gravedad de cada diagnóstico
+ERROR = "error"  # El código no compila
+WARNING = "warning"  # Compila, pero fallaría al ejecutarse (nombre no definido)
+
+# Nombres que existen en cualquier módulo sin definirlos
+_MODULE_NAMES = set(dir(builtins)) | {
+    "__name__", "__file__", "__doc__", "__builtins__", "__spec__", "__loader__", "__package__", "__annotations__",
+}
+
+# Ámbitos que se analizan junto con el que los contiene. `symtable` no da
+# su columna, así que no se distinguen dos en la misma línea: al recorrer el
+# árbol se descartan las lecturas de sus variables propias (ver
+# `_names_with_scope`), que nunca son globales
+_INLINE_SCOPES = {"lambda", "listcomp", "setcomp", "dictcomp", "genexpr"}
+
+
+def code_hash(code):
+    """SHA-1 del código (clave de la caché de resultados)."""
+    return hashlib.sha1(code.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _char_column(line, byte_offset):
+    """Convierte una columna en bytes UTF-8 (la de `ast`) en columna en caracteres."""
+    return len(line.encode("utf-8", "surrogatepass")[:byte_offset].decode("utf-8", "ignore"))
+
+
+def check_code(code):
+    """
+    Analiza un fragmento de código sin ejecutarlo.
+
+    Primero lo compila: si hay un error de sintaxis se devuelve solo ese.
+    Si compila, busca los nombres que se leen sin estar definidos en el
+    módulo ni en los builtins (salvo que haya un `from ... import *`).
+
+    :param code: Código Python.
+    :return: Tupla de diagnósticos (línea desde 1, columna inicial, columna
+        final o None hasta el final de la línea, mensaje, gravedad), en
+        orden de aparición.
+    """
+    try:
+        compile(code, "<concepto>", "exec", dont_inherit=True)
+    except SyntaxError as e:
+        line = e.lineno or 1
+        column = max(0, (e.offset or 1) - 1)
+        end = getattr(e, "end_offset", None)
+        end_column = end - 1 if end and getattr(e, "end_lineno", line) == line and end - 1 > column else None
+        return ((line, column, end_column, e.msg, ERROR),)
+    except ValueError as e:  # Por ejemplo, un byte nulo en el código
+        return ((1, 0, None, str(e), ERROR),)
+
+    tree = ast.parse(code)
+    if any(isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names)
+           for node in ast.walk(tree)):
+        return ()  # Cualquier nombre podría venir del import *
+    undefined = _undefined_names(symtable.symtable(code, "<concepto>", "exec"))
+    if not undefined:
+        return ()
+    lines = code.split("\n")
+    diagnostics = []
+    for node, scope in _names_with_scope(tree):
+        if node.id in undefined.get(scope, ()):
+            text = lines[node.lineno - 1]
+            diagnostics.append((
+                node.lineno, _char_column(text, node.col_offset), _char_column(text, node.end_col_offset),
+                f"'{node.id}' no está definido", WARNING,
+            ))
+    return tuple(sorted(diagnostics))
+
+
+def _undefined_names(module_table):
+    """
+    Nombres globales leídos y nunca definidos, por ámbito.
+
+    :return: Diccionario (nombre del ámbito, línea) -> conjunto de nombres;
+        el módulo es (None, 0).
+    """
+    defined = set(_MODULE_NAMES)
+    tables = []
+    pending = [(module_table, (None, 0))]
+    while pending:
+        table, key = pending.pop()
+        tables.append((table, key))
+        for symbol in table.get_symbols():
+            if table.get_type() == "module" and (symbol.is_assigned() or symbol.is_imported()):
+                defined.add(symbol.get_name())
+            elif symbol.is_declared_global() and symbol.is_assigned():
+                defined.add(symbol.get_name())
+        for child in table.get_children():
+            inline = child.get_name() in _INLINE_SCOPES or child.get_type() not in ("function", "class")
+            pending.append((child, key if inline else (child.get_name(), child.get_lineno())))
+
+    undefined = {}
+    for table, key in tables:
+        for symbol in table.get_symbols():
+            if symbol.is_global() and symbol.is_referenced() and symbol.get_name() not in defined:
+                undefined.setdefault(key, set()).add(symbol.get_name())
+    return undefined
+
+
+def _names_with_scope(tree):
+    """
+    Genera (nodo Name de lectura, ámbito) recorriendo el árbol.
+
+    Los decoradores, valores por defecto, anotaciones y bases de clase se
+    evalúan en el ámbito que contiene la definición; el cuerpo, en el suyo.
+    Las comprensiones y lambdas comparten el ámbito del que las contiene,
+    pero no se generan las lecturas de las variables que definen ellas
+    mismas (variables del `for` y parámetros).
+    """
+    pending = [(tree, (None, 0), frozenset())]
+    while pending:
+        node, scope, local = pending.pop()
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load) and node.id not in local:
+                yield node, scope
+            continue
+        if isinstance(node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+            # El primer iterable se evalúa fuera; el resto ve las variables del `for`
+            inner = local | {name.id for generator in node.generators
+                             for name in ast.walk(generator.target) if isinstance(name, ast.Name)}
+            first = node.generators[0]
+            pending.append((first.iter, scope, local))
+            rest = [node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt]
+            rest += first.ifs
+            for generator in node.generators[1:]:
+                rest += [generator.iter] + generator.ifs
+            pending.extend((child, scope, inner) for child in rest)
+            continue
+        if isinstance(node, ast.Lambda):
+            arguments = node.args
+            all_args = arguments.posonlyargs + arguments.args + arguments.kwonlyargs
+            all_args += [arg for arg in (arguments.vararg, arguments.kwarg) if arg]
+            # `:=` dentro de una lambda también define una variable suya
+            inner = local | {arg.arg for arg in all_args} | {
+                target.target.id for target in ast.walk(node.body) if isinstance(target, ast.NamedExpr)
+            }
+            pending.append((node.body, scope, inner))
+            defaults = arguments.defaults + [default for default in arguments.kw_defaults if default]
+            pending.extend((child, scope, local) for child in defaults)
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            inner = (node.name, node.lineno)
+            for child in node.body:
+                pending.append((child, inner, frozenset()))
+            outer = list(node.decorator_list)
+            if isinstance(node, ast.ClassDef):
+                outer += node.bases + [keyword.value for keyword in node.keywords]
+            else:
+                arguments = node.args
+                outer += arguments.defaults + [default for default in arguments.kw_defaults if default]
+                all_args = arguments.posonlyargs + arguments.args + arguments.kwonlyargs
+                all_args += [arg for arg in (arguments.vararg, arguments.kwarg) if arg]
+                outer += [arg.annotation for arg in all_args if arg.annotation]
+                if node.returns:
+                    outer.append(node.returns)
+            pending.extend((child, scope, local) for child in outer)
+            continue
+        pending.extend((child, scope, local) for child in ast.iter_child_nodes(node))
+
+
+class LintCache:
+    """
+    Caché LRU de resultados de `check_code` por SHA-1 del código.
+
+    Es segura entre hilos: la usan a la vez el editor y la revisión de toda
+    la base de datos.
+    """
+
+    def __init__(self, max_items=LINT_CACHE_SIZE):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Devuelve los diagnósticos guardados para `key` (un SHA-1) o None."""
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, diagnostics):
+        """Guarda los diagnósticos de `key`."""
+        with self._lock:
+            self._items[key] = diagnostics
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+_cache = LintCache()
+
+
+def check_code_cached(code, cache=None):
+    """
+    Como `check_code`, pero sin volver a analizar un código ya analizado.
+
+    :param code: Código Python.
+    :param cache: LintCache a usar (por defecto, la compartida del proceso).
+    :return: Tupla de diagnósticos.
+    """
+    cache = _cache if cache is None else cache
+    key = code_hash(code)
+    diagnostics = cache.get(key)
+    if diagnostics is None:
+        diagnostics = check_code(code)
+        cache.put(key, diagnostics)
+    return diagnostics
+
+
+def cached_diagnostics(code, cache=None):
+    """Diagnósticos de `code` si ya se analizó antes; None si no están en la caché."""
+    return (_cache if cache is None else cache).get(code_hash(code))
+
+
+def lint_database(db_actions, progress=None, cache=None, batch_size=LINT_BATCH_SIZE):
+    """
+    Revisa el código de todas las categorías de la base de datos.
+
+    Las categorías se leen por páginas (nunca está toda la base de datos en
+    memoria) y los fragmentos ya analizados salen de la caché.
+
+    :param db_actions: Instancia de DatabaseActions.
+    :param progress: Función opcional que recibe (revisadas, total).
+    :param cache: LintCache a usar (por defecto, la compartida del proceso).
+    :param batch_size: Categorías leídas en cada paso.
+    :return: Lista de tuplas (nombre, diagnósticos) de las categorías con
+        algún problema, por orden de id.
+    """
+    total = db_actions.db.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+    problems = []
+    checked = 0
+    for _, name, code in db_actions.iter_categories(batch_size, columns=("id", "name", "code")):
+        diagnostics = check_code_cached(code or "", cache)
+        if diagnostics:
+            problems.append((name, diagnostics))
+        checked += 1
+        if progress and (checked % batch_size == 0 or checked == total):
+            progress(checked, total)
+    return problems
+
+
+def describe_problems(problems, limit=20):
+    """
+    Resumen legible del resultado de `lint_database`.
+
+    :param problems: Lista de tuplas (nombre, diagnósticos).
+    :param limit: Categorías que se detallan como máximo.
+    :return: Texto con una línea por categoría.
+    """
+    lines = []
+    for name, diagnostics in problems[:limit]:
+        line, _, _, message, _ = diagnostics[0]
+        more = f" (y {len(diagnostics) - 1} más)" if len(diagnostics) > 1 else ""
+        lines.append(f"{name}: línea {line}: {message}{more}")
+    if len(problems) > limit:
+        lines.append(f"... y {len(problems) - limit} conceptos más.")
+    return "\n".join(lines)
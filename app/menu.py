@@ -14,7 +14,10 @@ def create_menu(self, open_update_manager):
     file_menu = tk.Menu(menu_bar, tearoff=0)  # tearoff=0 elimina la línea punteada
     file_menu.add_command(label="Ollama", command=lambda: run_ollama(self.root)) 
     file_menu.add_separator()
-    file_menu.add_command(label="Exportar a PDF", command=lambda: export_to_pdf(self.db_actions))
+    file_menu.add_command(label="Exportar a PDF", command=lambda: export_to_pdf(self.db_actions, self.background_worker, self.root))
+    file_menu.add_command(label="Exportar conceptos (JSONL)", command=self.exportar_jsonl)
+    file_menu.add_command(label="Importar conceptos (JSONL)", command=self.importar_jsonl)
+    file_menu.add_command(label="Revisar código de los conceptos", command=self.revisar_codigo)
     file_menu.add_separator()
     file_menu.add_command(label="Salir", command=self.root.quit)
     menu_bar.add_cascade(label="Archivo", menu=file_menu)
@@ -26,6 +29,11 @@ def create_menu(self, open_update_manager):
                              command=lambda: apply_theme_and_restart(self.root, "dark", self))
     preferences_menu.add_separator()
     preferences_menu.add_command(label="Importar BD", command=self.fusionar_base_datos)
+    preferences_menu.add_command(label="Exportar cambios", command=self.exportar_cambios)
+    preferences_menu.add_command(label="Importar cambios", command=self.importar_cambios)
+    preferences_menu.add_separator()
+    preferences_menu.add_command(label="Crear copia de seguridad", command=self.crear_copia_seguridad)
+    preferences_menu.add_command(label="Restaurar copia de seguridad", command=self.restaurar_copia_seguridad)
     preferences_menu.add_separator()
     preferences_menu.add_command(label="Buscar Actualizaciones", command=open_update_manager)  # Usar el argumento recibido
     preferences_menu.add_separator()
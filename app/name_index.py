@@ -0,0 +1,169 @@
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+# Consultas recientes cuyos resultados se reutilizan para acotar las siguientes
+QUERY_CACHE_SIZE = 16
+
+# Con menos caracteres solo se buscan prefijos: una letra suelta aparece en
+# casi todos los nombres y el resultado no ayudaría a encontrar nada
+MIN_SUBSTRING_LENGTH = 2
+
+# Separador de nombres en el texto de búsqueda (no puede aparecer en una consulta)
+_SEPARATOR = "\n"
+
+
+def fold(text):
+    """
+    Normaliza un texto para comparar: minúsculas y sin tildes ni diacríticos.
+
+    Sigue el mismo criterio que el índice FTS5 (remove_diacritics), de modo
+    que "canción" y "cancion" coinciden.
+    """
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+class IndexView:
+    """
+    Vista de solo lectura de una columna del índice en el orden de un resultado.
+
+    Evita copiar cientos de miles de ids o nombres para cada búsqueda: el
+    listado virtual solo lee las posiciones que muestra.
+    """
+
+    def __init__(self, values, positions, position_of=None):
+        """
+        :param values: Columna completa del índice (ids o nombres).
+        :param positions: Posiciones del resultado, en el orden a mostrar.
+        :param position_of: Diccionario valor -> posición, para `index()`.
+        """
+        self._values = values
+        self._positions = positions
+        self._position_of = position_of
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._values[position] for position in self._positions[item]]
+        return self._values[self._positions[item]]
+
+    def index(self, value):
+        """Posición de un valor dentro del resultado (ValueError si no está)."""
+        if self._position_of is None or value not in self._position_of:
+            raise ValueError(value)
+        return self._positions.index(self._position_of[value])
+
+
+class NameIndex:
+    """
+    Índice en memoria de los nombres de las categorías para el filtro en vivo.
+
+    Guarda los nombres normalizados ordenados, de modo que una consulta por
+    prefijo es una búsqueda binaria. Las coincidencias en mitad del nombre se
+    buscan en un único texto con todos los nombres (búsqueda en C con
+    `str.find`) y, si la consulta amplía otra reciente (se ha escrito una
+    letra más), solo se filtran los resultados de aquella.
+    """
+
+    def __init__(self, rows):
+        """
+        :param rows: Iterable de tuplas (id, nombre).
+        """
+        entries = sorted((fold(name), category_id, name) for category_id, name in rows)
+        self.folded = [entry[0] for entry in entries]
+        self.ids = array("q", (entry[1] for entry in entries))
+        self.names = [entry[2] for entry in entries]
+        self.position_of = {category_id: position for position, category_id in enumerate(self.ids)}
+        self._text = _SEPARATOR.join(self.folded) + _SEPARATOR
+        self._offsets = array("q", [0])
+        for name in self.folded:
+            self._offsets.append(self._offsets[-1] + len(name) + 1)
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def prefix_range(self, prefix):
+        """
+        Posiciones de los nombres que empiezan por `prefix` (búsqueda binaria).
+
+        :param prefix: Texto ya normalizado con `fold`.
+        :return: Tupla (inicio, fin) de posiciones en el índice.
+        """
+        start = bisect_left(self.folded, prefix)
+        end = bisect_right(self.folded, prefix + "\U0010ffff", start)
+        return start, end
+
+    def matches(self, text):
+        """
+        Posiciones de todos los nombres que contienen `text`, en orden alfabético.
+
+        :param text: Consulta ya normalizada con `fold`.
+        :return: Lista de posiciones (no debe modificarse).
+        """
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            return cached
+
+        # Una consulta anterior contenida en esta tiene más resultados: se filtran
+        base = None
+        for previous, positions in self._cache.items():
+            if previous in text and (base is None or len(positions) < len(base)):
+                base = positions
+        if base is not None:
+            folded = self.folded
+            result = [position for position in base if text in folded[position]]
+        elif self._text.count(text) > len(self) // 8:
+            # Con muchas coincidencias es más rápido recorrer la lista de nombres
+            result = [position for position, name in enumerate(self.folded) if text in name]
+        else:
+            result = self._scan(text)
+
+        self._cache[text] = result
+        if len(self._cache) > QUERY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def _scan(self, text):
+        """Busca `text` en el texto con todos los nombres y devuelve las posiciones."""
+        result = []
+        offsets = self._offsets
+        find = self._text.find
+        start = find(text)
+        while start != -1:
+            position = bisect_right(offsets, start) - 1
+            result.append(position)
+            start = find(text, offsets[position + 1])
+        return result
+
+    def search(self, text):
+        """
+        Filtra los nombres por el texto escrito.
+
+        Primero aparecen los que empiezan por el texto y después los que lo
+        contienen en otra posición, cada grupo en orden alfabético.
+
+        :param text: Texto tal y como lo escribe el usuario.
+        :return: Secuencia de posiciones en el índice (range o lista).
+        """
+        text = fold(text).replace(_SEPARATOR, " ")
+        start, end = self.prefix_range(text)
+        if len(text) < MIN_SUBSTRING_LENGTH:
+            return range(start, end)
+        # Las coincidencias están ordenadas: el tramo de prefijos se quita cortando
+        matches = self.matches(text)
+        low = bisect_left(matches, start)
+        high = bisect_left(matches, end, low)
+        return list(range(start, end)) + matches[:low] + matches[high:]
+
+    def view(self, positions):
+        """Devuelve (ids, nombres) de un resultado como vistas sin copiar."""
+        return (
+            IndexView(self.ids, positions, self.position_of),
+            IndexView(self.names, positions),
+        )
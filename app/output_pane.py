@@ -0,0 +1,198 @@
+import time
+import tkinter as tk
+import tkinter.font as tkfont
+from app.code_runner import runner_pool, describe_run
+from app.themes import THEMES
+
+# Intervalo (ms) con el que se recoge la salida de las ejecuciones en curso
+OUTPUT_POLL_MS = 30
+
+# Caracteres de salida que se muestran como máximo por ejecución
+MAX_RUN_OUTPUT = 200_000
+
+
+class OutputPane(tk.Text):
+    """
+    Salida de las ejecuciones de código (solo lectura).
+
+    Cada ejecución tiene su propia sección, con una cabecera, la salida
+    estándar y la de errores (en rojo) según van llegando, y una línea final
+    con el resultado y los tiempos. Varias ejecuciones a la vez no mezclan
+    su salida: cada una escribe al final de su sección, marcada con una
+    marca de Tk. Lo que se envía con `send_input` (ver InputLine) va a la
+    última ejecución en curso y se repite en su sección.
+    """
+
+    def __init__(self, master, pool=None, theme_name="light", **options):
+        """
+        :param master: Widget padre.
+        :param pool: RunnerPool a usar (por defecto, el compartido).
+        :param theme_name: Tema del que se toman los colores.
+        :param options: Opciones de `tk.Text` (tamaño, fuente...).
+        """
+        theme = THEMES.get(theme_name, THEMES["light"])
+        options.setdefault("wrap", tk.WORD)
+        options.setdefault("font", ("Courier", 10))
+        options.setdefault("height", 8)
+        options.setdefault("bg", theme["entry_bg"])
+        options.setdefault("fg", theme["entry_fg"])
+        super().__init__(master, **options)
+        self.configure(state=tk.DISABLED)
+        self.pool = pool
+        self._runs = {}  # CodeRun -> [marca, título, caracteres mostrados, termina en salto de línea]
+        self._count = 0
+        self._after_id = None
+
+        self._header_font = tkfont.Font(font=self.cget("font"))
+        self._header_font.configure(weight="bold")
+        self.tag_configure("header", font=self._header_font)
+        self.tag_configure("stderr", foreground="#FF5555" if theme_name == "dark" else "#CC0000")
+        self.tag_configure("summary", foreground="#808080")
+        self.tag_configure("stdin", foreground="#5599FF" if theme_name == "dark" else "#0055AA")
+
+        menu = tk.Menu(self, tearoff=False)
+        menu.add_command(label="Detener", command=self.stop_all)
+        menu.add_command(label="Limpiar", command=self.clear)
+        self.bind("<Button-3>", lambda event: menu.tk_popup(event.x_root, event.y_root))
+        self.bind("<Destroy>", lambda event: self.stop_all())
+
+    @property
+    def running(self):
+        """Indica si hay alguna ejecución en curso."""
+        return bool(self._runs)
+
+    def run(self, code, title=""):
+        """
+        Ejecuta código y muestra su salida en una sección nueva.
+
+        :param code: Código Python.
+        :param title: Texto de la cabecera (por ejemplo, el nombre del concepto).
+        :return: La CodeRun lanzada.
+        """
+        code_run = (self.pool or runner_pool()).run(code)
+        self._runs[code_run] = [None, title, 0, True]
+        self._open_section(code_run)
+        self.see(tk.END)
+        if self._after_id is None:
+            self._after_id = self.after(OUTPUT_POLL_MS, self._poll)
+        return code_run
+
+    def stop_all(self):
+        """Detiene todas las ejecuciones en curso (su sección se cierra al terminar)."""
+        for code_run in self._runs:
+            code_run.stop()
+
+    def send_input(self, text):
+        """
+        Envía texto a la entrada estándar de la última ejecución en curso.
+
+        :param text: Texto a enviar (se repite en la sección de la ejecución).
+        :return: True si alguna ejecución lo ha recibido.
+        """
+        for code_run in reversed(list(self._runs)):
+            if not code_run.done and code_run.send_input(text):
+                self.configure(state=tk.NORMAL)
+                self._write(self._runs[code_run], text, "stdin")
+                self.configure(state=tk.DISABLED)
+                self.see(tk.END)
+                return True
+        return False
+
+    def close_input(self):
+        """Cierra la entrada de la última ejecución en curso (input() recibe EOFError)."""
+        for code_run in reversed(list(self._runs)):
+            if not code_run.done:
+                code_run.close_input()
+                return
+
+    def clear(self):
+        """Vacía el panel; las ejecuciones en curso siguen en una sección nueva."""
+        self.configure(state=tk.NORMAL)
+        self.delete("1.0", tk.END)
+        self.configure(state=tk.DISABLED)
+        for code_run in self._runs:
+            self._open_section(code_run, continued=True)
+
+    def _open_section(self, code_run, continued=False):
+        """Añade la cabecera de una ejecución y la marca donde se escribe su salida."""
+        state = self._runs[code_run]
+        if state[0] is None:
+            self._count += 1
+            state[0] = f"run{self._count}"
+        title = f"{state[1]} " if state[1] else ""
+        suffix = "(continúa)" if continued else f"({time.strftime('%H:%M:%S')})"
+        self.configure(state=tk.NORMAL)
+        # Cabecera y una línea en blanco de separación; la salida va antes de esta
+        self.insert(tk.END, f"▶ {title}{suffix}\n", "header", "\n")
+        self.mark_set(state[0], "end-2c")
+        self.mark_gravity(state[0], tk.RIGHT)
+        self.configure(state=tk.DISABLED)
+        state[3] = True
+
+    def _poll(self):
+        """Escribe la salida llegada desde la última vez y cierra las ejecuciones terminadas."""
+        self._after_id = None
+        if not self.winfo_exists():
+            return
+        at_bottom = self.yview()[1] >= 1.0
+        self.configure(state=tk.NORMAL)
+        for code_run in list(self._runs):
+            state = self._runs[code_run]
+            for event in code_run.poll_events():
+                if event[0] == "done":
+                    separator = "" if state[3] else "\n"  # El resumen siempre en su propia línea
+                    self.insert(state[0], f"{separator}{describe_run(code_run)}\n", "summary")
+                    self.mark_unset(state[0])
+                    del self._runs[code_run]
+                else:
+                    self._write(state, event[1], event[0])
+        self.configure(state=tk.DISABLED)
+        if at_bottom:
+            self.see(tk.END)
+        if self._runs:
+            self._after_id = self.after(OUTPUT_POLL_MS, self._poll)
+
+    def _write(self, state, text, tag):
+        """Añade texto a la sección de una ejecución, hasta MAX_RUN_OUTPUT caracteres."""
+        if not text:
+            return
+        room = MAX_RUN_OUTPUT - state[2]
+        if room <= 0:
+            return
+        if len(text) > room:
+            text = text[:room] + "\n[… salida recortada …]\n"
+        state[2] += len(text)
+        state[3] = text.endswith("\n")
+        self.insert(state[0], text, tag)
+
+
+class InputLine(tk.Frame):
+    """
+    Línea de entrada para los programas de un OutputPane.
+
+    Con Intro se envía el texto (y un salto de línea) a la última ejecución
+    en curso, que lo recibe en `input()`; con Ctrl+D se le cierra la entrada.
+    """
+
+    def __init__(self, master, pane, theme_name="light"):
+        """
+        :param master: Widget padre.
+        :param pane: OutputPane al que se envía la entrada.
+        :param theme_name: Tema del que se toman los colores.
+        """
+        theme = THEMES.get(theme_name, THEMES["light"])
+        super().__init__(master, bg=theme["bg"])
+        self.pane = pane
+        tk.Label(self, text="Entrada:", bg=theme["bg"], fg=theme["fg"]).pack(side=tk.LEFT)
+        self.entry = tk.Entry(self, bg=theme["entry_bg"], fg=theme["entry_fg"], insertbackground=theme["entry_fg"])
+        self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        self.entry.bind("<Return>", self._send)
+        self.entry.bind("<Control-d>", lambda event: self.pane.close_input())
+
+    def _send(self, event=None):
+        """Envía la línea escrita; si no hay nada ejecutándose se queda en la caja."""
+        if self.pane.send_input(self.entry.get() + "\n"):
+            self.entry.delete(0, tk.END)
+        else:
+            self.entry.bell()
+        return "break"
@@ -0,0 +1,56 @@
+import tkinter as tk
+from tkinter import ttk
+from app.themes import apply_theme
+
+
+class ProgressDialog:
+    """Ventana pequeña con una barra de progreso y un botón para cancelar la operación."""
+
+    def __init__(self, root, title, message, on_cancel=None, theme_name="light"):
+        """
+        :param root: Ventana principal.
+        :param title: Título de la ventana.
+        :param message: Texto que describe la operación.
+        :param on_cancel: Función a llamar al pulsar "Cancelar" (sin botón si es None).
+        :param theme_name: Tema a aplicar.
+        """
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+        self.window.transient(root)
+        self.window.resizable(False, False)
+
+        self.label = tk.Label(self.window, text=message)
+        self.label.pack(padx=20, pady=(15, 5))
+        self.message = message
+
+        self.progress_bar = ttk.Progressbar(self.window, mode="indeterminate", length=280)
+        self.progress_bar.pack(padx=20, pady=5)
+        self.progress_bar.start(15)
+
+        if on_cancel:
+            self.cancel_button = tk.Button(self.window, text="Cancelar", command=on_cancel)
+            self.cancel_button.pack(pady=(5, 15))
+            self.window.protocol("WM_DELETE_WINDOW", on_cancel)
+        else:
+            self.window.protocol("WM_DELETE_WINDOW", lambda: None)
+
+        apply_theme(self.window, theme_name)
+
+    def update(self, done, total=None):
+        """Actualiza la barra; con `total` pasa a mostrar el porcentaje real."""
+        if not self.window.winfo_exists():
+            return
+        if total:
+            if str(self.progress_bar["mode"]) != "determinate":
+                self.progress_bar.stop()
+                self.progress_bar.configure(mode="determinate", maximum=total)
+            self.progress_bar["value"] = done
+            self.label.configure(text=f"{self.message} ({done} de {total})")
+        else:
+            self.label.configure(text=f"{self.message} ({done})")
+
+    def close(self):
+        """Cierra la ventana de progreso."""
+        if self.window.winfo_exists():
+            self.progress_bar.stop()
+            self.window.destroy()
@@ -0,0 +1,91 @@
+"""
+Proceso de trabajo que ejecuta un fragmento de código (ver `app.code_runner`).
+
+Se arranca por adelantado y queda esperando: lee de su entrada estándar
+una línea con el tamaño del código en bytes y después el código, lo
+ejecuta con la salida sin búfer y termina. El resto de la entrada queda
+para el código, así que `input()` lee lo que se escribe en la aplicación.
+Al acabar escribe en la salida estándar una marca con el tiempo real y el
+de CPU; la marca lleva un testigo aleatorio que se recibe como argumento,
+así que no se confunde con lo que imprima el código.
+
+Si la aplicación se cierra sin usarlo, la entrada se cierra sin cabecera
+y el proceso termina sin hacer nada.
+"""
+import builtins
+import linecache
+import os
+import sys
+import threading
+import time
+import traceback
+
+# Nombre de archivo con el que aparece el código en los tracebacks
+FILENAME = "<concepto>"
+
+
+def run(code):
+    """
+    Ejecuta el código como si fuera el script principal.
+
+    :return: Código de salida del proceso (0, 1 si hubo una excepción o el
+        indicado con sys.exit).
+    """
+    # Con el código en linecache, los tracebacks muestran las líneas
+    linecache.cache[FILENAME] = (len(code), None, code.splitlines(True), FILENAME)
+    namespace = {"__name__": "__main__", "__builtins__": builtins, "__file__": FILENAME}
+    sys.argv = [FILENAME]
+    try:
+        exec(compile(code, FILENAME, "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as e:
+        # Sin el marco de esta función: el traceback empieza en el concepto
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+    finally:
+        # Los hilos que haya lanzado el código cuentan en los tiempos
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread() and not thread.daemon:
+                thread.join()
+    return 0
+
+
+def read_code():
+    """
+    Lee el código de la entrada estándar sin consumir nada más.
+
+    :return: El código, o una cadena vacía si la entrada se cerró sin él.
+    """
+    header = sys.stdin.buffer.readline()
+    if not header.strip():
+        return ""
+    # sys.stdin lee del mismo búfer: lo que llegue detrás es para input()
+    return sys.stdin.buffer.read(int(header)).decode("utf-8", "replace")
+
+
+def main(token):
+    code = read_code()
+    if not code:
+        return 0
+    wall, cpu = time.perf_counter(), time.process_time()
+    status = run(code)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    try:
+        # Directamente al descriptor: el código puede haber sustituido sys.stdout
+        os.write(1, f"\x1e{token} {wall:.6f} {cpu:.6f}\n".encode("ascii"))
+    except OSError:
+        pass
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1]))
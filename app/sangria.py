@@ -1,42 +1,129 @@
+import re
 import tkinter as tk
-import jedi
 
-import re
+# Unidad de sangría
+INDENT = "    "
 
-def get_code_context(code, cursor_pos):
-    """Obtiene el contexto completo del código hasta la posición del cursor y devuelve el nivel de indentación adecuado."""
-    row, col = cursor_pos
-    lines = code.split("\n")
+# Líneas anteriores al cursor que se examinan como máximo: el coste de cada
+# Intro no depende del tamaño del archivo
+CONTEXT_LINES = 50
 
-    # Verificar las líneas anteriores para ver si pertenecen a una estructura de control
-    indentation = "    "  # Valor por defecto para la indentación (4 espacios)
+# Sentencias tras las que termina el bloque y la línea siguiente se desindenta
+DEDENT_KEYWORDS = {"return", "pass", "break", "continue", "raise"}
 
-    for line in reversed(lines[:row]):
-        stripped_line = line.strip()
+_OPENING = "([{"
+_CLOSING = ")]}"
 
-        if stripped_line.endswith(":"):  # Detectamos estructuras de control como if, for, etc.
-            # Si encontramos una estructura de control, asignamos una indentación mayor
-            indentation = "    "  # Incrementamos la indentación (por defecto, 4 espacios)
-            break
-        elif stripped_line == "":
-            # Si encontramos una línea vacía, dejamos de buscar
-            break
 
-    return indentation
+def _leading_whitespace(line):
+    """Espacios y tabuladores al principio de una línea."""
+    return line[:len(line) - len(line.lstrip(" \t"))]
 
-def on_enter(event, code_entry):
-    """Gestiona la acción de presionar Enter para aplicar la sangría dinámica."""
-    # Obtener la posición del cursor
-    cursor_pos = code_entry.index(tk.INSERT)
-    row, col = map(int, cursor_pos.split('.'))
 
-    # Obtener el código completo. 1.0 hace referencia a la posición de inicio en el widget de texto. Línea 1, columna 0. tk.ed se refiere al final del texto en el widget.
-    code_text = code_entry.get("1.0", tk.END)
+def _scan(lines):
+    """
+    Recorre las líneas siguiendo las reglas del tokenizador de Python.
+
+    Tiene en cuenta las cadenas (también las de triple comilla), los
+    comentarios, los paréntesis abiertos y las continuaciones con barra
+    invertida. Si el contexto empieza a mitad de una sentencia, los
+    paréntesis de cierre sin pareja se ignoran.
+
+    :param lines: Líneas hasta el cursor (la última, cortada en el cursor).
+    :return: Tupla (línea donde empieza la sentencia actual, pila de
+        paréntesis abiertos como (línea, columna), delimitador de la cadena
+        abierta o None, si la última línea acaba en barra invertida, código
+        de la sentencia sin comentarios ni contenido de cadenas).
+    """
+    brackets = []
+    string = None
+    continued = False
+    statement_start = 0
+    code = []
+    for number, line in enumerate(lines):
+        if not brackets and string is None and not continued:
+            statement_start = number
+            code = []
+        continued = False
+        column, length = 0, len(line)
+        while column < length:
+            char = line[column]
+            if string is not None:
+                if char == "\\":
+                    column += 2
+                elif line.startswith(string, column):
+                    column += len(string)
+                    string = None
+                else:
+                    column += 1
+                continue
+            if char == "#":
+                break
+            if char in "'\"":
+                string = char * 3 if line.startswith(char * 3, column) else char
+                column += len(string)
+                code.append("''")  # La cadena cuenta como un valor cualquiera
+                continue
+            if char in _OPENING:
+                brackets.append((number, column))
+            elif char in _CLOSING:
+                if brackets:
+                    brackets.pop()
+            elif char == "\\" and column == length - 1:
+                continued = True
+                break
+            code.append(char)
+            column += 1
+        if string is not None and len(string) == 1 and not line.endswith("\\"):
+            string = None  # Una cadena de comilla simple termina con la línea
+        code.append(" ")
+    return statement_start, brackets, string, continued, "".join(code).strip()
+
 
-    # Obtener la indentación adecuada basada en el contexto
-    new_indentation = get_code_context(code_text, (row-1, col))
+def get_indentation(lines):
+    """
+    Sangría de la línea nueva que se crea al pulsar Intro.
+
+    - Dentro de paréntesis: alineada con el primer elemento tras el paréntesis
+      abierto o, si el paréntesis cierra la línea, un nivel más que la sentencia.
+    - Tras una barra invertida: un nivel más que la sentencia.
+    - Dentro de una cadena de triple comilla: la de la línea actual.
+    - Tras ':' un nivel más; tras return/pass/break/continue/raise, uno menos;
+      en otro caso, la misma de la sentencia.
+
+    :param lines: Líneas anteriores al cursor y la actual hasta el cursor.
+    :return: Texto de la sangría.
+    """
+    statement_start, brackets, string, continued, code = _scan(lines)
+    base = _leading_whitespace(lines[statement_start])
+    if string is not None:
+        return _leading_whitespace(lines[-1])
+    if brackets:
+        number, column = brackets[-1]
+        line = lines[number]
+        rest = line[column + 1:].split("#", 1)[0]
+        if rest.strip():
+            # Alinear con lo que sigue al paréntesis (con espacios, como PEP 8)
+            return " " * (column + 1 + len(rest) - len(rest.lstrip()))
+        return base + INDENT
+    if continued:
+        return base + INDENT if statement_start == len(lines) - 1 else _leading_whitespace(lines[-1])
+    if code.endswith(":"):
+        return base + INDENT
+    first_word = re.match(r"\w*", code).group()
+    if first_word in DEDENT_KEYWORDS:
+        return base[:-len(INDENT)] if base.endswith(INDENT) else base[:-1]
+    return base
+
+
+def on_enter(event, code_entry):
+    """Gestiona la acción de presionar Enter para aplicar la sangría dinámica."""
+    # Solo las últimas CONTEXT_LINES líneas hasta el cursor, no el texto entero
+    context = code_entry.get(f"insert linestart -{CONTEXT_LINES} lines", tk.INSERT)
+    new_indentation = get_indentation(context.split("\n"))
 
     # Insertar la nueva línea con la indentación calculada
     code_entry.insert(tk.INSERT, f"\n{new_indentation}")
+    code_entry.see(tk.INSERT)
 
     return "break"  # Evitar que se ejecute el comportamiento predeterminado de Enter
@@ -0,0 +1,344 @@
+import tkinter as tk
+from bisect import bisect_left
+from collections import OrderedDict
+
+# Filas que se piden de una vez al cargar etiquetas
+PAGE_SIZE = 200
+
+# Filas extra que se materializan y precargan alrededor de las visibles
+OVERSCAN = 10
+
+# Páginas de etiquetas que se conservan en memoria
+MAX_CACHED_PAGES = 16
+
+# Texto de las filas cuya etiqueta aún se está cargando
+PLACEHOLDER = "…"
+
+
+class VirtualListbox(tk.Listbox):
+    """
+    Listbox virtual para listados muy grandes.
+
+    Solo contiene las filas visibles más un pequeño margen (`overscan`); el
+    resto del listado existe únicamente como una secuencia de claves (por
+    ejemplo, un array de ids). Las etiquetas se piden por páginas a
+    `load_labels` a medida que se desplaza la vista y se guardan en una
+    caché LRU de páginas. La selección se recuerda por clave, no por
+    posición, así que se mantiene aunque el listado se recargue.
+
+    El desplazamiento (rueda, teclado y barra) lo gestiona la propia clase:
+    para usar una barra de desplazamiento, llama a `attach_scrollbar`.
+    """
+
+    def __init__(self, master, page_size=PAGE_SIZE, overscan=OVERSCAN,
+                 max_pages=MAX_CACHED_PAGES, **options):
+        """
+        :param master: Widget padre.
+        :param page_size: Filas por petición de etiquetas.
+        :param overscan: Filas extra por encima y por debajo de las visibles.
+        :param max_pages: Páginas de etiquetas que se conservan en caché.
+        :param options: Opciones de `tk.Listbox` (altura, fuente, colores...).
+        """
+        options.setdefault("exportselection", False)
+        options["selectmode"] = tk.BROWSE
+        super().__init__(master, **options)
+        self.page_size = page_size
+        self.overscan = overscan
+        self.max_pages = max_pages
+
+        self._keys = ()
+        self._ordered = False
+        self._load_labels = None
+        self._labels = None
+        self._pages = OrderedDict()  # número de página -> lista de etiquetas
+        self._loading = set()
+        self._stale = {}  # clave -> etiqueta del listado anterior, mientras se recarga
+        self._generation = 0
+        self._top = 0
+        self._rendered = None
+        self._selected = None  # Posición de la fila seleccionada
+        self._selected_label = None  # Su etiqueta, aunque su página salga de la caché
+        self._scrollbar = None
+        self._render_pending = False
+
+        self.bind("<<ListboxSelect>>", self._on_select)
+        self.bind("<Configure>", lambda event: self._schedule_render())
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.bind("<Button-5>", lambda event: self._scroll_by(3))
+        self.bind("<Up>", lambda event: self._move_selection(-1))
+        self.bind("<Down>", lambda event: self._move_selection(1))
+        self.bind("<Prior>", lambda event: self._move_selection(-self._visible_rows()))
+        self.bind("<Next>", lambda event: self._move_selection(self._visible_rows()))
+        self.bind("<Home>", lambda event: self._move_selection(-len(self._keys)))
+        self.bind("<End>", lambda event: self._move_selection(len(self._keys)))
+
+    # --- Datos ---------------------------------------------------------------
+
+    def set_items(self, keys, load_labels=None, ordered=False, labels=None):
+        """
+        Sustituye el contenido del listado.
+
+        :param keys: Secuencia de claves (admite len, índices y cortes), por
+            ejemplo un array de ids o una lista de nombres.
+        :param load_labels: Función `load_labels(claves, callback)` que obtiene
+            las etiquetas de una página de claves y llama a `callback` con la
+            lista de etiquetas en el mismo orden (puede hacerlo más tarde,
+            desde el bucle de Tk). Si es None, la etiqueta es la propia clave.
+        :param ordered: Indica que las claves están ordenadas, para localizar
+            una clave por búsqueda binaria en lugar de recorrer la lista.
+        :param labels: Secuencia paralela a `keys` con las etiquetas ya
+            conocidas; si se indica, no se llama a `load_labels`.
+        """
+        top_key = self._keys[self._top] if self._top < len(self._keys) else None
+        selected_key = self.selected_key()
+        # Mientras llegan las etiquetas nuevas se muestran las que ya se veían
+        self._stale = {}
+        if self._rendered is not None:
+            first, rendered = self._rendered
+            for offset, label in enumerate(rendered):
+                if label != PLACEHOLDER and first + offset < len(self._keys):
+                    self._stale[self._keys[first + offset]] = label
+
+        self._keys = keys
+        self._ordered = ordered
+        self._load_labels = load_labels
+        self._labels = labels
+        self._pages.clear()
+        self._loading.clear()
+        self._generation += 1
+
+        # Se conserva la fila superior y la selección si siguen existiendo
+        top = self.index_of(top_key) if top_key is not None else None
+        self._top = top if top is not None else 0
+        self._selected = self.index_of(selected_key) if selected_key is not None else None
+        self._rendered = None
+        self._render()
+
+    def refresh(self):
+        """Vuelve a pedir las etiquetas de las claves actuales."""
+        self.set_items(self._keys, self._load_labels, self._ordered, self._labels)
+
+    def size(self):
+        """Número total de filas del listado (no solo las materializadas)."""
+        return len(self._keys)
+
+    def index_of(self, key):
+        """Posición de una clave en el listado o None si no está."""
+        if self._ordered:
+            index = bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                return index
+            return None
+        try:
+            return self._keys.index(key)
+        except ValueError:
+            return None
+
+    def key_at(self, index):
+        """Clave de la fila `index`."""
+        return self._keys[index]
+
+    def label_at(self, index):
+        """Etiqueta de una fila si ya está cargada (o None)."""
+        if self._labels is not None:
+            return self._labels[index]
+        if self._load_labels is None:
+            return str(self._keys[index])
+        page = self._pages.get(index // self.page_size)
+        if page is None:
+            return self._stale.get(self._keys[index])
+        label = page[index % self.page_size]
+        return None if label is PLACEHOLDER else label
+
+    # --- Selección -----------------------------------------------------------
+
+    def selected_index(self):
+        """Posición de la fila seleccionada o None."""
+        return self._selected
+
+    def selected_key(self):
+        """Clave de la fila seleccionada o None."""
+        return self._keys[self._selected] if self._selected is not None else None
+
+    def selected_label(self):
+        """Etiqueta de la fila seleccionada o None."""
+        if self._selected is None:
+            return None
+        return self.label_at(self._selected) or self._selected_label
+
+    def select_key(self, key, see=True):
+        """Selecciona la fila con la clave indicada y, opcionalmente, la hace visible."""
+        index = self.index_of(key)
+        if index is None:
+            return False
+        self._set_selected(index)
+        if see:
+            self.see_index(index)
+        self._render()
+        return True
+
+    def clear_selection(self):
+        """Quita la selección."""
+        self._set_selected(None)
+        self._render()
+
+    def _set_selected(self, index):
+        """Cambia la fila seleccionada y recuerda su etiqueta."""
+        self._selected = index
+        self._selected_label = self.label_at(index) if index is not None else None
+
+    def _on_select(self, event=None):
+        """Traduce la selección del Listbox (relativa) a una clave del listado."""
+        selection = self.curselection()
+        if not selection or self._rendered is None:
+            return
+        index = self._rendered[0] + selection[0]
+        if index < len(self._keys):
+            self._set_selected(index)
+
+    def _move_selection(self, delta):
+        """Mueve la selección con el teclado y desplaza la vista para seguirla."""
+        if not self._keys:
+            return "break"
+        current = self._selected
+        index = 0 if current is None else max(0, min(len(self._keys) - 1, current + delta))
+        self._set_selected(index)
+        self.see_index(index)
+        self._render()
+        self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    # --- Desplazamiento ------------------------------------------------------
+
+    def attach_scrollbar(self, scrollbar):
+        """Conecta una barra de desplazamiento vertical al listado virtual."""
+        self._scrollbar = scrollbar
+        scrollbar.configure(command=self.yview)
+        self._update_scrollbar()
+
+    def yview(self, *args):
+        """
+        Desplaza la vista; acepta los mismos argumentos que `Listbox.yview`
+        ("moveto", fracción) o ("scroll", n, "units"/"pages"), calculados
+        sobre el listado completo.
+        """
+        total = len(self._keys)
+        visible = self._visible_rows()
+        if not args:
+            if not total:
+                return 0.0, 1.0
+            return self._top / total, min(1.0, (self._top + visible) / total)
+        if args[0] == "moveto":
+            self._set_top(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self._scroll_by(amount * (visible if args[2] == "pages" else 1))
+        return None
+
+    def see_index(self, index):
+        """Desplaza la vista lo mínimo para que la fila `index` sea visible."""
+        visible = self._visible_rows()
+        if index < self._top:
+            self._set_top(index)
+        elif index >= self._top + visible:
+            self._set_top(index - visible + 1)
+
+    def _on_mousewheel(self, event):
+        """Rueda del ratón en Windows y macOS."""
+        self._scroll_by(-1 * (event.delta // 120 or (1 if event.delta > 0 else -1)) * 3)
+        return "break"
+
+    def _scroll_by(self, rows):
+        """Desplaza la vista `rows` filas."""
+        self._set_top(self._top + rows)
+        return "break"
+
+    def _set_top(self, top):
+        """Coloca la fila `top` en la parte superior de la vista."""
+        top = max(0, min(top, len(self._keys) - self._visible_rows()))
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _visible_rows(self):
+        """Filas que caben en la altura actual del widget."""
+        height = self.winfo_height()
+        if height <= 1:
+            return int(self.cget("height")) or 10
+        first, second = self.bbox(0), self.bbox(1)
+        if first and second:
+            line = second[1] - first[1]
+        else:
+            line = first[3] + 1 if first else 16
+        return max(1, height // max(line, 1))
+
+    def _update_scrollbar(self):
+        """Actualiza la posición y el tamaño del deslizador de la barra."""
+        if self._scrollbar is not None:
+            self._scrollbar.set(*self.yview())
+
+    # --- Dibujo --------------------------------------------------------------
+
+    def _schedule_render(self):
+        """Agrupa varios redibujados seguidos (por ejemplo, al redimensionar)."""
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _render(self):
+        """Materializa las filas visibles más el margen y pide las etiquetas que faltan."""
+        self._render_pending = False
+        total = len(self._keys)
+        visible = self._visible_rows()
+        self._top = max(0, min(self._top, total - visible))
+        first = self._top
+        last = min(total, first + visible + self.overscan)
+
+        self._request_pages(max(0, first - self.overscan), last)
+        labels = [self.label_at(index) or PLACEHOLDER for index in range(first, last)]
+
+        if self._rendered is None or self._rendered[0] != first or self._rendered[1] != labels:
+            tk.Listbox.delete(self, 0, tk.END)
+            if labels:
+                tk.Listbox.insert(self, tk.END, *labels)
+            self._rendered = (first, labels)
+        # El contenido empieza siempre en la fila superior de la vista
+        tk.Listbox.yview(self, 0)
+
+        tk.Listbox.selection_clear(self, 0, tk.END)
+        if self._selected is not None and first <= self._selected < last:
+            tk.Listbox.selection_set(self, self._selected - first)
+            tk.Listbox.activate(self, self._selected - first)
+        self._update_scrollbar()
+
+    # --- Carga de etiquetas --------------------------------------------------
+
+    def _request_pages(self, start, stop):
+        """Pide las páginas de etiquetas que cubren [start, stop) y aún no están."""
+        if self._labels is not None or self._load_labels is None or start >= stop:
+            return
+        for page in range(start // self.page_size, (stop - 1) // self.page_size + 1):
+            if page in self._pages:
+                self._pages.move_to_end(page)
+            elif page not in self._loading:
+                self._loading.add(page)
+                keys = self._keys[page * self.page_size:(page + 1) * self.page_size]
+                generation = self._generation
+                self._load_labels(keys, lambda labels, page=page, generation=generation:
+                                  self._page_loaded(generation, page, labels))
+
+    def _page_loaded(self, generation, page, labels):
+        """Guarda una página recibida y redibuja si afecta a la vista."""
+        if generation != self._generation:
+            return  # Petición de un listado que ya se ha sustituido
+        self._loading.discard(page)
+        self._pages[page] = [PLACEHOLDER if label is None else label for label in labels]
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        if self._selected is not None and self._selected // self.page_size == page:
+            self._selected_label = self.label_at(self._selected) or self._selected_label
+        if not self._loading:
+            self._stale = {}  # Ya no hacen falta las etiquetas del listado anterior
+        # Puede llegar durante un redibujado (etiquetas síncronas): se agrupa
+        self._schedule_render()
@@ -1,15 +1,34 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox, filedialog
-import subprocess
-import os
-from app.code_editor import open_code_editor
+from app.code_editor import open_code_editor, prepare_editor
 from app.menu import create_menu
 from app.updates import check_for_updates
-from app.db_actions import DatabaseActions
+from app.db_actions import (
+    DatabaseActions, MERGE_KEEP_LOCAL, MERGE_TAKE_IMPORTED, MERGE_KEEP_NEWEST, MERGE_RENAME,
+    describe_merge,
+)
+from app.db_worker import DatabaseWorker, TaskCancelled
 from app.config import load_config
+from app.db_sync import export_changes, import_changes
+from app.db_jsonl import export_jsonl, import_jsonl
+from app.db_backup import backup_database, restore_database, default_backup_dir
+from app.linter import lint_database, describe_problems
+from app.progress_dialog import ProgressDialog
+from app.virtual_list import VirtualListbox
+from app.code_preview import CodePreview, PREFETCH_RADIUS
+from app.output_pane import OutputPane, InputLine
+from app.code_runner import runner_pool, shutdown_runner_pool
+from app.name_index import NameIndex, fold
 from app.themes import apply_theme
 from app.buttons import create_buttons
 
+# Espera (ms) tras la última tecla antes de filtrar el listado
+FILTER_DELAY_MS = 120
+
+# Longitud mínima del texto para buscar por parecido si no hay coincidencias exactas
+FUZZY_MIN_LENGTH = 3
+
+
 class PythonConceptManagerApp:
     """
     Aplicación gráfica para gestionar categorías y conceptos de Python.
@@ -38,10 +57,25 @@ class PythonConceptManagerApp:
    
         # Conexión a la base de datos
         self.db_actions = DatabaseActions("conceptos.db")
+        # Todas las operaciones de base de datos se ejecutan en este hilo
+        self.db_worker = DatabaseWorker(self.db_actions, self.root)
+        # Las copias y exportaciones largas (solo lectura) van en otro hilo
+        # para no retrasar las ediciones
+        self.background_worker = DatabaseWorker(self.db_actions, self.root, name="background-worker")
+        # Búsquedas en memoria y construcción del índice de nombres
+        self.search_worker = DatabaseWorker(self.db_actions, self.root, name="search-worker")
+        self.list_task = None
+        self.filter_task = None
+        self.filter_after_id = None
+        # Índice de nombres para el filtro en vivo y listado con el que se construyó
+        self.name_index = None
+        self.index_listing = None
 
         # Variable para búsqueda
         self.search_var = tk.StringVar()
         self.filtered_categories = []
+        # Qué muestra el listado y con qué versión de los datos; evita recargarlo sin cambios
+        self.shown_listing = None
 
         # Configurar interfaz gráfica
         self.create_widgets()
@@ -52,6 +86,12 @@ class PythonConceptManagerApp:
 
         # Aplicar el tema después de configurar el menú
         apply_theme(self.root, self.current_theme)
+
+        # El editor se construye oculto en cuanto la ventana principal está
+        # dibujada, para que abrir un concepto sea instantáneo
+        self.root.after_idle(lambda: prepare_editor(self.root))
+        # Y lo mismo con los procesos que ejecutan el código de los conceptos
+        self.root.after_idle(runner_pool)
     
     def create_menu(self):
         create_menu(self, self.open_update_manager)
@@ -69,20 +109,45 @@ class PythonConceptManagerApp:
         # Caja de búsqueda
         tk.Label(self.root, text="Buscar Categorías:").grid(row=0, column=0, sticky="w", padx=10, pady=(10, 0))
         search_entry = tk.Entry(self.root, textvariable=self.search_var)
-        search_entry.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10))
-        search_entry.bind("<<KeyRelease>>", self.filter_categories)
+        search_entry.grid(row=1, column=0, columnspan=2, sticky="ew", padx=10, pady=(0, 10))
+        # Cualquier cambio del texto (teclas, pegar, borrar) filtra el listado
+        self.search_var.trace_add("write", self.schedule_filter)
 
-        # Listbox para las categorías
-        self.category_listbox = tk.Listbox(self.root, height=15, width=40)
-        self.category_listbox.grid(row=0, column=0, rowspan=4, padx=10, pady=10, sticky="nsew")  # Expande en todas direcciones
+        # Listado virtual de categorías: solo materializa las filas visibles
+        self.category_listbox = VirtualListbox(self.root, height=15, width=40)
+        self.category_listbox.grid(row=2, column=0, rowspan=2, padx=(10, 0), pady=(0, 10), sticky="nsew")  # Expande en todas direcciones
+        list_scrollbar = tk.Scrollbar(self.root, orient=tk.VERTICAL)
+        list_scrollbar.grid(row=2, column=1, rowspan=2, pady=(0, 10), sticky="ns")
+        self.category_listbox.attach_scrollbar(list_scrollbar)
 
         # Configurar la expansión de las filas y columnas
-        self.root.grid_rowconfigure(0, weight=1, minsize=200)  # La primera fila donde está el Listbox
+        self.root.grid_rowconfigure(2, weight=1, minsize=200)  # La fila donde está el Listbox
         self.root.grid_columnconfigure(0, weight=1, minsize=200)  # La columna donde está el Listbox
 
+        # Vista previa del código de la categoría seleccionada (solo lectura)
+        self.code_preview = CodePreview(
+            self.root, lambda ids: self.db_worker.submit(self.db_actions.get_codes, ids)
+        )
+        self.code_preview.grid(row=2, column=2, rowspan=2, padx=(10, 0), pady=(0, 10), sticky="nsew")
+        preview_scrollbar = tk.Scrollbar(self.root, orient=tk.VERTICAL, command=self.code_preview.yview)
+        preview_scrollbar.grid(row=2, column=3, rowspan=2, padx=(0, 10), pady=(0, 10), sticky="ns")
+        self.code_preview.configure(yscrollcommand=preview_scrollbar.set)
+        self.root.grid_columnconfigure(2, weight=1)
+        self.category_listbox.bind("<<ListboxSelect>>", self.preview_selected, add="+")
+
+        # Salida de las ejecuciones de código (se pueden lanzar varias a la vez)
+        self.output_pane = OutputPane(self.root, theme_name=self.current_theme)
+        self.output_pane.grid(row=4, column=0, columnspan=3, padx=(10, 0), pady=(0, 10), sticky="nsew")
+        output_scrollbar = tk.Scrollbar(self.root, orient=tk.VERTICAL, command=self.output_pane.yview)
+        output_scrollbar.grid(row=4, column=3, padx=(0, 10), pady=(0, 10), sticky="ns")
+        self.output_pane.configure(yscrollcommand=output_scrollbar.set)
+        # Lo que se escribe aquí lo lee el código en ejecución con input()
+        self.input_line = InputLine(self.root, self.output_pane, self.current_theme)
+        self.input_line.grid(row=5, column=0, columnspan=3, padx=(10, 0), pady=(0, 10), sticky="ew")
+
         # Crear un marco para los botones en dos columnas
         self.button_frame = tk.Frame(self.root)  # Inicialización correcta de button_frame
-        self.button_frame.grid(row=0, column=2, rowspan=2, padx=10, pady=10)
+        self.button_frame.grid(row=0, column=2, columnspan=2, rowspan=2, padx=10, pady=10)
 
         # Llamar a la función para crear los botones y pasar el tema actual
         create_buttons(self, self.button_frame, self.current_theme)
@@ -91,138 +156,300 @@ class PythonConceptManagerApp:
         apply_theme(self.root, self.current_theme)
 
         
+    def db_call(self, func, *args, on_done=None, **kwargs):
+        """
+        Ejecuta una operación de base de datos en segundo plano.
+
+        :param func: Función a ejecutar en el hilo de base de datos.
+        :param on_done: Función que recibe el resultado en el hilo de Tk.
+        :return: La tarea creada.
+        """
+        return self.db_worker.submit(func, *args, **kwargs).then(on_done, self.show_db_error)
+
+    def show_db_error(self, error):
+        """Muestra un error de base de datos (las cancelaciones se ignoran)."""
+        if isinstance(error, TaskCancelled):
+            return
+        messagebox.showerror("Error", str(error))
+
     def search_category_dialog(self):
         """Muestra un cuadro de diálogo para buscar categorías por nombre."""
         search_term = simpledialog.askstring("Buscar Concepto", "Introduce el término de búsqueda:")
         if search_term:
             self.search_category(search_term)
     
+    def schedule_filter(self, *args):
+        """Programa el filtrado tras una pausa al escribir (una sola vez por ráfaga de teclas)."""
+        if self.filter_after_id is not None:
+            self.root.after_cancel(self.filter_after_id)
+        self.filter_after_id = self.root.after(FILTER_DELAY_MS, self.filter_categories)
+
     def filter_categories(self, event=None):
-        """Filtra las categorías según el texto ingresado en la búsqueda."""
-        search_text = self.search_var.get().lower()
-        categories = self.db_actions.fetch_categories_from_db()
-        self.category_listbox.delete(0, tk.END)
-        for name, _ in categories:
-            if search_text in name.lower():
-                self.category_listbox.insert(tk.END, name)
+        """
+        Filtra las categorías según el texto ingresado en la búsqueda.
+
+        Con el índice de nombres en memoria, los nombres que empiezan por el
+        texto se muestran al instante (búsqueda binaria) y las coincidencias
+        en mitad del nombre llegan después desde el hilo de búsqueda. Sin
+        índice (mientras se construye), se consulta la base de datos.
+        """
+        self.filter_after_id = None
+        search_text = self.search_var.get().strip()
+        if not search_text:
+            self.update_category_list()
+            return
 
+        index = self.name_index
+        if index is not None:
+            start, end = index.prefix_range(fold(search_text))
+            self.show_index_result(index, search_text, range(start, end), partial=True)
+            if self.filter_task is not None:
+                self.filter_task.cancel()
+
+            def search():
+                positions = index.search(search_text)
+                if positions or len(search_text) < FUZZY_MIN_LENGTH:
+                    return positions, None
+                return positions, self.db_actions.fuzzy_search(search_text)
+
+            self.filter_task = self.search_worker.submit(search).then(
+                lambda result: self.show_index_result(index, search_text, *result)
+            )
+            return
+
+        def load():
+            listing = ("filter", search_text, self.db_actions.change_stamp())
+            return listing, self.search_with_fallback(search_text)
+
+        self.load_listing(load)
+
+    def search_with_fallback(self, search_term):
+        """
+        Busca categorías por texto y, si no hay ninguna, por parecido.
+
+        Se ejecuta en un hilo de base de datos. Las filas de la búsqueda
+        aproximada llevan la puntuación en lugar del fragmento.
+
+        :return: Lista de tuplas (id, nombre, fragmento o puntuación).
+        """
+        results = self.db_actions.search_with_ids(search_term)
+        if results or len(search_term.strip()) < FUZZY_MIN_LENGTH:
+            return results
+        return self.db_actions.fuzzy_search(search_term)
 
-    def update_category_list(self):
-        """Actualiza la lista de categorías en la interfaz."""
-        self.category_listbox.delete(0, tk.END)
-        categories = self.db_actions.fetch_categories_from_db()
-        for name, _ in categories:
-            self.category_listbox.insert(tk.END, name)
-            
 
     def search_category(self, search_term):
-        categories = self.db_actions.search_category(search_term)
-        self.category_listbox.delete(0, tk.END)
-        for category in categories:
-            self.category_listbox.insert(tk.END, category[0])
-        if not categories:
-            messagebox.showinfo("Sin resultados", "No se encontraron categorías que coincidan con la búsqueda.")
+        def show_results(categories):
+            self.show_listing((("search", search_term), categories))
+            if not categories:
+                messagebox.showinfo("Sin resultados", "No se encontraron categorías que coincidan con la búsqueda.")
+
+        self.db_call(self.search_with_fallback, search_term, on_done=show_results)
 
     def update_category_list(self):
-        self.category_listbox.delete(0, tk.END)
-        categories = self.db_actions.update_category_list()
-        for category in categories:
-            self.category_listbox.insert(tk.END, category[0])
+        """Actualiza la lista de categorías en la interfaz (solo ids y nombres)."""
+        def load():
+            listing = ("all", self.db_actions.change_stamp())
+            return listing, self.db_actions.list_ids()
+
+        self.load_listing(load)
+
+    def load_listing(self, load):
+        """
+        Carga un listado en segundo plano y lo muestra al terminar.
+
+        Solo cuenta la última petición: la anterior se cancela si aún no ha
+        terminado, y el Listbox no se redibuja si el listado no ha cambiado.
+        """
+        if self.list_task is not None:
+            self.list_task.cancel()
+        self.list_task = self.db_call(load, on_done=self.show_listing)
+
+    def show_listing(self, result):
+        """
+        Muestra en el listado virtual un listado cargado por `load_listing`.
+
+        Las filas se identifican por la id de la categoría, así que la
+        selección se conserva al recargar o al pasar de una búsqueda al
+        listado completo.
+        """
+        listing, rows = result
+        if listing[0] == "all":
+            if listing != self.index_listing:
+                # Los datos han cambiado: el código en caché puede estar obsoleto
+                self.code_preview.invalidate()
+                self.rebuild_name_index(listing)
+            if self.search_var.get().strip():
+                return  # El filtro activo se vuelve a aplicar con el índice nuevo
+        if listing == self.shown_listing:
+            return  # Nada ha cambiado desde el último redibujado
+        if listing[0] == "all":
+            # Solo las ids; los nombres se piden por páginas al desplazarse
+            self.category_listbox.set_items(rows, self.load_names, ordered=True)
+        else:
+            # Resultados de búsqueda (id, nombre, fragmento), por relevancia
+            names = {category_id: name for category_id, name, _ in rows}
+            self.category_listbox.set_items(
+                [category_id for category_id, _, _ in rows],
+                lambda ids, callback: callback([names[category_id] for category_id in ids]),
+            )
+        self.shown_listing = listing
+        self.preview_selected()
+
+    def rebuild_name_index(self, listing):
+        """Reconstruye en segundo plano el índice de nombres del filtro en vivo."""
+        self.index_listing = listing
+
+        def ready(index):
+            if listing != self.index_listing:
+                return  # Ya se ha pedido otro índice más reciente
+            self.name_index = index
+            if self.search_var.get().strip():
+                self.filter_categories()
+
+        self.search_worker.submit(
+            lambda: NameIndex(self.db_actions.list_categories())
+        ).then(ready, self.show_db_error)
+        # El índice de la búsqueda aproximada solo lee los cambios desde la última vez
+        self.search_worker.submit(self.db_actions.fuzzy_index.refresh).then(None, self.show_db_error)
+
+    def show_index_result(self, index, search_text, positions, fuzzy=None, partial=False):
+        """
+        Muestra un resultado del índice de nombres si sigue siendo actual.
+
+        :param index: Índice con el que se calculó.
+        :param search_text: Texto buscado.
+        :param positions: Posiciones del resultado en el índice.
+        :param fuzzy: Resultado de la búsqueda aproximada (id, nombre,
+            puntuación), si se hizo porque no había coincidencias.
+        :param partial: True si solo contiene las coincidencias por prefijo.
+        """
+        if index is not self.name_index or search_text != self.search_var.get().strip():
+            return  # Se ha escrito otra cosa o el índice ha cambiado
+        if fuzzy:
+            listing = ("fuzzy", search_text, id(index))
+            ids = [category_id for category_id, _, _ in fuzzy]
+            names = [name for _, name, _ in fuzzy]
+        else:
+            listing = ("prefix" if partial else "filter", search_text, id(index))
+            ids, names = index.view(positions)
+        if listing == self.shown_listing:
+            return
+        self.category_listbox.set_items(ids, labels=names)
+        self.shown_listing = listing
+        self.preview_selected()
+
+    def load_names(self, ids, callback):
+        """Carga en segundo plano los nombres de una página del listado virtual."""
+        def fetch():
+            names = dict(self.db_actions.fetch_names(ids[0], ids[-1]))
+            return [names.get(category_id) for category_id in ids]
+
+        self.db_call(fetch, on_done=callback)
+
+    def preview_selected(self, event=None):
+        """Muestra el código de la fila seleccionada y precarga el de sus vecinas."""
+        listbox = self.category_listbox
+        index = listbox.selected_index()
+        if index is None:
+            self.code_preview.show(None)
+            return
+        nearby = range(max(0, index - PREFETCH_RADIUS), min(listbox.size(), index + PREFETCH_RADIUS + 1))
+        neighbours = [listbox.key_at(i) for i in sorted(nearby, key=lambda i: abs(i - index)) if i != index]
+        self.code_preview.show(listbox.key_at(index), neighbours)
+
+    def with_selected_category(self, action, warning):
+        """
+        Lee por su id la categoría seleccionada y se la pasa a `action`.
+
+        El nombre no se toma de la etiqueta del listado, que puede no haber
+        llegado aún si su página se está cargando.
+
+        :param action: Función `action(nombre, código)`, llamada en el hilo de Tk.
+        :param warning: Aviso si no hay selección o la categoría ya no existe.
+        """
+        category_id = self.category_listbox.selected_key()
+        if category_id is None:
+            messagebox.showwarning("Advertencia", warning)
+            return
+
+        def loaded(row):
+            if row is None:
+                messagebox.showwarning("Advertencia", warning)
+                return
+            _, name, code = row
+            action(name, code)
+
+        self.db_call(self.db_actions.get_by_id, category_id, on_done=loaded)
 
     def add_category(self):
         """Añade una nueva categoría con código opcional."""
         category_name = simpledialog.askstring("Añadir Concepto", "Introduce el nombre del concepto:")
         if category_name:
-            title, code_snippet = open_code_editor(self.root, category_name, run_callback=lambda code: self.run_category_code(code))
+            title, code_snippet = open_code_editor(self.root, category_name)
             
             if title and code_snippet:  # Comprobamos que los valores no estén vacíos
-                try:
-                    self.db_actions.add_category(title, code_snippet)
+                def added(_):
                     messagebox.showinfo("Éxito", f"Concepto '{title}' añadido.")
                     self.update_category_list()
-                except ValueError as e:
-                    messagebox.showerror("Error", str(e))
+
+                self.db_call(self.db_actions.add_category, title, code_snippet, on_done=added)
 
 
     def edit_category(self):
         """Edita el título o el código de un concepto seleccionado."""
-        selected = self.category_listbox.curselection()
-        if not selected:
-            messagebox.showwarning("Advertencia", "Selecciona un concepto para editar.")
-            return
-
-        old_name = self.category_listbox.get(selected[0])
-        categories = self.db_actions.fetch_categories_from_db()
-        current_code = next((code for name, code in categories if name == old_name), "")
+        self.with_selected_category(
+            lambda old_name, code: self.open_editor_for(old_name, code or ""),
+            "Selecciona un concepto para editar.",
+        )
 
-        title, new_code = open_code_editor(self.root, old_name, current_code, run_callback=lambda code: self.run_category_code(code))
+    def open_editor_for(self, old_name, current_code):
+        """Abre el editor con el código ya leído y guarda los cambios en segundo plano."""
+        title, new_code = open_code_editor(self.root, old_name, current_code)
 
         if title:
-            try:
-                self.db_actions.edit_category(old_name, title, new_code)
+            def edited(_):
                 messagebox.showinfo("Éxito", f"Concepto '{old_name}' actualizado.")
                 self.update_category_list()
-            except ValueError as e:
-                messagebox.showerror("Error", str(e))
+
+            self.db_call(self.db_actions.edit_category, old_name, title, new_code, on_done=edited)
 
 
     def delete_category(self):
         """Elimina la categoría seleccionada."""
-        selected = self.category_listbox.curselection()
-        if not selected:
-            messagebox.showwarning("Advertencia", "Selecciona un concepto para eliminar.")
-            return
-
-        category_name = self.category_listbox.get(selected[0])
-        confirm = messagebox.askyesno("Confirmar", f"¿Estás seguro de eliminar el concepto '{category_name}'?")
-        if confirm:
-            self.db_actions.delete_category(category_name)
-            messagebox.showinfo("Éxito", f"Concepto '{category_name}' eliminado.")
-            self.update_category_list()
-
-
-    def run_category_code(self, code_snippet=None):
-        """Ejecuta el código asociado al concepto seleccionado o directamente el código proporcionado."""
-
-        if code_snippet is None:
-            # Caso: ejecutar código desde la ventana principal
-            selected = self.category_listbox.curselection()
-            if not selected:
-                messagebox.showwarning("Advertencia", "Selecciona un concepto para ejecutar el código asociado.")
-                return
+        def confirm_delete(category_name, _):
+            confirm = messagebox.askyesno("Confirmar", f"¿Estás seguro de eliminar el concepto '{category_name}'?")
+            if confirm:
+                def deleted(_):
+                    messagebox.showinfo("Éxito", f"Concepto '{category_name}' eliminado.")
+                    self.update_category_list()
 
-            category_name = self.category_listbox.get(selected[0])
+                self.db_call(self.db_actions.delete_category, category_name, on_done=deleted)
 
-            # Obtener las categorías de la base de datos mediante la función fetch_categories_from_db
-            categories = self.db_actions.fetch_categories_from_db()
+        self.with_selected_category(confirm_delete, "Selecciona un concepto para eliminar.")
 
-            # Buscar el código correspondiente al nombre de la categoría seleccionada
-            code_snippet = next((code for name, code in categories if name == category_name), None)
 
-            if not code_snippet:
+    def run_category_code(self):
+        """Ejecuta el código del concepto seleccionado y muestra su salida bajo el listado."""
+        def run_loaded(category_name, code):
+            if not code:
                 messagebox.showinfo("Info", f"El concepto '{category_name}' no tiene código asociado que se pueda ejecutar.")
                 return
+            try:
+                self.output_pane.run(code, category_name)
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al ejecutar el código: {e}")
 
-        try:
-            temp_filename = "temp_code.py"
-            # Asegurarse de que el código sea una cadena de texto antes de escribirlo
-            with open(temp_filename, "w", encoding="utf-8") as temp_file:
-                temp_file.write(str(code_snippet))  # Convertimos el código a str si es necesario
-
-            if os.name == "nt":  # Para Windows
-                subprocess.Popen(["start", "cmd", "/c", f"python {temp_filename} & pause"], shell=True)
-            else:  # Para Linux/MacOS
-                subprocess.Popen(["gnome-terminal", "--", "bash", "-c", f"python3 {temp_filename}; read -p 'Press any key to continue...'"], shell=False)
+        # Leer solo la categoría seleccionada
+        self.with_selected_category(run_loaded, "Selecciona un concepto para ejecutar el código asociado.")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al ejecutar el código: {e}")
+    def stop_running_code(self):
+        """Detiene las ejecuciones en curso lanzadas desde la ventana principal."""
+        self.output_pane.stop_all()
 
 
     def fusionar_base_datos(self):
         """Llama al método para fusionar bases de datos y actualiza el listado de conceptos."""
-        # Ruta de la base de datos actual (conceptos.db) en el mismo directorio que main.py
-        db_path = os.path.join(os.path.dirname(__file__), "conceptos.db")
-        
         # Abrir el selector de archivos para que el usuario seleccione la base de datos a importar
         imported_db_path = filedialog.askopenfilename(
             title="Seleccionar base de datos a importar",
@@ -234,26 +461,246 @@ class PythonConceptManagerApp:
             messagebox.showwarning("No seleccionada", "No se seleccionó ninguna base de datos para importar.")
             return
 
-        # Llamar a la función fusionar_base_datos con las rutas adecuadas
-        result = self.db_actions.fusionar_base_datos(db_path, imported_db_path)
-        
-        # Mostrar el resultado en un mensaje
-        messagebox.showinfo("Resultado de la fusión", result)
-        
-        # Después de la fusión, actualizamos el Listbox con los nuevos conceptos
-        self.actualizar_listado_conceptos()
+        # Preguntar qué hacer con los conceptos que existen en ambas bases de datos
+        policy = self.ask_merge_policy()
+        if policy is None:
+            return
+
+        # La fusión se hace en el hilo de base de datos, con opción de cancelarla
+        task = self.db_worker.submit(self.db_actions.merge_database, imported_db_path, policy)
+        progress = ProgressDialog(self.root, "Importar BD", "Fusionando bases de datos...",
+                                  on_cancel=task.cancel, theme_name=self.current_theme)
+
+        def merged(counts):
+            progress.close()
+            # Mostrar el resultado en un mensaje
+            messagebox.showinfo("Resultado de la fusión", describe_merge(counts))
+            # Después de la fusión, actualizamos el Listbox con los nuevos conceptos
+            self.actualizar_listado_conceptos()
+
+        def failed(error):
+            progress.close()
+            if isinstance(error, TaskCancelled):
+                messagebox.showinfo("Fusión cancelada", "No se ha modificado la base de datos.")
+            else:
+                messagebox.showerror("Resultado de la fusión", f"Ocurrió un error al fusionar la base de datos: {error}")
+
+        task.then(merged, failed)
+
+    def exportar_cambios(self):
+        """Exporta a un archivo los cambios posteriores a una secuencia para sincronizar otro equipo."""
+        since = simpledialog.askinteger(
+            "Exportar cambios",
+            "Exportar los cambios posteriores a la secuencia\n(0 para exportar todo):",
+            initialvalue=0, minvalue=0,
+        )
+        if since is None:
+            return
+        path = filedialog.asksaveasfilename(
+            title="Guardar cambios como...",
+            defaultextension=".jsonl",
+            filetypes=[("Cambios DiccioPynthon", "*.jsonl *.jsonl.gz")],
+        )
+        if not path:
+            return
+
+        def exported(result):
+            count, until = result
+            messagebox.showinfo(
+                "Cambios exportados",
+                f"Se exportaron {count} cambios.\nLa próxima exportación puede empezar en la secuencia {until}.",
+            )
+
+        def failed(error):
+            messagebox.showerror("Error", f"No se pudieron exportar los cambios: {error}")
+
+        self.db_worker.submit(export_changes, self.db_actions, path, since=since).then(exported, failed)
+
+    def importar_cambios(self):
+        """Aplica un archivo de cambios exportado desde otro equipo."""
+        path = filedialog.askopenfilename(
+            title="Seleccionar archivo de cambios",
+            filetypes=[("Cambios DiccioPynthon", "*.jsonl *.jsonl.gz")],
+        )
+        if not path:
+            return
+
+        def imported(result):
+            messagebox.showinfo(
+                "Cambios importados",
+                f"{result['inserted']} añadidos, {result['updated']} actualizados, "
+                f"{result['deleted']} eliminados, {result['skipped']} omitidos.",
+            )
+            self.update_category_list()
+
+        def failed(error):
+            messagebox.showerror("Error", f"No se pudieron importar los cambios: {error}")
+
+        self.db_worker.submit(import_changes, self.db_actions, path).then(imported, failed)
+
+    def exportar_jsonl(self):
+        """Exporta todos los conceptos a un archivo JSON Lines en segundo plano."""
+        path = filedialog.asksaveasfilename(
+            title="Exportar conceptos",
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("JSON Lines comprimido", "*.jsonl.gz")],
+        )
+        if not path:
+            return
+        task = self.background_worker.submit(
+            lambda task: export_jsonl(self.db_actions, path, progress=task.checkpoint), pass_task=True
+        )
+        self.run_with_progress(task, "Exportar conceptos", "Exportando conceptos...",
+                               lambda count: f"Se exportaron {count} conceptos a:\n{path}")
+
+    def importar_jsonl(self):
+        """Importa conceptos desde un archivo JSON Lines en segundo plano."""
+        path = filedialog.askopenfilename(
+            title="Importar conceptos",
+            filetypes=[("JSON Lines", "*.jsonl *.jsonl.gz")],
+        )
+        if not path:
+            return
+        replace = messagebox.askyesnocancel(
+            "Importar conceptos",
+            "¿Reemplazar el código de los conceptos que ya existen?\n(No = conservar los actuales)",
+        )
+        if replace is None:
+            return
+        task = self.db_worker.submit(
+            lambda task: import_jsonl(self.db_actions, path, replace=replace, progress=task.checkpoint),
+            pass_task=True,
+        )
+
+        def message(result):
+            self.update_category_list()
+            return f"{result['imported']} conceptos importados, {result['skipped']} omitidos."
+
+        self.run_with_progress(task, "Importar conceptos", "Importando conceptos...", message)
+
+    def revisar_codigo(self):
+        """Revisa en segundo plano el código de todos los conceptos (sintaxis y nombres no definidos)."""
+        task = self.background_worker.submit(
+            lambda task: lint_database(self.db_actions, progress=task.checkpoint), pass_task=True
+        )
+
+        def describe(problems):
+            if not problems:
+                return "No se encontraron problemas en el código de los conceptos."
+            return f"{len(problems)} conceptos con problemas:\n\n{describe_problems(problems)}"
+
+        self.run_with_progress(task, "Revisar código", "Revisando el código de los conceptos...", describe)
+
+    def run_with_progress(self, task, title, message, describe):
+        """
+        Muestra una ventana de progreso cancelable mientras se ejecuta una tarea.
+
+        :param task: DatabaseTask en curso.
+        :param title: Título de las ventanas.
+        :param message: Texto de la ventana de progreso.
+        :param describe: Función que recibe el resultado y devuelve el mensaje final.
+        """
+        progress = ProgressDialog(self.root, title, message, on_cancel=task.cancel, theme_name=self.current_theme)
+
+        def done(result):
+            progress.close()
+            messagebox.showinfo(title, describe(result))
+
+        def failed(error):
+            progress.close()
+            if isinstance(error, TaskCancelled):
+                messagebox.showinfo(title, "Operación cancelada.")
+            else:
+                messagebox.showerror("Error", str(error))
+
+        task.then(done, failed, progress.update)
+
+    def crear_copia_seguridad(self):
+        """Crea en segundo plano una copia de seguridad de la base de datos."""
+        task = self.background_worker.submit(
+            lambda task: backup_database(self.db_actions, task=task), pass_task=True
+        )
+        progress = ProgressDialog(self.root, "Copia de seguridad", "Copiando páginas...",
+                                  on_cancel=task.cancel, theme_name=self.current_theme)
+
+        def done(path):
+            progress.close()
+            messagebox.showinfo("Copia de seguridad", f"Copia creada en:\n{path}")
+
+        def failed(error):
+            progress.close()
+            if isinstance(error, TaskCancelled):
+                messagebox.showinfo("Copia de seguridad", "Copia cancelada.")
+            else:
+                messagebox.showerror("Error", f"No se pudo crear la copia de seguridad: {error}")
+
+        task.then(done, failed, progress.update)
+
+    def restaurar_copia_seguridad(self):
+        """Sustituye la base de datos por una copia de seguridad elegida por el usuario."""
+        path = filedialog.askopenfilename(
+            title="Seleccionar copia de seguridad",
+            initialdir=default_backup_dir(self.db_actions.db.db_name),
+            filetypes=[("Archivos de base de datos", "*.db")],
+        )
+        if not path:
+            return
+        if not messagebox.askyesno(
+            "Restaurar copia",
+            "Se sustituirán todos los conceptos actuales por los de la copia. ¿Continuar?",
+        ):
+            return
+
+        def restored(_):
+            messagebox.showinfo("Restaurar copia", "Copia de seguridad restaurada.")
+            self.update_category_list()
+
+        def failed(error):
+            messagebox.showerror("Error", f"No se pudo restaurar la copia: {error}")
+
+        self.db_worker.submit(restore_database, self.db_actions, path).then(restored, failed)
+
+    def ask_merge_policy(self):
+        """
+        Muestra un diálogo para elegir la política de conflictos de la fusión.
+
+        :return: La política elegida o None si el usuario cancela.
+        """
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Conceptos repetidos")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        tk.Label(dialog, text="Si un concepto existe en ambas bases de datos:").pack(anchor="w", padx=10, pady=(10, 5))
+        policy_var = tk.StringVar(value=MERGE_KEEP_LOCAL)
+        options = [
+            ("Conservar el concepto local", MERGE_KEEP_LOCAL),
+            ("Usar el concepto importado", MERGE_TAKE_IMPORTED),
+            ("Conservar el más reciente", MERGE_KEEP_NEWEST),
+            ("Añadir el importado con otro nombre", MERGE_RENAME),
+        ]
+        for text, value in options:
+            tk.Radiobutton(dialog, text=text, variable=policy_var, value=value).pack(anchor="w", padx=20)
+
+        result = {"policy": None}
+
+        def accept():
+            result["policy"] = policy_var.get()
+            dialog.destroy()
+
+        button_frame = tk.Frame(dialog)
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="Fusionar", command=accept).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Cancelar", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+
+        apply_theme(dialog, self.current_theme)
+        dialog.wait_window()
+        return result["policy"]
 
     def actualizar_listado_conceptos(self):
         """Recarga los conceptos desde la base de datos y actualiza el Listbox."""
-        # Limpiar el Listbox
-        self.category_listbox.delete(0, tk.END)
-        
-        # Recuperar todos los conceptos de la base de datos
-        categories = self.db_actions.fetch_categories_from_db()
-        
-        # Agregar los conceptos al Listbox
-        for category in categories:
-            self.category_listbox.insert(tk.END, category[0])  # `category[0]` es el nombre de la categoría
+        # Solo redibuja si la fusión cambió algo (la marca de versión lo detecta)
+        self.update_category_list()
 
 
 
@@ -270,3 +717,7 @@ if __name__ == "__main__":
     root = tk.Tk()  # Crea la ventana principal de la aplicación.
     app = PythonConceptManagerApp(root)  # Crea una instancia de la aplicación.
     root.mainloop()  # Inicia el bucle principal de la interfaz gráfica.
+    app.db_worker.shutdown()  # Termina las escrituras pendientes antes de salir.
+    app.background_worker.shutdown()
+    shutdown_runner_pool()  # Cierra los procesos en espera y detiene el código en marcha
+    app.search_worker.shutdown()
@@ -0,0 +1,74 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from app import cli
+
+
+class CommandLineTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, "conceptos.db")
+
+    def run_cli(self, *args, db=None):
+        """Ejecuta la CLI y devuelve (código de salida, salida, errores)."""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status = cli.main(["--db", db or self.path, *args])
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_add_get_and_search(self):
+        code_file = os.path.join(self.directory, "listas.py")
+        with open(code_file, "w", encoding="utf-8") as file:
+            file.write("numeros = [1, 2, 3]\n")
+        self.assertEqual(self.run_cli("add", "Listas", "--file", code_file)[0], 0)
+        self.assertEqual(self.run_cli("add", "Tuplas", "--code", "punto = (1, 2)")[0], 0)
+        self.assertEqual(self.run_cli("get", "Tuplas"), (0, "punto = (1, 2)\n", ""))
+        self.assertEqual(self.run_cli("search", "numeros", "--names-only"), (0, "Listas\n", ""))
+        self.assertEqual(self.run_cli("search", "--fuzzy", "Tulpas", "--names-only", "--limit", "1")[1], "Tuplas\n")
+
+    def test_errors_set_the_exit_status(self):
+        self.run_cli("add", "Listas", "--code", "")
+        status, _, errors = self.run_cli("add", "Listas", "--code", "")
+        self.assertEqual(status, 1)
+        self.assertTrue(errors.startswith("Error:"))
+        self.assertEqual(self.run_cli("get", "Nada")[0], 1)
+        self.assertEqual(self.run_cli("search", "nada")[0], 1)
+        self.assertEqual(self.run_cli("merge", os.path.join(self.directory, "no.db"))[0], 1)
+
+    def test_export_import_and_merge(self):
+        self.run_cli("add", "Listas", "--code", "x = []")
+        exported = os.path.join(self.directory, "conceptos.jsonl.gz")
+        self.assertEqual(self.run_cli("export", exported), (0, "", "1 categorías exportadas.\n"))
+
+        other = os.path.join(self.directory, "otra.db")
+        self.assertEqual(self.run_cli("import", exported, db=other)[0], 0)
+        self.run_cli("add", "Tuplas", "--code", "t = ()", db=other)
+        status, output, _ = self.run_cli("merge", other, "--policy", "rename")
+        self.assertEqual(status, 0)
+        self.assertIn("categories: 1 añadidos", output)
+        self.assertEqual(self.run_cli("get", "Tuplas")[1], "t = ()\n")
+
+    def test_stats_and_lint(self):
+        self.run_cli("add", "Roto", "--code", "print(nada)\n")
+        stats = json.loads(self.run_cli("stats", "--json")[1])
+        self.assertEqual(stats["categorias"], 1)
+        self.assertEqual(self.run_cli("lint"), (1, "Roto:1:7: warning: 'nada' no está definido\n", ""))
+        self.assertEqual(self.run_cli("lint", "--errors-only"), (0, "", ""))
+
+    def test_does_not_import_the_gui(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = "import sys, app.cli; print('tkinter' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout, "False\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
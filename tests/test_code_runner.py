@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from app.code_runner import RunnerPool, _partial_marker, describe_run
+
+TIMEOUT = 30
+
+
+def output(code_run):
+    """Espera a que termine la ejecución y devuelve (salida, errores)."""
+    if not code_run.wait(TIMEOUT):
+        code_run.stop()
+        raise AssertionError("La ejecución no ha terminado")
+    events = code_run.poll_events()
+    assert events[-1] == ("done", code_run)
+    text = {"stdout": "", "stderr": ""}
+    for name, value in events[:-1]:
+        text[name] += value
+    return text["stdout"], text["stderr"]
+
+
+class RunnerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        # Los procesos deben encontrar `app` aunque el directorio de trabajo sea otro
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+        self.pool = RunnerPool(1)
+        self.addCleanup(self.pool.shutdown)
+        self.pool.fill()
+
+    def test_captures_output_and_times(self):
+        code_run = self.pool.run("import sys\nprint('año')\nprint('aviso', file=sys.stderr)\n")
+        self.assertEqual(output(code_run), ("año\n", "aviso\n"))
+        self.assertEqual(code_run.returncode, 0)
+        self.assertIsNotNone(code_run.cpu_time)
+        self.assertTrue(describe_run(code_run).startswith("Terminado en"))
+
+    def test_errors_and_exit_status(self):
+        code_run = self.pool.run("print('antes')\n1 / 0\n")
+        stdout, stderr = output(code_run)
+        self.assertEqual(stdout, "antes\n")
+        self.assertIn("ZeroDivisionError", stderr)
+        self.assertNotEqual(code_run.returncode, 0)
+
+    def test_input_reads_what_is_sent(self):
+        code_run = self.pool.run("print(input('¿Nombre? ').upper())\ntry:\n    input()\nexcept EOFError:\n    print('fin')\n")
+        self.assertTrue(code_run.send_input("ana\n"))
+        code_run.close_input()
+        self.assertEqual(output(code_run)[0], "¿Nombre? ANA\nfin\n")
+        self.assertFalse(code_run.send_input("tarde\n"))
+
+    def test_stop(self):
+        code_run = self.pool.run("print('empieza', flush=True)\nwhile True:\n    pass\n")
+        code_run.stop()
+        output(code_run)
+        self.assertTrue(code_run.stopped)
+        self.assertTrue(describe_run(code_run).startswith("Detenido"))
+
+    def test_each_run_gets_a_fresh_process(self):
+        output(self.pool.run("import os\nos.environ['VISTO'] = '1'\n"))
+        self.assertEqual(output(self.pool.run("import os\nprint(os.environ.get('VISTO'))\n"))[0], "None\n")
+
+    def test_closed_pool_refuses_runs(self):
+        self.pool.shutdown()
+        with self.assertRaises(RuntimeError):
+            self.pool.run("pass")
+
+
+class PartialMarkerTest(unittest.TestCase):
+
+    def test_partial_marker(self):
+        self.assertEqual(_partial_marker(b"texto\x1eab", b"\x1eabc "), 3)
+        self.assertEqual(_partial_marker(b"texto\x1eax", b"\x1eabc "), 0)
+        self.assertEqual(_partial_marker(b"", b"\x1eabc "), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+from app.db_backup import backup_database, default_backup_dir, list_backups, restore_database
+from app.db_worker import TaskCancelled
+
+
+class FakeTask:
+    """Lo que usan las copias de una DatabaseTask: progreso y cancelación."""
+
+    def __init__(self, cancel_after=None):
+        self.progress = []
+        self.cancel_after = cancel_after
+
+    def raise_if_cancelled(self):
+        if self.cancel_after is not None and len(self.progress) >= self.cancel_after:
+            raise TaskCancelled()
+
+    def report_progress(self, done, total):
+        self.progress.append((done, total))
+
+
+class BackupTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "conceptos.db")
+        self.db = DatabaseActions(self.path)
+        self.addCleanup(self.db.close)
+        # Bastantes páginas para que la copia se haga en varios pasos
+        self.db.add_many((f"c{number}", "x = 1\n" * 200) for number in range(50))
+
+    def test_backup_and_restore(self):
+        task = FakeTask()
+        backup = backup_database(self.db, pages=4, task=task)
+        self.assertEqual(list_backups(self.path), [backup])
+        self.assertGreater(len(task.progress), 1)
+        self.assertEqual(task.progress[-1][0], task.progress[-1][1])
+
+        self.db.delete_many([f"c{number}" for number in range(10, 50)])
+        self.db.add_category("nuevo", "")
+        restore_database(self.db, backup)
+        names = [name for _, name in self.db.list_categories()]
+        self.assertEqual(names, [f"c{number}" for number in range(50)])
+        self.assertEqual([row[1] for row in self.db.search_fts("c42")], ["c42"])
+
+    def test_rotation_keeps_the_newest(self):
+        backups = [backup_database(self.db, keep=2) for _ in range(3)]
+        self.assertEqual(list_backups(self.path), backups[:0:-1])
+        self.assertFalse(os.path.exists(backups[0]))
+
+    def test_cancelled_backup_leaves_no_file(self):
+        with self.assertRaises(TaskCancelled):
+            backup_database(self.db, pages=4, task=FakeTask(cancel_after=2))
+        self.assertEqual(os.listdir(default_backup_dir(self.path)), [])
+
+    def test_restore_rejects_invalid_files(self):
+        path = os.path.join(os.path.dirname(self.path), "roto.db")
+        with open(path, "wb") as file:
+            file.write(b"esto no es una base de datos" * 100)
+        with self.assertRaises(ValueError):
+            restore_database(self.db, path)
+        with self.assertRaises(ValueError):
+            restore_database(self.db, path + ".no")
+        self.assertEqual(len(self.db.list_categories()), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+
+LONG_CODE = "print('hola mundo')\n" * 50  # Se guarda comprimido en el esquema dividido
+
+
+class BatchWriteTest(unittest.TestCase):
+    split_code = False
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = DatabaseActions(os.path.join(directory.name, "conceptos.db"), split_code=self.split_code)
+        self.addCleanup(self.db.close)
+
+    def contents(self):
+        return sorted(self.db.fetch_categories_from_db())
+
+    def test_add_many_accepts_a_generator(self):
+        count = self.db.add_many((f"c{number}", f"x = {number}") for number in range(3))
+        self.assertEqual(count, 3)
+        self.assertEqual(self.contents(), [("c0", "x = 0"), ("c1", "x = 1"), ("c2", "x = 2")])
+
+    def test_add_many_is_all_or_nothing(self):
+        self.db.add_category("a", "1")
+        with self.assertRaises(ValueError):
+            self.db.add_many([("b", "2"), ("a", "3")])
+        self.assertEqual(self.contents(), [("a", "1")])
+
+    def test_upsert_many_inserts_and_replaces(self):
+        self.db.add_many([("a", "1"), ("b", "2")])
+        self.assertEqual(self.db.upsert_many([("a", LONG_CODE), ("c", "3")]), 2)
+        self.assertEqual(self.contents(), [("a", LONG_CODE), ("b", "2"), ("c", "3")])
+
+    def test_delete_many(self):
+        self.db.add_many([("a", "1"), ("b", "2"), ("c", "3")])
+        self.assertEqual(self.db.delete_many(["a", "c", "no existe"]), 2)
+        self.assertEqual(self.contents(), [("b", "2")])
+
+    def test_transaction_groups_and_rolls_back(self):
+        with self.db.transaction():
+            self.db.add_many([("a", "1")])
+            self.db.upsert_many([("b", "2")])
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.add_many([("c", "3")])
+                raise RuntimeError
+        self.assertEqual(self.contents(), [("a", "1"), ("b", "2")])
+
+
+class SplitBatchWriteTest(BatchWriteTest):
+    split_code = True
+
+
+if __name__ == "__main__":
+    unittest.main()
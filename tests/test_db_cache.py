@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from app.db_actions import DatabaseActions
+
+
+class ReadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "conceptos.db")
+        self.db = DatabaseActions(self.path)
+        self.addCleanup(self.db.close)
+        self.db.add_many([("alfa", "a = 1"), ("beta", "b = 2")])
+
+    def test_unchanged_data_is_served_from_cache(self):
+        stamp = self.db.change_stamp()
+        self.assertIs(self.db.list_categories(), self.db.list_categories())
+        self.assertIs(self.db.list_ids(), self.db.list_ids())
+        self.assertIs(self.db.search_with_ids("alfa"), self.db.search_with_ids("alfa"))
+        self.assertEqual(self.db.change_stamp(), stamp)
+
+    def test_local_writes_invalidate(self):
+        listing = self.db.list_categories()
+        found = self.db.search_with_ids("gamma")
+        self.db.add_category("gamma", "")
+        self.assertNotEqual(self.db.list_categories(), listing)
+        self.assertEqual(list(self.db.list_ids()), [1, 2, 3])
+        self.assertNotEqual(self.db.search_with_ids("gamma"), found)
+
+    def test_writes_from_another_connection_invalidate(self):
+        stamp = self.db.change_stamp()
+        self.db.list_categories()
+        client = sqlite3.connect(self.path)
+        self.addCleanup(client.close)
+        with client:
+            client.execute("DELETE FROM categories WHERE name = 'alfa'")
+        self.assertNotEqual(self.db.change_stamp(), stamp)
+        self.assertEqual(self.db.list_categories(), ((2, "beta"),))
+
+    def test_each_thread_has_its_own_cache(self):
+        listing = self.db.list_categories()
+        other = []
+
+        def read():
+            other.append(self.db.list_categories())
+            self.db.db.close_thread_connection()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        self.assertEqual(other, [listing])
+        self.assertIsNot(other[0], listing)
+        self.assertIs(self.db.list_categories(), listing)
+
+
+if __name__ == "__main__":
+    unittest.main()
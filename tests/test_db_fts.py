@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+
+
+class FullTextSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = DatabaseActions(os.path.join(directory.name, "conceptos.db"))
+        self.addCleanup(self.db.close)
+        self.db.add_many([
+            ("Bucle for", "for elemento in lista:\n    print(elemento)\n"),
+            ("Diccionarios", "datos = {'clave': 'valor'}\n# recorrer con un bucle\n"),
+            ("Listas", "numeros = [1, 2, 3]\n"),
+        ])
+
+    def names(self, search_term):
+        return [name for _, name, _ in self.db.search_fts(search_term)]
+
+    def test_name_matches_rank_above_code_matches(self):
+        self.assertEqual(self.names("bucle"), ["Bucle for", "Diccionarios"])
+
+    def test_words_are_prefixes(self):
+        self.assertEqual(self.names("dicc"), ["Diccionarios"])
+        self.assertEqual(self.names("numer"), ["Listas"])
+
+    def test_snippet_marks_the_match(self):
+        (_, _, snippet), = self.db.search_fts("clave")
+        self.assertIn("[clave]", snippet)
+
+    def test_fts_syntax_is_escaped(self):
+        self.assertEqual(self.db.build_fts_query('bucle OR "for'), '"bucle"* "OR"* "for"*')
+        self.assertEqual(self.names("bucle AND"), [])
+        self.assertEqual(self.db.search_fts("¿?"), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.db.edit_category("Listas", "Tuplas", "puntos = (1, 2)\n")
+        self.db.delete_category("Bucle for")
+        self.assertEqual(self.names("numeros"), [])
+        self.assertEqual(self.names("puntos"), ["Tuplas"])
+        self.assertEqual(self.names("bucle"), ["Diccionarios"])
+
+    def test_search_with_ids_falls_back_to_like(self):
+        # Sin palabras no hay consulta FTS: se busca la subcadena en el nombre
+        self.db.add_category("C++ vs Python", "")
+        self.assertEqual([row[1] for row in self.db.search_with_ids("++")], ["C++ vs Python"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import io
+import os
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+from app.db_jsonl import export_jsonl, import_jsonl
+
+CATEGORIES = [
+    ("Listas", "numeros = [1, 2, 3]\n"),
+    ("Cadenas", "texto = 'año, ñandú y \"comillas\"'\n"),
+    ("Largo", "print('hola mundo')\n" * 50),
+    ("Vacío", ""),
+]
+
+
+class JsonLinesTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.source = self.open_db("origen.db")
+        self.source.add_many(CATEGORIES)
+
+    def open_db(self, name, split_code=False):
+        db = DatabaseActions(os.path.join(self.directory, name), split_code=split_code)
+        self.addCleanup(db.close)
+        return db
+
+    def test_round_trip_through_gzip(self):
+        path = os.path.join(self.directory, "conceptos.jsonl.gz")
+        progress = []
+        self.assertEqual(export_jsonl(self.source, path, batch_size=3, progress=lambda *args: progress.append(args)), 4)
+        self.assertEqual(progress, [(3, 4), (4, 4)])
+        target = self.open_db("destino.db", split_code=True)
+        self.assertEqual(import_jsonl(target, path, batch_size=3), {"imported": 4, "skipped": 0})
+        self.assertEqual(target.fetch_categories_from_db(), CATEGORIES)
+
+    def test_open_files_are_not_closed(self):
+        buffer = io.StringIO()
+        export_jsonl(self.source, buffer)
+        self.assertEqual(len(buffer.getvalue().splitlines()), 4)
+        buffer.seek(0)
+        import_jsonl(self.open_db("destino.db"), buffer)
+        self.assertFalse(buffer.closed)
+
+    def test_replace_or_keep_existing(self):
+        lines = '{"name": "Listas", "code": "nuevo"}\n\n{"name": "Otra"}\n{"name": "Otra", "code": "2"}\n'
+        self.assertEqual(import_jsonl(self.source, io.StringIO(lines), replace=False), {"imported": 1, "skipped": 2})
+        self.assertEqual(self.source.get_code("Listas"), CATEGORIES[0][1])
+        self.assertEqual(self.source.get_code("Otra"), "2")
+        self.assertEqual(import_jsonl(self.source, io.StringIO(lines)), {"imported": 2, "skipped": 1})
+        self.assertEqual(self.source.get_code("Listas"), "nuevo")
+
+    def test_invalid_line_stops_after_saved_batches(self):
+        lines = '{"name": "a"}\n{"name": "b"}\n{"code": "sin nombre"}\n'
+        target = self.open_db("destino.db")
+        with self.assertRaisesRegex(ValueError, "Línea 3"):
+            import_jsonl(target, io.StringIO(lines), batch_size=2)
+        self.assertEqual([name for _, name in target.list_categories()], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
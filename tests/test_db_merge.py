@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from app.db_actions import (
+    MERGE_KEEP_LOCAL, MERGE_KEEP_NEWEST, MERGE_RENAME, MERGE_TAKE_IMPORTED, RENAME_SUFFIX, DatabaseActions,
+    describe_merge,
+)
+
+LONG_CODE = "print('hola mundo')\n" * 50  # Se guarda comprimido en el esquema dividido
+
+
+class MergeDatabaseTest(unittest.TestCase):
+    split_code = False
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = DatabaseActions(os.path.join(directory.name, "conceptos.db"), split_code=self.split_code)
+        self.addCleanup(self.db.close)
+        # "viejo" es más reciente en la importada; "nuevo", en la local
+        self.db.add_many([("igual", "x = 1"), ("viejo", "local"), ("nuevo", "local")])
+        self.set_updated_at(self.db.db.connection, {"viejo": 100, "nuevo": 300})
+
+        self.imported_path = os.path.join(directory.name, "importada.db")
+        imported = DatabaseActions(self.imported_path, split_code=True)
+        imported.add_many([("igual", "x = 1"), ("viejo", LONG_CODE), ("nuevo", "importado"), ("otro", "y = 2")])
+        imported.close()
+        client = sqlite3.connect(self.imported_path)
+        self.set_updated_at(client, {"viejo": 200, "nuevo": 200})
+        client.close()
+
+    @staticmethod
+    def set_updated_at(connection, times):
+        with connection:
+            connection.executemany(
+                "UPDATE categories SET updated_at = ? WHERE name = ?", [(time, name) for name, time in times.items()]
+            )
+
+    def merge(self, policy):
+        counts = self.db.merge_database(self.imported_path, policy)["categories"]
+        return counts, dict(self.db.fetch_categories_from_db())
+
+    def test_keep_local(self):
+        counts, contents = self.merge(MERGE_KEEP_LOCAL)
+        self.assertEqual(counts, {"inserted": 1, "updated": 0, "renamed": 0, "skipped": 3})
+        self.assertEqual(contents, {"igual": "x = 1", "viejo": "local", "nuevo": "local", "otro": "y = 2"})
+
+    def test_take_imported(self):
+        counts, contents = self.merge(MERGE_TAKE_IMPORTED)
+        self.assertEqual(counts, {"inserted": 1, "updated": 2, "renamed": 0, "skipped": 1})
+        self.assertEqual(contents, {"igual": "x = 1", "viejo": LONG_CODE, "nuevo": "importado", "otro": "y = 2"})
+
+    def test_keep_newest(self):
+        counts, contents = self.merge(MERGE_KEEP_NEWEST)
+        self.assertEqual(counts, {"inserted": 1, "updated": 1, "renamed": 0, "skipped": 2})
+        self.assertEqual(contents, {"igual": "x = 1", "viejo": LONG_CODE, "nuevo": "local", "otro": "y = 2"})
+
+    def test_rename(self):
+        counts, contents = self.merge(MERGE_RENAME)
+        self.assertEqual(counts, {"inserted": 1, "updated": 0, "renamed": 2, "skipped": 1})
+        self.assertEqual(contents["viejo"], "local")
+        self.assertEqual(contents["viejo" + RENAME_SUFFIX], LONG_CODE)
+        self.assertEqual(contents["nuevo" + RENAME_SUFFIX], "importado")
+        self.assertNotIn("igual" + RENAME_SUFFIX, contents)
+
+    def test_search_sees_merged_code(self):
+        self.merge(MERGE_TAKE_IMPORTED)
+        self.assertEqual([row[1] for row in self.db.search_fts("hola")], ["viejo"])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            self.db.merge_database(self.imported_path, "otra")
+
+    def test_user_tables_are_copied(self):
+        client = sqlite3.connect(self.imported_path)
+        self.addCleanup(client.close)
+        with client:
+            client.execute("CREATE TABLE notas (id INTEGER PRIMARY KEY, texto TEXT)")
+            client.executemany("INSERT INTO notas VALUES (?, ?)", [(1, "una"), (2, "dos")])
+        with self.db.transaction():
+            self.db.db.execute("CREATE TABLE notas (id INTEGER PRIMARY KEY, texto TEXT)")
+            self.db.db.execute("INSERT INTO notas VALUES (1, 'local')")
+        counts = self.db.merge_database(self.imported_path)
+        self.assertEqual(counts["notas"], {"inserted": 1, "updated": 0, "renamed": 0, "skipped": 1})
+        self.assertIn("notas: 1 añadidos", describe_merge(counts))
+
+
+class SplitMergeDatabaseTest(MergeDatabaseTest):
+    split_code = True
+
+
+if __name__ == "__main__":
+    unittest.main()
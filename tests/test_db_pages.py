@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+
+LONG_CODE = "print('hola mundo')\n" * 50  # Se guarda comprimido en el esquema dividido
+
+
+class KeysetPaginationTest(unittest.TestCase):
+    split_code = False
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = DatabaseActions(os.path.join(directory.name, "conceptos.db"), split_code=self.split_code)
+        self.addCleanup(self.db.close)
+        self.db.add_many((f"c{number}", f"x = {number}") for number in range(1, 7))
+
+    def test_page_boundaries(self):
+        rows, last = self.db.fetch_page(limit=3, columns=("name",))
+        self.assertEqual((rows, last), ([("c1",), ("c2",), ("c3",)], 3))
+        rows, last = self.db.fetch_page(last, limit=3, columns=("name",))
+        self.assertEqual((rows, last), ([("c4",), ("c5",), ("c6",)], 6))
+        self.assertEqual(self.db.fetch_page(last, limit=3), ([], None))
+        self.assertEqual(self.db.fetch_page(4, limit=10, columns=("id",)), ([(5,), (6,)], 6))
+
+    def test_pages_do_not_skip_or_repeat_after_changes(self):
+        rows, last = self.db.fetch_page(limit=2, columns=("name",))
+        # Borrar filas ya leídas y añadir otras no desplaza las páginas siguientes
+        self.db.delete_many(["c1", "c2", "c4"])
+        self.db.add_category("c7", "")
+        names = [name for name, in self.db.iter_categories(batch_size=2, after_id=last, columns=("name",))]
+        self.assertEqual(names, ["c3", "c5", "c6", "c7"])
+
+    def test_code_column_in_any_position(self):
+        self.db.upsert_many([("c2", LONG_CODE)])
+        rows, _ = self.db.fetch_page(1, limit=1, columns=("name", "code", "id"))
+        self.assertEqual(rows, [("c2", LONG_CODE, 2)])
+        with self.assertRaises(ValueError):
+            self.db.fetch_page(columns=("name", "rowid"))
+
+    def test_iteration_with_exact_multiple_of_batch_size(self):
+        self.assertEqual(len(list(self.db.iter_categories(batch_size=3))), 6)
+        self.assertEqual(len(list(self.db.iter_categories(batch_size=4))), 6)
+        self.assertEqual(list(self.db.iter_categories(after_id=6)), [])
+
+    def test_cursor_can_be_resumed(self):
+        cursor = self.db.cursor(batch_size=4, columns=("id",))
+        self.assertEqual(cursor.next_page(), [(1,), (2,), (3,), (4,)])
+        rows = iter(cursor)
+        self.assertEqual(next(rows), (5,))
+        # Otro cursor creado con la posición guardada sigue en la fila siguiente
+        resumed = self.db.cursor(batch_size=4, after_id=cursor.after_id, columns=("id",))
+        self.assertEqual(list(resumed), [(6,)])
+        self.assertEqual(list(rows), [(6,)])
+        self.assertEqual(cursor.next_page(), [])
+
+
+class SplitKeysetPaginationTest(KeysetPaginationTest):
+    split_code = True
+
+
+if __name__ == "__main__":
+    unittest.main()
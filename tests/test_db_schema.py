@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+
+LONG_CODE = "print('hola mundo')\n" * 50  # Se guarda comprimido
+
+
+class SplitSchemaTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "conceptos.db")
+        self.db = DatabaseActions(self.path, split_code=True)
+        self.addCleanup(self.db.close)
+
+    def assertIndexMatches(self):
+        indexed = {row[0]: tuple(row[1:]) for row in self.db.db.execute("SELECT rowid, name, code FROM categories_fts")}
+        current = {row[0]: tuple(row[1:]) for row in self.db.iter_categories()}
+        self.assertEqual(indexed, current)
+
+    def test_index_follows_compressed_code(self):
+        self.db.add_category("a", LONG_CODE + "alfa")
+        self.db.add_category("b", "beta")
+        self.db.edit_category("b", "b2", LONG_CODE + "gamma")
+        self.db.upsert_many([("a", "delta"), ("c", LONG_CODE)])
+        self.assertIndexMatches()
+        self.assertEqual([row[1] for row in self.db.search_fts("gamma")], ["b2"])
+
+    def test_plain_sqlite_client_can_write(self):
+        # El esquema no depende de funciones SQL registradas por la aplicación
+        self.db.add_category("a", LONG_CODE)
+        client = sqlite3.connect(self.path)
+        self.addCleanup(client.close)
+        with client:
+            client.execute("INSERT INTO categories (name, code) VALUES ('cliente', 'omega = 1')")
+            client.execute("UPDATE categories SET name = 'a2' WHERE name = 'a'")
+        self.db.invalidate_cache()
+        self.assertIndexMatches()
+        self.assertEqual([row[1] for row in self.db.search_fts("omega")], ["cliente"])
+
+
+if __name__ == "__main__":
+    unittest.main()
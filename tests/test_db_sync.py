@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from app.db_actions import MERGE_KEEP_LOCAL, MERGE_TAKE_IMPORTED, DatabaseActions
+from app.db_sync import current_sequence, export_changes, import_changes, last_received
+
+
+class DeltaSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.source = self.open_db("origen.db")
+        self.target = self.open_db("destino.db", split_code=True)
+        self.source.add_many([("a", "1"), ("b", "2")])
+        self.sync()
+
+    def open_db(self, name, split_code=False):
+        db = DatabaseActions(os.path.join(self.directory, name), split_code=split_code)
+        self.addCleanup(db.close)
+        return db
+
+    def sync(self, policy=None, path="cambios.jsonl"):
+        """Lleva al destino los cambios del origen que aún no se le han enviado."""
+        path = os.path.join(self.directory, path)
+        export_changes(self.source, path, peer_id="destino")
+        return import_changes(self.target, path) if policy is None else import_changes(self.target, path, policy)
+
+    def set_updated_at(self, db, name, updated_at):
+        with db.transaction():
+            db.db.execute("UPDATE categories SET updated_at = ? WHERE name = ?", (updated_at, name))
+
+    def contents(self, db):
+        return dict(db.fetch_categories_from_db())
+
+    def test_initial_sync_copies_everything(self):
+        self.assertEqual(self.contents(self.target), {"a": "1", "b": "2"})
+        self.assertEqual(last_received(self.target, self.source.database_id()), current_sequence(self.source))
+
+    def test_only_new_changes_are_exported(self):
+        self.source.add_category("c", "3")
+        path = os.path.join(self.directory, "nuevos.jsonl.gz")
+        self.assertEqual(export_changes(self.source, path, peer_id="destino")[0], 1)
+        self.assertEqual(import_changes(self.target, path), {"inserted": 1, "updated": 0, "deleted": 0, "skipped": 0})
+        self.assertEqual(export_changes(self.source, path, peer_id="destino")[0], 0)
+
+    def test_deletes_and_renames(self):
+        self.source.edit_category("a", "a2", "uno")
+        self.source.delete_category("b")
+        self.assertEqual(self.sync(), {"inserted": 1, "updated": 0, "deleted": 2, "skipped": 0})
+        self.assertEqual(self.contents(self.target), {"a2": "uno"})
+
+    def test_newer_local_edits_win_by_default(self):
+        self.source.upsert_many([("a", "origen"), ("b", "origen")])
+        self.set_updated_at(self.source, "a", 100)
+        self.set_updated_at(self.source, "b", 300)
+        self.target.upsert_many([("a", "destino"), ("b", "destino")])
+        self.set_updated_at(self.target, "a", 200)
+        self.set_updated_at(self.target, "b", 200)
+        self.assertEqual(self.sync(), {"inserted": 0, "updated": 1, "deleted": 0, "skipped": 1})
+        self.assertEqual(self.contents(self.target), {"a": "destino", "b": "origen"})
+
+    def test_keep_local_and_take_imported(self):
+        self.target.upsert_many([("a", "destino")])
+        self.source.upsert_many([("a", "origen")])
+        self.source.delete_category("b")
+        self.assertEqual(self.sync(MERGE_KEEP_LOCAL)["skipped"], 2)
+        self.assertEqual(self.contents(self.target), {"a": "destino", "b": "2"})
+        path = os.path.join(self.directory, "todo.jsonl")
+        export_changes(self.source, path, since=0)
+        self.assertEqual(import_changes(self.target, path, MERGE_TAKE_IMPORTED)["deleted"], 1)
+        self.assertEqual(self.contents(self.target), {"a": "origen"})
+
+    def test_rejects_other_files_and_policies(self):
+        path = os.path.join(self.directory, "otro.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"format": "otro"}\n')
+        with self.assertRaises(ValueError):
+            import_changes(self.target, path)
+        with self.assertRaises(ValueError):
+            import_changes(self.target, path, "rename")
+        self.assertEqual(self.contents(self.target), {"a": "1", "b": "2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
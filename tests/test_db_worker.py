@@ -0,0 +1,60 @@
+import threading
+import unittest
+from app.db_worker import POLL_BUSY_MS, DatabaseWorker
+
+
+class FakeRoot:
+    """Sustituto de la ventana de Tk: guarda los `after` hasta llamar a `run`."""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.delays = []
+        self._next_id = 0
+
+    def after(self, ms, func):
+        self._next_id += 1
+        self.callbacks[self._next_id] = func
+        self.delays.append(ms)
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run(self):
+        """Ejecuta los `after` pendientes en el momento de la llamada."""
+        callbacks, self.callbacks = self.callbacks, {}
+        for func in callbacks.values():
+            func()
+
+
+class PollTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.worker = DatabaseWorker(None, self.root)
+        self.addCleanup(self.worker.shutdown)
+
+    def test_idle_worker_stops_polling(self):
+        self.root.run()
+        self.assertEqual(self.root.callbacks, {})
+
+    def test_submit_restarts_polling(self):
+        self.root.run()
+        release = threading.Event()
+        results = []
+        self.worker.submit(release.wait).then(lambda value: results.append(value))
+        self.assertEqual(len(self.root.callbacks), 1)
+        self.assertEqual(self.root.delays[-1], POLL_BUSY_MS)
+        # Sigue sondeando mientras la tarea no termina
+        self.root.run()
+        self.assertEqual(len(self.root.callbacks), 1)
+        release.set()
+        while not results:
+            self.root.run()
+        self.assertEqual(results, [True])
+        self.root.run()
+        self.assertEqual(self.root.callbacks, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+from app.fuzzy_index import CODE_WEIGHT, TrigramIndex, identifiers, trigrams
+
+
+class TrigramIndexTest(unittest.TestCase):
+
+    def test_trigrams_pad_each_word(self):
+        self.assertEqual(trigrams("Sí_no"), {"  s", " si", "si ", "  n", " no", "no "})
+        self.assertEqual(trigrams("¡!"), set())
+
+    def test_identifiers_skip_keywords_and_short_names(self):
+        self.assertEqual(identifiers("for elemento in lista: x = len(elemento)"), {"elemento", "lista", "len"})
+
+    def test_finds_names_with_typos(self):
+        index = TrigramIndex()
+        index.add(1, "Dictionary comprehension")
+        index.add(2, "List comprehension")
+        index.add(3, "Decoradores")
+        results = index.search("dicionary comprehesion")
+        self.assertEqual([row[:2] for row in results], [(1, "Dictionary comprehension"), (2, "List comprehension")])
+        self.assertGreater(results[0][2], results[1][2])
+        self.assertEqual(index.search("zzzz"), [])
+
+    def test_code_identifiers_weigh_less_than_names(self):
+        index = TrigramIndex()
+        index.add(1, "Contador", "contador = 0")
+        index.add(2, "Bucles", "contador = 0\nwhile contador < 3: contador += 1")
+        (first, _, name_score), (second, _, code_score) = index.search("contador")
+        self.assertEqual((first, second), (1, 2))
+        self.assertAlmostEqual(code_score, name_score * CODE_WEIGHT)
+
+    def test_incremental_changes_match_a_fresh_index(self):
+        rnd = random.Random(0)
+        words = ["lista", "listas", "tupla", "dict", "conjunto", "bucle", "clase", "objeto"]
+        index, current = TrigramIndex(), {}
+        for _ in range(300):
+            category_id = rnd.randrange(40)
+            if rnd.random() < 0.3:
+                index.remove(category_id)
+                current.pop(category_id, None)
+            else:
+                name = " ".join(rnd.sample(words, 2))
+                code = " ".join(rnd.sample(words, 3))
+                index.add(category_id, name, code)
+                current[category_id] = (name, code)
+        fresh = TrigramIndex()
+        for category_id, (name, code) in current.items():
+            fresh.add(category_id, name, code)
+        self.assertEqual(len(index), len(current))
+        for word in words + ["lsita", "objteo"]:
+            self.assertEqual(index.search(word, limit=100), fresh.search(word, limit=100), word)
+
+
+class FuzzySearchTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "conceptos.db")
+        self.db = DatabaseActions(self.path)
+        self.addCleanup(self.db.close)
+        self.db.add_many([("Diccionarios", "datos = {}"), ("Listas", "numeros = []")])
+
+    def names(self, text):
+        return [name for _, name, _ in self.db.fuzzy_search(text)]
+
+    def test_index_follows_the_change_log(self):
+        self.assertEqual(self.names("dicionarios"), ["Diccionarios"])
+        rebuilds = []
+        self.db.fuzzy_index._rebuild = lambda: rebuilds.append(True)
+        self.db.edit_category("Listas", "Tuplas", "puntos = ()")
+        self.db.add_category("Conjuntos", "")
+        self.db.delete_category("Diccionarios")
+        self.assertEqual(self.names("tulpas"), ["Tuplas"])
+        self.assertEqual(self.names("conjutnos"), ["Conjuntos"])
+        self.assertEqual(self.names("dicionarios"), [])
+        self.assertEqual(self.names("numeros"), [])
+        self.assertEqual(self.names("puntso"), ["Tuplas"])
+        self.assertEqual(rebuilds, [])
+
+    def test_sees_changes_from_other_connections(self):
+        self.db.fuzzy_index.refresh()
+        client = sqlite3.connect(self.path)
+        self.addCleanup(client.close)
+        with client:
+            client.execute("INSERT INTO categories (name, code) VALUES ('Generadores', 'yield')")
+        self.assertEqual(self.names("generadroes"), ["Generadores"])
+
+    def test_reset_rebuilds(self):
+        self.db.fuzzy_index.refresh()
+        self.db.fuzzy_index.reset()
+        self.assertEqual(self.names("listsa"), ["Listas"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+import random
+import re
+import tkinter
+import unittest
+from pygments.lexers import PythonLexer
+from app.highlighter import EditHook, SyntaxHighlighter
+
+
+class FakeText:
+    """
+    Lo mínimo de un widget Text para SyntaxHighlighter, sin pantalla.
+
+    Las etiquetas se guardan por carácter y se desplazan con las ediciones
+    como en Tk (el texto insertado no tiene etiquetas). Antes de cada
+    edición se avisa a `listeners`, como haría EditHook. Los `after` quedan
+    pendientes hasta llamar a `run_idle`.
+    """
+
+    def __init__(self, content="", visible_lines=10):
+        self.content = content
+        self.tags = {}  # etiqueta -> conjunto de posiciones
+        self.visible_lines = visible_lines
+        self.callbacks = {}
+        self.listeners = []
+        self.reads = 0  # Caracteres leídos con `get`
+        self._next_id = 0
+
+    def _offset(self, index):
+        if index == "end":
+            return len(self.content) + 1
+        if index == "end-1c":
+            return len(self.content)
+        match = re.fullmatch(r"(\d+)\.(\d+|end)(?:\+(\d+)c)?", index)
+        line, extra = int(match.group(1)), int(match.group(3) or 0)
+        lines = self.content.split("\n")
+        if line > len(lines):
+            return len(self.content) + 1
+        column = len(lines[line - 1]) if match.group(2) == "end" else int(match.group(2))
+        return sum(len(text) + 1 for text in lines[:line - 1]) + min(column, len(lines[line - 1])) + extra
+
+    def position(self, offset):
+        """Índice de Tk ("línea.columna") de una posición del texto."""
+        line = self.content.count("\n", 0, offset) + 1
+        column = offset - (self.content.rfind("\n", 0, offset) + 1)
+        return f"{line}.{column}"
+
+    def get(self, start, end):
+        text = self.content[self._offset(start):self._offset(end)]
+        self.reads += len(text)
+        return text
+
+    def count(self, start, end, option):
+        return (self._offset(end) - self._offset(start),)
+
+    def _notify(self, first, last, added):
+        line = lambda offset: self.content.count("\n", 0, min(offset, len(self.content)))
+        for listener in self.listeners:
+            listener(line(first), line(last), added)
+
+    def insert(self, index, text):
+        offset = self._offset(index)
+        self._notify(offset, offset, text.count("\n"))
+        self.content = self.content[:offset] + text + self.content[offset:]
+        for tag, positions in self.tags.items():
+            self.tags[tag] = {position + len(text) if position >= offset else position for position in positions}
+
+    def delete(self, start, end):
+        first, last = self._offset(start), self._offset(end)
+        self._notify(first, last, 0)
+        self.content = self.content[:first] + self.content[last:]
+        for tag, positions in self.tags.items():
+            self.tags[tag] = {
+                position - (last - first) if position >= last else position
+                for position in positions if not first <= position < last
+            }
+
+    def tag_configure(self, *args, **kwargs):
+        pass
+
+    def tag_add(self, tag, *indices):
+        positions = self.tags.setdefault(tag, set())
+        for start, end in zip(indices[::2], indices[1::2]):
+            positions.update(range(self._offset(start), self._offset(end)))
+
+    def tag_remove(self, tag, start, end):
+        first, last = self._offset(start), self._offset(end)
+        if tag in self.tags:
+            self.tags[tag] = {position for position in self.tags[tag] if not first <= position < last}
+
+    def tags_at(self, index):
+        offset = self._offset(index)
+        return sorted(tag for tag, positions in self.tags.items() if offset in positions)
+
+    def colors(self):
+        return {tag: positions for tag, positions in self.tags.items() if positions}
+
+    def index(self, index):
+        if index.startswith("@"):
+            return f"{self.visible_lines}.0"
+        return self.position(min(self._offset(index), len(self.content)))
+
+    def winfo_height(self):
+        return 100
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def after(self, ms, func):
+        self._next_id += 1
+        self.callbacks[self._next_id] = func
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run_idle(self, steps=None):
+        """Ejecuta los `after` pendientes (todos, o como mucho `steps`)."""
+        done = 0
+        while self.callbacks and (steps is None or done < steps):
+            self.callbacks.pop(min(self.callbacks))()
+            done += 1
+
+
+SOURCE = "".join(f"x{number} = {number}\n" for number in range(60))
+
+
+def fake_hook(widget, on_edit):
+    """Sustituto de EditHook para FakeText."""
+    widget.listeners.append(on_edit)
+
+
+def make_highlighter(widget, chunk_lines=7):
+    return SyntaxHighlighter(widget, chunk_lines=chunk_lines, edit_hook=fake_hook)
+
+
+def lexer_colors(content):
+    """Etiquetas por carácter según la API pública de Pygments, analizando todo el texto."""
+    tag_for = make_highlighter(FakeText())._tag_for
+    colors = {}
+    for position, token, value in PythonLexer().get_tokens_unprocessed(content + "\n"):
+        if value and not value.isspace():
+            colors.setdefault(tag_for(token), set()).update(range(position, position + len(value)))
+    return colors
+
+
+class SyntaxHighlighterTest(unittest.TestCase):
+
+    def test_chunks_match_public_lexer(self):
+        # Tramos de 3 líneas que cortan docstrings, cadenas sin cerrar y f-strings
+        code = "\n".join([
+            "import os",
+            "def f(a, b=2):",
+            '    """Docstring',
+            "    de varias",
+            '    líneas."""',
+            "    s = f'{a!r} y {b:>4}' + r'\\d+' + b'\\x00'",
+            "    t = '''sin cerrar",
+            "    sigue",
+            "    y sigue'''  # comentario",
+            "    u = f\"\"\"{",
+            "a",
+            "}\"\"\"",
+            "    return [x ** 2 for x in range(10) if x % 2] @ 0x1F",
+            "class C(object):",
+            "    @property",
+            "    def g(self): return None",
+            "",
+        ])
+        widget = FakeText(code)
+        make_highlighter(widget, chunk_lines=3).update()
+        widget.run_idle()
+        self.assertEqual(widget.colors(), lexer_colors(code))
+
+    def test_edit_above_running_scan_keeps_scanning(self):
+        widget = FakeText(SOURCE)
+        highlighter = make_highlighter(widget)
+        highlighter.update()
+        widget.run_idle()
+        widget.insert("1.0", "'''")
+        highlighter.update()
+        # Otra tecla antes de que el análisis en segundo plano avance
+        widget.insert("5.2", "a")
+        highlighter.update()
+        widget.run_idle()
+        self.assertEqual(widget.tags_at("40.0"), ["Token.Literal.String.Single"])
+        self.assertEqual(widget.colors(), lexer_colors(widget.content))
+
+    def test_edit_reads_only_nearby_lines(self):
+        widget = FakeText(SOURCE * 10)
+        highlighter = make_highlighter(widget)
+        highlighter.update()
+        widget.run_idle()
+        widget.reads = 0
+        widget.insert("300.3", "9")
+        highlighter.update()
+        widget.run_idle()
+        self.assertLess(widget.reads, 20 * len("x59 = 59\n"))
+        self.assertEqual(widget.colors(), lexer_colors(widget.content))
+
+    def test_random_edits_match_public_lexer(self):
+        snippets = ["'''", '"""', "a", "\n", "#", '"', "'", "(", ")", " x = 1\n", "\\", "def f():\n",
+                    "f'{", "}", "f\"\"\"{\n"]
+        for seed in range(40):
+            rnd = random.Random(seed)
+            widget = FakeText(SOURCE)
+            highlighter = make_highlighter(widget, chunk_lines=rnd.choice([3, 7, 50]))
+            highlighter.update()
+            widget.run_idle()
+            for _ in range(40):
+                size = len(widget.content)
+                start = rnd.randrange(size + 1)
+                if rnd.random() < 0.35 and size:
+                    end = min(size, start + rnd.randint(1, 12))
+                    widget.delete(widget.position(start), widget.position(end))
+                else:
+                    widget.insert(widget.position(start), rnd.choice(snippets))
+                if rnd.random() < 0.8:
+                    highlighter.update()
+                widget.run_idle(rnd.randint(0, 3))
+            highlighter.update()
+            widget.run_idle()
+            self.assertEqual(widget.colors(), lexer_colors(widget.content), f"semilla {seed}")
+
+
+class EditHookTest(unittest.TestCase):
+
+    def test_reports_edits_made_through_tcl(self):
+        # Sin pantalla: un comando Tcl de Python hace de widget Text
+        interpreter = tkinter.Tcl()
+        text = FakeText("uno\ndos\ntres")
+        calls = []
+
+        def widget_command(operation, *args):
+            calls.append(operation)
+            if operation == "index":
+                return text.index(args[0])
+            if operation == "insert":
+                text.insert(args[0], "".join(args[1::2]))
+            elif operation == "delete":
+                text.delete(args[0], args[1])
+            return ""
+
+        interpreter.createcommand(".t", widget_command)
+        widget = type("Widget", (), {"tk": interpreter, "_w": ".t", "bind": lambda *args, **kwargs: None})()
+        edits = []
+        EditHook(widget, lambda *edit: edits.append(edit))
+        interpreter.call(".t", "insert", "2.0", "a\nb\n", "tag", "c")
+        interpreter.call(".t", "delete", "1.0", "3.0")
+        interpreter.call(".t", "replace", "1.1", "end", "x\ny")
+        interpreter.call(".t", "tag", "add", "x", "1.0", "end")
+        self.assertEqual(edits, [(1, 1, 2), (0, 2, 0), (0, 2, 0), (0, 0, 1)])
+        self.assertEqual(calls.count("tag"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
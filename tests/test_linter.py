@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from app.db_actions import DatabaseActions
+from app.linter import ERROR, WARNING, LintCache, check_code, check_code_cached, describe_problems, lint_database
+
+
+def undefined(code):
+    """(línea, columna) de los nombres no definidos que encuentra el linter."""
+    return [(line, column) for line, column, _, _, severity in check_code(code) if severity == WARNING]
+
+
+class CheckCodeTest(unittest.TestCase):
+
+    def test_valid_code_has_no_diagnostics(self):
+        code = "import os\n\ndef f(x, *args, **kw):\n    return os.path.join(x, *args)\n\nprint(f('a'), len([]))\n"
+        self.assertEqual(check_code(code), ())
+
+    def test_syntax_error_is_the_only_diagnostic(self):
+        diagnostics = check_code("x = 1\nif x\n    print(y)\n")
+        self.assertEqual(len(diagnostics), 1)
+        self.assertEqual(diagnostics[0][0], 2)
+        self.assertEqual(diagnostics[0][4], ERROR)
+
+    def test_undefined_name_with_character_columns(self):
+        diagnostics = check_code("año = 1\nprint('ñ', nada)\n")
+        self.assertEqual(diagnostics, ((2, 11, 15, "'nada' no está definido", WARNING),))
+
+    def test_star_import_disables_warnings(self):
+        self.assertEqual(check_code("from math import *\nprint(pi, nada)\n"), ())
+
+    def test_names_defined_later_or_global_in_functions(self):
+        code = "def f():\n    global g\n    g = 1\n    return h\n\ndef h():\n    return g\n"
+        self.assertEqual(undefined(code), [])
+
+    def test_function_scope_is_separate(self):
+        code = "def f(a):\n    return a\n\nprint(a)\n"
+        self.assertEqual(undefined(code), [(4, 6)])
+
+    def test_comprehension_variables_are_local(self):
+        # La `a` de la comprensión es suya; solo la del print no está definida
+        self.assertEqual(undefined("x = [a for a in range(3)]\nprint(a)\n"), [(2, 6)])
+        self.assertEqual(undefined("d = {k: v for k, v in {}.items() if v}\n"), [])
+        self.assertEqual(undefined("[[y for y in x] for x in [[1]]]\n"), [])
+        # El primer iterable se evalúa fuera de la comprensión
+        self.assertEqual(undefined("[q for q in q]\n"), [(1, 12)])
+
+    def test_lambda_parameters(self):
+        # Los valores por defecto se evalúan fuera de la lambda; el cuerpo ve los parámetros
+        self.assertEqual(undefined("g = lambda n, m=n: n + m\n"), [(1, 16)])
+        self.assertEqual(undefined("h = lambda *args, k=1, **kw: (args, k, kw)\n"), [])
+        self.assertEqual(undefined("f = lambda: [i for i in range(3)]\nprint(i)\n"), [(2, 6)])
+
+
+class LintCacheTest(unittest.TestCase):
+
+    def test_cached_result_is_reused(self):
+        cache = LintCache()
+        first = check_code_cached("print(nada)\n", cache)
+        self.assertIs(check_code_cached("print(nada)\n", cache), first)
+
+    def test_least_recently_used_is_dropped(self):
+        cache = LintCache(max_items=2)
+        cache.put("a", ())
+        cache.put("b", ())
+        cache.get("a")
+        cache.put("c", ())
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ())
+
+
+class LintDatabaseTest(unittest.TestCase):
+
+    def test_reports_only_categories_with_problems(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        db = DatabaseActions(os.path.join(directory.name, "conceptos.db"))
+        self.addCleanup(db.close)
+        db.add_many([("bien", "print(1)\n"), ("sintaxis", "def (:\n"), ("nombre", "print(nada)\n")])
+        progress = []
+        problems = lint_database(db, progress=lambda *args: progress.append(args), cache=LintCache(), batch_size=2)
+        self.assertEqual([name for name, _ in problems], ["sintaxis", "nombre"])
+        self.assertEqual(progress, [(2, 3), (3, 3)])
+        self.assertIn("nombre: línea 1: 'nada' no está definido", describe_problems(problems))
+
+
+if __name__ == "__main__":
+    unittest.main()
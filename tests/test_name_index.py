@@ -0,0 +1,59 @@
+import random
+import unittest
+from app.name_index import NameIndex, fold
+
+NAMES = ["Listas", "Comprensión de listas", "Diccionarios", "Canción", "listas enlazadas", "Tuplas", "Sets"]
+
+
+def names(index, text):
+    return [index.names[position] for position in index.search(text)]
+
+
+def expected(rows, text):
+    """Resultado de referencia: primero los prefijos y después el resto, en orden alfabético."""
+    text = fold(text)
+    ordered = sorted(rows, key=lambda row: (fold(row[1]), row[0]))
+    prefixes = [name for _, name in ordered if fold(name).startswith(text)]
+    if len(text) < 2:
+        return prefixes
+    return prefixes + [name for _, name in ordered if text in fold(name) and not fold(name).startswith(text)]
+
+
+class NameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = NameIndex(enumerate(NAMES, 1))
+
+    def test_fold_ignores_case_and_accents(self):
+        self.assertEqual(fold("Canción ÑANDÚ"), "cancion nandu")
+
+    def test_prefixes_before_substrings(self):
+        self.assertEqual(names(self.index, "lis"), ["Listas", "listas enlazadas", "Comprensión de listas"])
+        self.assertEqual(names(self.index, "CANCION"), ["Canción"])
+        self.assertEqual(names(self.index, "on"), ["Canción", "Comprensión de listas", "Diccionarios"])
+
+    def test_single_letter_only_matches_prefixes(self):
+        self.assertEqual(names(self.index, "s"), ["Sets"])
+        self.assertEqual(names(self.index, ""), sorted(NAMES, key=fold))
+
+    def test_view_maps_positions_to_ids(self):
+        ids, labels = self.index.view(self.index.search("tas"))
+        self.assertEqual(list(labels[:]), ["Comprensión de listas", "Listas", "listas enlazadas"])
+        self.assertEqual(ids[:], [2, 1, 5])
+        self.assertEqual(ids.index(5), 2)
+        with self.assertRaises(ValueError):
+            ids.index(3)
+
+    def test_typing_letter_by_letter_matches_a_fresh_index(self):
+        rnd = random.Random(0)
+        rows = [(number, "".join(rnd.choice("abcáé ") for _ in range(rnd.randint(1, 8)))) for number in range(300)]
+        index = NameIndex(rows)
+        for _ in range(50):
+            word = "".join(rnd.choice("abcae") for _ in range(4))
+            # Cada letra reutiliza los resultados de la consulta anterior
+            for length in range(1, len(word) + 1):
+                self.assertEqual(names(index, word[:length]), expected(rows, word[:length]), word[:length])
+
+
+if __name__ == "__main__":
+    unittest.main()
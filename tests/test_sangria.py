@@ -0,0 +1,76 @@
+import unittest
+from app.sangria import CONTEXT_LINES, get_indentation, on_enter
+
+
+def indent(text):
+    """Sangría tras pulsar Intro con el cursor al final de `text`."""
+    return get_indentation(text.split("\n"))
+
+
+class GetIndentationTest(unittest.TestCase):
+
+    def test_blocks(self):
+        self.assertEqual(indent("def f(x):"), "    ")
+        self.assertEqual(indent("class C:\n    def f(self):  # comentario"), "        ")
+        self.assertEqual(indent("if x:\n    y = 1"), "    ")
+        self.assertEqual(indent("def f():\n    return 1"), "")
+        self.assertEqual(indent("while True:\n        pass"), "    ")
+
+    def test_colons_in_strings_comments_and_literals(self):
+        self.assertEqual(indent("s = 'a:'"), "")
+        self.assertEqual(indent("x = 1  # ojo:"), "")
+        self.assertEqual(indent("d = {1: 2}"), "")
+        self.assertEqual(indent("    returned = 1"), "    ")
+
+    def test_open_brackets(self):
+        self.assertEqual(indent("resultado = funcion(a,"), " " * len("resultado = funcion("))
+        self.assertEqual(indent("    datos = {'a': [1,"), " " * len("    datos = {'a': ["))
+        self.assertEqual(indent("    datos = ["), "        ")
+        self.assertEqual(indent("x = f(')',"), " " * len("x = f("))
+        # El paréntesis ya cerrado no cuenta
+        self.assertEqual(indent("def f(a,\n      b):"), "    ")
+
+    def test_backslash_continuation(self):
+        self.assertEqual(indent("    total = a + \\"), "        ")
+        self.assertEqual(indent("total = a + \\\n        b + \\"), "        ")
+        self.assertEqual(indent("if a and \\\n        b:"), "    ")
+
+    def test_triple_quoted_strings(self):
+        self.assertEqual(indent('def f():\n    """Texto:\n      sigue'), "      ")
+        self.assertEqual(indent('x = """a\n"""\n    y = 1'), "    ")
+
+    def test_context_starting_mid_statement(self):
+        # El contexto puede empezar dentro de unos paréntesis abiertos antes
+        self.assertEqual(indent("        b, c)\n    y = 1"), "    ")
+
+
+class FakeEntry:
+    """Lo que usa `on_enter` de un widget Text."""
+
+    def __init__(self, text):
+        self.text = text
+        self.reads = []
+        self.inserted = None
+
+    def get(self, start, end):
+        self.reads.append((start, end))
+        return self.text
+
+    def insert(self, index, text):
+        self.inserted = text
+
+    def see(self, index):
+        pass
+
+
+class OnEnterTest(unittest.TestCase):
+
+    def test_reads_only_the_lines_before_the_cursor(self):
+        entry = FakeEntry("for x in y:")
+        self.assertEqual(on_enter(None, entry), "break")
+        self.assertEqual(entry.reads, [(f"insert linestart -{CONTEXT_LINES} lines", "insert")])
+        self.assertEqual(entry.inserted, "\n    ")
+
+
+if __name__ == "__main__":
+    unittest.main()